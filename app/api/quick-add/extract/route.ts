@@ -1,4 +1,5 @@
 import { NextRequest, NextResponse } from "next/server";
+import { gzipSync } from "zlib";
 import { generateObject } from "ai";
 import { openai } from "@ai-sdk/openai";
 import { flightExtractionSchema } from "@/lib/schemas/flight-extraction-schema";
@@ -47,6 +48,10 @@ export async function POST(request: NextRequest) {
       );
     }
 
+    // What the AI tier sees: the email as given, or the extruct service's
+    // compact text rendition of it when structured data falls short
+    let aiText = text;
+
     // TIER 1: Try structured data extraction first (if HTML is present)
     const hasHTML = /<[a-z][\s\S]*>/i.test(text);
     if (hasHTML) {
@@ -54,10 +59,18 @@ export async function POST(request: NextRequest) {
       
       try {
         const extractServiceUrl = process.env.EXTRUCT_SERVICE_URL || 'http://localhost:8001';
+        // Confirmation HTML compresses 5-10x; small bodies aren't worth it
+        const payload = JSON.stringify({ html: text, type });
+        const compress = payload.length > 16 * 1024;
         const extractResponse = await fetch(`${extractServiceUrl}/extract`, {
           method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ html: text, type }),
+          headers: {
+            'Content-Type': 'application/json',
+            ...(compress && { 'Content-Encoding': 'gzip' }),
+            // Leave time to fall back to AI before the abort below
+            'X-Timeout-Ms': '4500',
+          },
+          body: compress ? gzipSync(payload) : payload,
           signal: AbortSignal.timeout(5000), // 5 second timeout
         });
 
@@ -81,6 +94,18 @@ export async function POST(request: NextRequest) {
             });
           } else {
             console.log('[Extract] Structured data incomplete, falling back to AI');
+            if (typeof extractResult.text === 'string' && extractResult.text.length > 0) {
+              aiText = extractResult.text;
+              console.log(`[Extract] Using text rendition (${aiText.length} of ${text.length} chars)`);
+            }
+          }
+        } else if (extractResponse.status === 504) {
+          // Ran out of time; the body is still a normal extraction result
+          console.log('[Extract] Structured data timed out, falling back to AI');
+          const timeoutResult = await extractResponse.json().catch(() => null);
+          if (typeof timeoutResult?.text === 'string' && timeoutResult.text.length > 0) {
+            aiText = timeoutResult.text;
+            console.log(`[Extract] Using text rendition (${aiText.length} of ${text.length} chars)`);
           }
         } else {
           console.log('[Extract] Extruct service error, falling back to AI');
@@ -148,7 +173,7 @@ IMPORTANT: Every flight MUST have valid departureDate, departureTime, arrivalDat
 
 Extract all flight information from the following confirmation:
 
-${text}`;
+${aiText}`;
         break;
       case "hotel":
         schema = hotelExtractionSchema;
@@ -175,7 +200,7 @@ IMPORTANT: Every hotel booking MUST have valid checkInDate and checkOutDate. If
 
 Extract all hotel information from the following confirmation:
 
-${text}`;
+${aiText}`;
         break;
       case "car-rental":
         schema = carRentalExtractionSchema;
@@ -202,7 +227,7 @@ IMPORTANT: Every car rental MUST have valid pickupDate and returnDate. If you ca
 
 Extract all car rental information from the following confirmation:
 
-${text}`;
+${aiText}`;
         break;
       case "train":
         schema = trainExtractionSchema;
@@ -229,7 +254,7 @@ IMPORTANT: Every train segment MUST have valid departureDate, departureTime, arr
 
 Extract all train information from the following confirmation:
 
-${text}`;
+${aiText}`;
         break;
       case "restaurant":
         schema = restaurantExtractionSchema;
@@ -254,7 +279,7 @@ IMPORTANT: Every restaurant reservation MUST have valid reservationDate and rese
 
 Extract all restaurant reservation information from the following confirmation:
 
-${text}`;
+${aiText}`;
         break;
       case "event":
         schema = eventExtractionSchema;
@@ -279,7 +304,7 @@ IMPORTANT: Every event MUST have valid eventDate. If you cannot find this in the
 
 Extract all event ticket information from the following confirmation:
 
-${text}`;
+${aiText}`;
         break;
       case "cruise":
         schema = cruiseExtractionSchema;
@@ -304,7 +329,7 @@ IMPORTANT: Every cruise MUST have valid embarkationDate and disembarkationDate.
 
 Extract all cruise booking information from the following confirmation:
 
-${text}`;
+${aiText}`;
         break;
       case "private-driver":
         schema = privateDriverExtractionSchema;
@@ -329,7 +354,7 @@ IMPORTANT: Every transfer MUST have valid pickupDate. If you cannot find this in
 
 Extract all private driver/transfer information from the following confirmation:
 
-${text}`;
+${aiText}`;
         break;
       case "generic":
         schema = genericReservationSchema;
@@ -355,7 +380,7 @@ IMPORTANT: Every reservation MUST have valid startDate. If you cannot find this
 
 Extract all reservation information from the following confirmation:
 
-${text}`;
+${aiText}`;
         break;
       default:
         return NextResponse.json(
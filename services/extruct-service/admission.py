@@ -0,0 +1,108 @@
+"""
+Admission control for extraction requests.
+
+Limits how much extraction work runs at once and sheds requests that
+cannot start within their queue-time budget, so callers get an immediate
+"overloaded" answer (and fall back to AI) instead of waiting on a queue
+until their own timeout fires.
+"""
+
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted within its queue budget."""
+
+
+class AdmissionController:
+    """
+    Weighted concurrency limiter with a queue-time budget.
+
+    Each request takes `weight` units of `capacity` while it runs. When
+    `size_unit` is set, larger inputs weigh more (one extra unit per
+    `size_unit` bytes), so a few huge emails cannot crowd out many
+    small ones. A request that cannot get its units within
+    `queue_timeout` seconds is rejected with Overloaded.
+    """
+
+    def __init__(self, capacity: int, queue_timeout: float, size_unit: int = 0):
+        self.capacity = max(capacity, 1)
+        self.queue_timeout = max(queue_timeout, 0.0)
+        self.size_unit = max(size_unit, 0)
+
+        self._in_use = 0
+        self._waiting = 0
+        self._condition = asyncio.Condition()
+
+        self.admitted = 0
+        self.shed = 0
+
+    def weight_for(self, size: int) -> int:
+        """Units of capacity a request of `size` bytes consumes."""
+        if not self.size_unit:
+            return 1
+        return min(1 + size // self.size_unit, self.capacity)
+
+    @asynccontextmanager
+    async def admit(self, size: int = 0, timeout: Optional[float] = None):
+        """
+        Hold capacity for the duration of the block.
+
+        `timeout` (e.g. the time left before the request's deadline)
+        shortens the queue budget. Raises Overloaded if capacity is not
+        available in time.
+        """
+        weight = self.weight_for(size)
+        queue_timeout = self.queue_timeout if timeout is None else min(self.queue_timeout, timeout)
+
+        async with self._condition:
+            if not self._has_room(weight):
+                if not queue_timeout:
+                    self._reject(weight)
+
+                self._waiting += 1
+                try:
+                    await asyncio.wait_for(
+                        self._condition.wait_for(lambda: self._has_room(weight)),
+                        timeout=queue_timeout,
+                    )
+                except asyncio.TimeoutError:
+                    self._reject(weight)
+                finally:
+                    self._waiting -= 1
+
+            self._in_use += weight
+            self.admitted += 1
+
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._in_use -= weight
+                self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current load and lifetime counters."""
+        return {
+            'capacity': self.capacity,
+            'inUse': self._in_use,
+            'waiting': self._waiting,
+            'admitted': self.admitted,
+            'shed': self.shed,
+        }
+
+    def _has_room(self, weight: int) -> bool:
+        return self._in_use + weight <= self.capacity
+
+    def _reject(self, weight: int):
+        self.shed += 1
+        logger.warning(
+            "Shedding request (weight %d, in use %d/%d, waiting %d)",
+            weight, self._in_use, self.capacity, self._waiting,
+        )
+        raise Overloaded()
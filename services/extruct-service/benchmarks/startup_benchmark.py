@@ -0,0 +1,98 @@
+"""
+Startup-time and per-worker memory benchmark.
+
+Starts fresh interpreters that import the service and prewarm a worker,
+the same work every container start and every new worker does, and
+reports import time, prewarm time and peak RSS. Exits non-zero if any
+measurement is over its budget or if a parser we do not use (RDFa,
+microformats, ...) gets imported, so it can guard against regressions.
+
+Usage (from services/extruct-service):
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --runs 10 --max-rss-mb 80
+"""
+
+from pathlib import Path
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+# Modules that only unused extruct syntaxes need
+UNUSED_PARSER_MODULES = ['rdflib', 'pyRdfa', 'mf2py', 'extruct.rdfa', 'extruct.opengraph', 'extruct.microformat']
+
+WORKER_SCRIPT = """
+import json, resource, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.prewarm()
+warmed = time.perf_counter()
+print(json.dumps({
+    'importMs': (imported - started) * 1000,
+    'prewarmMs': (warmed - imported) * 1000,
+    'rssMb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'unusedModules': [m for m in %r if m in sys.modules],
+}))
+""" % (UNUSED_PARSER_MODULES,)
+
+
+def measure_once() -> dict:
+    """Run one cold worker start in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, '-c', WORKER_SCRIPT],
+        cwd=SERVICE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5, help='Cold starts to measure (default: 5)')
+    parser.add_argument('--max-import-ms', type=float, default=1500, help='Budget for median import time')
+    parser.add_argument('--max-prewarm-ms', type=float, default=500, help='Budget for median prewarm time')
+    parser.add_argument('--max-rss-mb', type=float, default=100, help='Budget for median peak RSS per worker')
+    args = parser.parse_args()
+
+    # Throwaway run so .pyc compilation is not counted
+    measure_once()
+    runs = [measure_once() for _ in range(args.runs)]
+
+    summary = {
+        'importMs': statistics.median(r['importMs'] for r in runs),
+        'prewarmMs': statistics.median(r['prewarmMs'] for r in runs),
+        'rssMb': statistics.median(r['rssMb'] for r in runs),
+    }
+    unused = sorted({m for r in runs for m in r['unusedModules']})
+
+    print(f"Runs:        {args.runs}")
+    print(f"Import:      {summary['importMs']:.1f} ms (budget {args.max_import_ms:.0f})")
+    print(f"Prewarm:     {summary['prewarmMs']:.1f} ms (budget {args.max_prewarm_ms:.0f})")
+    print(f"Peak RSS:    {summary['rssMb']:.1f} MB (budget {args.max_rss_mb:.0f})")
+    print(f"Unused parsers imported: {', '.join(unused) or 'none'}")
+
+    failures = []
+    if summary['importMs'] > args.max_import_ms:
+        failures.append('import time')
+    if summary['prewarmMs'] > args.max_prewarm_ms:
+        failures.append('prewarm time')
+    if summary['rssMb'] > args.max_rss_mb:
+        failures.append('peak RSS')
+    if unused:
+        failures.append('unused parser imports')
+
+    if failures:
+        print(f"REGRESSION: {', '.join(failures)} over budget")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Round-trip benchmark: TCP vs Unix domain socket, new vs pooled connections.
+
+Starts server.py with one worker listening on both a TCP port and a Unix
+socket, then sends the same small confirmation email through each
+transport with client.py. Every request either opens a new connection or
+reuses a pooled one. The report gives round-trip latency percentiles and
+the saving against a new TCP connection per request, which is what the
+Quick Add route pays today.
+
+Usage (from services/extruct-service):
+    python benchmarks/transport_benchmark.py
+    python benchmarks/transport_benchmark.py --requests 5000 --path /health
+"""
+
+from pathlib import Path
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SERVICE_DIR))
+
+from client import ExtractClient  # noqa: E402
+from structured_data import REFERENCE_HTML  # noqa: E402
+
+# Requests per scenario before moving on to the next one
+BATCH = 100
+
+
+def start_server(port: int, uds: str) -> subprocess.Popen:
+    env = dict(os.environ, SERVER_WORKERS='1', SERVER_MAX_REQUESTS='0', SERVER_MAX_RSS_MB='0',
+               LOG_LEVEL='warning')
+    server = subprocess.Popen(
+        [sys.executable, 'server.py', '--host', '127.0.0.1', '--port', str(port), '--uds', uds],
+        cwd=SERVICE_DIR, env=env,
+    )
+    probe = ExtractClient(f'unix://{uds}', timeout=1)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if probe.request('GET', '/health')[0] == 200:
+                probe.close()
+                return server
+        except OSError:
+            pass
+        time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("server did not become healthy")
+
+
+def measure(url: str, pooled: bool, path: str, body: bytes, count: int, warmup: int) -> list:
+    """Round-trip times in microseconds."""
+    # Without pooling, a fresh client (and connection) per request
+    client = ExtractClient(url, pool_size=1)
+    method = 'POST' if path == '/extract' else 'GET'
+    headers = {'Content-Type': 'application/json'}
+    timings = []
+    for i in range(warmup + count):
+        if not pooled:
+            client = ExtractClient(url, pool_size=1)
+        started = time.perf_counter()
+        status, _ = client.request(method, path, body if method == 'POST' else None, headers)
+        elapsed = (time.perf_counter() - started) * 1_000_000
+        if not pooled:
+            client.close()
+        if status != 200:
+            raise RuntimeError(f"{url}{path} returned {status}")
+        if i >= warmup:
+            timings.append(elapsed)
+    client.close()
+    return timings
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=2000, help='Measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--port', type=int, default=8091)
+    parser.add_argument('--path', default='/extract', choices=('/extract', '/health'),
+                        help='/health measures transport alone')
+    args = parser.parse_args()
+
+    body = json.dumps({'html': REFERENCE_HTML, 'type': 'flight'}).encode('utf-8')
+    uds = os.path.join(tempfile.mkdtemp(prefix='extruct-bench-'), 'extruct.sock')
+    server = start_server(args.port, uds)
+    try:
+        scenarios = {
+            'tcp, new connection': (f'http://127.0.0.1:{args.port}', False),
+            'tcp, pooled': (f'http://127.0.0.1:{args.port}', True),
+            'uds, new connection': (f'unix://{uds}', False),
+            'uds, pooled': (f'unix://{uds}', True),
+        }
+        for name, (url, pooled) in scenarios.items():
+            measure(url, pooled, args.path, body, args.warmup, 0)
+        # Interleave scenarios in small batches so drift over the run
+        # (page cache, CPU frequency) does not favour one of them
+        results = {name: [] for name in scenarios}
+        for _ in range(max(args.requests // BATCH, 1)):
+            for name, (url, pooled) in scenarios.items():
+                results[name] += measure(url, pooled, args.path, body, BATCH, 0)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    baseline = statistics.median(results['tcp, new connection'])
+    sent = f"a {len(body)} byte email" if args.path == '/extract' else "no body"
+    print(f"{args.path} with {sent}, {args.requests} requests per scenario\n")
+    print(f"{'scenario':<22}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'vs tcp new':>12}")
+    for name, timings in results.items():
+        median = statistics.median(timings)
+        print(f"{name:<22}{median:>10.0f}{percentile(timings, 95):>10.0f}{percentile(timings, 99):>10.0f}"
+              f"{(median - baseline) / baseline:>+12.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
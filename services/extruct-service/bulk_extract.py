@@ -0,0 +1,229 @@
+"""
+Offline bulk re-extraction over .eml folders and mbox files.
+
+Runs historical confirmation emails through the same pipeline as
+POST /extract (pipeline.run_extraction), without HTTP, spread over all
+cores with a process pool. Results are written as JSONL, one line per
+email, and a throughput / method / completeness summary is printed at
+the end. Useful after changing an extractor or REQUIRED_FIELDS.
+
+Usage (from services/extruct-service):
+    python bulk_extract.py "../../sample data" --type auto -o results.jsonl
+    python bulk_extract.py archive.mbox --type flight -o flights.jsonl --resume
+"""
+
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Set, Tuple
+import argparse
+import email
+import email.policy
+import json
+import logging
+import mailbox
+import os
+import sys
+import time
+
+from pipeline import RESERVATION_TYPES, ExtractionResponse, extract_from_items, run_extraction
+import config
+import structured_data
+
+logger = logging.getLogger(__name__)
+
+AUTO = 'auto'
+
+
+def iter_sources(paths) -> Iterator[Tuple[str, Callable[[], bytes]]]:
+    """
+    Yield (source id, reader) for every email under the inputs.
+
+    Directories are walked for *.eml files; anything else is read as an
+    mbox. Readers return the raw message and are only called for emails
+    that still need processing. Source ids are stable across runs, which
+    is what --resume relies on.
+    """
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            for eml in sorted(path.rglob('*.eml')):
+                yield str(eml), eml.read_bytes
+        else:
+            box = mailbox.mbox(str(path), create=False)
+            try:
+                for key in box.iterkeys():
+                    yield f"{path}#{key}", lambda key=key: box.get_bytes(key)
+            finally:
+                box.close()
+
+
+def html_body(raw: bytes) -> Optional[str]:
+    """The text/html body of an email, or None if it has none."""
+    message = email.message_from_bytes(raw, policy=email.policy.default)
+    body = message.get_body(preferencelist=('html',))
+    if body is None:
+        return None
+    return body.get_content()
+
+
+def extract_auto(html: str, sparse: bool) -> Tuple[str, ExtractionResponse]:
+    """Parse once and try every reservation type; first success wins."""
+    data = structured_data.extract(html)
+    for reservation_type in RESERVATION_TYPES:
+        result = extract_from_items(data, reservation_type, sparse)
+        if result.success:
+            return reservation_type, result
+    return AUTO, ExtractionResponse(success=False, method="not-found")
+
+
+def process_one(source: str, raw: bytes, reservation_type: str, sparse: bool) -> Dict[str, Any]:
+    """Worker entry point: one email in, one JSONL record out."""
+    started = time.perf_counter()
+    try:
+        html = html_body(raw)
+        if html is None:
+            result = ExtractionResponse(success=False, method="not-found", error="No HTML body")
+        elif reservation_type == AUTO:
+            reservation_type, result = extract_auto(html, sparse)
+        else:
+            result = run_extraction(html, reservation_type, sparse)
+    except Exception as e:
+        result = ExtractionResponse(success=False, method="not-found", error=str(e))
+
+    return {
+        'source': source,
+        'type': reservation_type,
+        'elapsedMs': round((time.perf_counter() - started) * 1000, 2),
+        **result.model_dump(exclude_none=sparse),
+    }
+
+
+def _init_worker():
+    # Same prewarm the HTTP workers do, so timings are comparable
+    from reference_index import get_index
+    get_index()
+    run_extraction(structured_data.REFERENCE_HTML, 'flight')
+
+
+def load_done(output: Path) -> Set[str]:
+    """Sources already present in an output file (for --resume)."""
+    done = set()
+    if not output.exists():
+        return done
+    with open(output, encoding='utf-8') as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)['source'])
+            except (ValueError, KeyError):
+                continue  # Partially written last line from an interrupted run
+    return done
+
+
+def trim_partial_line(output: Path):
+    """Cut a partial last line left by an interrupted run, so appended records start on their own line."""
+    if not output.exists():
+        return
+    with open(output, 'rb+') as f:
+        end = pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            start = max(pos - 64 * 1024, 0)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b'\n')
+            if newline != -1:
+                pos = start + newline + 1
+                break
+            pos = start
+        if pos != end:
+            f.truncate(pos)
+
+
+class Summary:
+    """Throughput, method and completeness stats for a run."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.skipped = 0
+        self.methods = Counter()
+        self.types = Counter()
+        self.completeness = Counter()
+        self.elapsed_ms = 0.0
+
+    def add(self, record: Dict[str, Any]):
+        self.count += 1
+        self.methods[record.get('method') or 'none'] += 1
+        if record.get('success'):
+            self.types[record['type']] += 1
+        score = record.get('completeness') or 0.0
+        bucket = '>=0.8' if score >= 0.8 else '0.5-0.8' if score >= 0.5 else '<0.5'
+        self.completeness[bucket] += 1
+        self.elapsed_ms += record.get('elapsedMs', 0.0)
+
+    def report(self) -> str:
+        wall = time.perf_counter() - self.started
+        lines = [
+            f"Processed:   {self.count} emails ({self.skipped} skipped as already done)",
+            f"Wall time:   {wall:.2f}s ({self.count / wall if wall else 0:.1f} emails/s)",
+            f"Mean time:   {self.elapsed_ms / self.count if self.count else 0:.1f} ms per email",
+            "Methods:     " + ', '.join(f"{k}={v}" for k, v in self.methods.most_common()),
+            "Completeness: " + ', '.join(f"{k}: {self.completeness[k]}" for k in ('>=0.8', '0.5-0.8', '<0.5')),
+        ]
+        if self.types:
+            lines.append("Extracted:   " + ', '.join(f"{k}={v}" for k, v in self.types.most_common()))
+        return '\n'.join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('inputs', nargs='+', help='Directories of .eml files and/or mbox files')
+    parser.add_argument('-t', '--type', default=AUTO, choices=(AUTO,) + RESERVATION_TYPES,
+                        help='Reservation type to extract (default: auto, try every type)')
+    parser.add_argument('-o', '--output', type=Path, required=True, help='JSONL file to write')
+    parser.add_argument('-j', '--workers', type=int, default=config.available_cpus(),
+                        help='Worker processes (default: CPUs this process may use)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip emails already in the output file and append to it')
+    parser.add_argument('--sparse', action='store_true', help='Leave empty fields out of results')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    done = set()
+    if args.resume:
+        done = load_done(args.output)
+        trim_partial_line(args.output)
+    summary = Summary()
+    # Bound in-flight work so huge archives are streamed, not loaded
+    max_pending = args.workers * 4
+
+    # Line-buffered so an interrupted run leaves only whole lines behind
+    with open(args.output, 'a' if args.resume else 'w', encoding='utf-8', buffering=1) as out, \
+            ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+        pending = set()
+
+        def drain():
+            nonlocal pending
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                summary.add(record)
+
+        for source, read in iter_sources(args.inputs):
+            if source in done:
+                summary.skipped += 1
+                continue
+            pending.add(pool.submit(process_one, source, read(), args.type, args.sparse))
+            if len(pending) >= max_pending:
+                drain()
+        while pending:
+            drain()
+
+    print(summary.report())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,419 @@
+"""
+Opt-in capture of real /extract traffic into a replay corpus.
+
+A sample of requests is kept, with personal data redacted, together with
+the response and timings the service produced, in gzipped JSONL files on
+local disk. replay.py feeds the corpus back through the pipeline to
+compare output and latency between versions.
+
+Redaction runs on a background thread, off the request path:
+- Names, confirmation/ticket/membership numbers, emails and phone numbers
+  are read from the email's own structured data (underName, reservationNumber,
+  ...) and from the extraction result (guestName, confirmationNumber, ...).
+  Every occurrence in the HTML is then masked, including HTML- and
+  JSON-escaped ones, and each word of a name is masked separately.
+- The email's visible text is searched for values after labels
+  ("Booking No:", "Dear Mr ...", "Lead guest:", "eTicket number:"),
+  SURNAME/GIVEN names and 13-digit ticket numbers, which are masked the
+  same way.
+- Email addresses and phone numbers are also masked wherever regexes find them.
+Masks keep the shape of the value (letters become X/x and digits 0), so
+extractors and completeness scoring see the same structure. A request in
+which none of these finds anything is not captured: more likely its
+personal data is in a form they miss than that it has none.
+
+Settings (environment):
+    EXTRACT_CAPTURE_DIR          corpus directory; empty disables capture (default)
+    EXTRACT_CAPTURE_SAMPLE_RATE  fraction of requests captured (default: 0.01)
+    EXTRACT_CAPTURE_FILE_MB      compressed size at which a file is rotated (default: 32)
+    EXTRACT_CAPTURE_MAX_MB       stop capturing once this much is on disk (default: 1024)
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+import gzip
+import html as html_lib
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import zlib
+
+from pipeline import ExtractionResponse
+import structured_data
+
+logger = logging.getLogger(__name__)
+
+# Requests waiting to be redacted and written; more than this are dropped
+QUEUE_SIZE = 64
+# Flush the current file after this many seconds without new records
+FLUSH_INTERVAL = 5.0
+
+# Keys whose whole subtree identifies a person (structured data and results)
+PII_SUBTREE_KEYS = {'underName', 'programMembershipUsed', 'passengers', 'guests'}
+# Keys whose string value identifies a person or booking
+PII_VALUE_KEYS = {
+    'reservationNumber', 'reservationId', 'confirmationNumber', 'ticketNumber', 'ticketToken',
+    'membershipNumber', 'email', 'telephone', 'givenName', 'familyName',
+    'passengerName', 'guestName', 'contactEmail', 'contactPhone', 'driverName', 'driverPhone',
+    'plateNumber',
+}
+# Of those, the ones holding names, whose words are masked on their own too
+NAME_KEYS = PII_SUBTREE_KEYS | {'givenName', 'familyName', 'passengerName', 'guestName', 'driverName'}
+# Shorter values ("Mr", "1") are too likely to match unrelated text
+MIN_VALUE_LENGTH = 3
+
+_EMAIL = re.compile(r'[\w.+%-]+@([\w-]+(?:\.[\w-]+)+)')
+_PHONE = re.compile(
+    r'(?<![\w+])\+\d[\d ().-]{6,}\d(?!\w)'            # +44 20 7946 0958
+    r'|(?<![\w(])\(\d{3}\) ?\d{3}[-. ]\d{4}(?!\w)'    # (415) 555-0132
+    r'|(?<![\w-])\d{3}[-.]\d{3}[-.]\d{4}(?![\w-])'    # 415-555-0132
+    r'|(?<![\w+(])\d{1,3} ?\(0\)[\d \xa0().-]{6,}\d(?!\w)'  # 81(0) 90 8908 9969
+)
+# HTML entities and JSON escapes
+_ESCAPE = re.compile(r'&#?\w+;|\\u[0-9a-fA-F]{4}|\\.')
+# Kept intact by mask(): escapes, and tags inside a value ("Alex</b> Kaplinsky")
+_KEEP = re.compile(rf'<[^>]*>|{_ESCAPE.pattern}')
+
+# Free text: tags and comment markers become line breaks, so a name
+# never runs on into the next element's label
+_TAG = re.compile(r'<!--|-->|<[^>]*>')
+_TITLE = r'(?:(?:Mr|Mrs|Ms|Miss|Mx|Dr|Prof|MR|MRS|MS)\.?\s+)?'
+# Up to four capitalized words on one line
+_NAME = r"[A-Z][\w'’-]*(?:[ \t]+[A-Z][\w'’-]*){0,3}"
+_GREETING = re.compile(rf'\b(?:Dear|Hi|Hello|[Rr]eserved for|[Bb]ooked for)\s+{_TITLE}({_NAME})')
+_NAME_LABEL = re.compile(
+    r'(?i:\b(?:lead\s+)?(?:passenger|traveller|traveler|guest|driver|customer)s?(?:\s+name)?'
+    r'|(?<![^\W\d_]\s)\bname)'          # "Name:", but not "Hotel name:"
+    rf'\s*[:：]\s*{_TITLE}({_NAME})'
+)
+_NUMBER_LABEL = re.compile(
+    r'(?i:\b(?:confirmation|booking|reservation|itinerary|record\s+locator|pnr|e-?ticket|ticket'
+    r'|frequent\s+flyer|membership)(?:\s+(?:number|no|code|ref|reference|id))?)'
+    r'\.?[ \t]*([:：#]?)\s*([A-Z0-9][A-Z0-9-]{3,})(?![\w-])'
+)
+_SURNAME_GIVEN = re.compile(r"(?<![\w/])([A-Z][A-Z'-]+)/([A-Z][A-Z' -]*[A-Z])(?![\w/])")
+_TICKET_NUMBER = re.compile(r'(?<![\w-])\d{3}-?\d{10}(?![\w-])')
+# Greeting and label words that are not names ("Dear Guest,")
+_NOT_NAMES = {'Guest', 'Guests', 'Customer', 'Traveler', 'Traveller', 'Passenger', 'Member',
+              'Sir', 'Madam', 'Valued', 'All', 'There', 'Team'}
+
+
+def _mask_plain(text: str) -> str:
+    return ''.join(
+        ('X' if c.isupper() else 'x') if c.isalpha() else '0' if c.isdigit() else c
+        for c in text
+    )
+
+
+def mask(value: str) -> str:
+    """Same-shape placeholder: letters become X/x, digits 0, the rest is kept."""
+    masked, last = [], 0
+    for escape in _KEEP.finditer(value):
+        masked += [_mask_plain(value[last:escape.start()]), escape.group(0)]
+        last = escape.end()
+    masked.append(_mask_plain(value[last:]))
+    return ''.join(masked)
+
+
+def pii_values(tree: Any) -> Set[str]:
+    """Identifying strings in parsed structured data or a result dict."""
+    values: Set[str] = set()
+
+    def add(value: Any, name: bool):
+        if isinstance(value, str):
+            value = value.strip()
+            if len(value) < MIN_VALUE_LENGTH or value.startswith(('http://', 'https://')):
+                return
+            values.add(value)
+            if name and '@' not in value and not any(c.isdigit() for c in value):
+                # "Dear Jane," when the markup says "DOE/JANE"
+                values.update(w for w in re.findall(r'\w+', value) if len(w) >= MIN_VALUE_LENGTH)
+        elif isinstance(value, dict):
+            for key, child in value.items():
+                if not key.startswith('@') and key != 'type':
+                    add(child, name)
+        elif isinstance(value, list):
+            for child in value:
+                add(child, name)
+
+    def walk(node: Any):
+        if isinstance(node, dict):
+            for key, child in node.items():
+                if key in PII_SUBTREE_KEYS or key in PII_VALUE_KEYS:
+                    add(child, key in NAME_KEYS)
+                else:
+                    walk(child)
+        elif isinstance(node, list):
+            for child in node:
+                walk(child)
+
+    walk(tree)
+    return values
+
+
+def visible_text(html: str) -> str:
+    """Text of an HTML document, one line per tag boundary; comments are kept."""
+    return html_lib.unescape(_TAG.sub('\n', html))
+
+
+def free_text_values(text: str) -> Set[str]:
+    """Identifying strings found by label and shape in plain text."""
+    values: Set[str] = set()
+
+    def add_name(name: str):
+        words = [w for w in name.split() if w not in _NOT_NAMES]
+        if words:
+            values.add(' '.join(words))
+            values.update(w for w in words if len(w) >= MIN_VALUE_LENGTH)
+
+    for pattern in (_GREETING, _NAME_LABEL):
+        for match in pattern.finditer(text):
+            add_name(match.group(1))
+    for match in _SURNAME_GIVEN.finditer(text):
+        surname, given = match.group(1), match.group(2)
+        # Leaves airport and currency pairs (SFO/HND, USD/JPY, AM/PM) alone
+        if max(len(surname), len(given.split()[0])) > 3:
+            values.add(match.group(0))
+            add_name(f"{surname} {given}")
+    for match in _NUMBER_LABEL.finditer(text):
+        separator, value = match.groups()
+        # Without "No:" or "#", only a value with a digit ("Reservation CONFIRMED")
+        if separator or any(c.isdigit() for c in value):
+            values.add(value)
+    values.update(m.group(0) for m in _TICKET_NUMBER.finditer(text))
+    # A number may be split across elements: "81(0)&nbsp;</span>90 8908 9969"
+    values.update(m.group(0) for m in _PHONE.finditer(' '.join(text.split())))
+    return {v for v in values if len(v) >= MIN_VALUE_LENGTH}
+
+
+def _value_pattern(value: str) -> str:
+    """
+    Regex for a value as written in text, HTML or a JSON-LD string.
+
+    Any character other than an ASCII letter or digit may also appear as
+    an entity or escape (O&#39;Brien, Zo\\u00eb), and spaces as any run of
+    whitespace, &nbsp; or tags.
+    """
+    parts = []
+    for c in ' '.join(value.split()):
+        if c == ' ':
+            parts.append(r'(?:\s|&nbsp;|&#160;|<[^>]*>)+')
+        elif c.isascii() and c.isalnum():
+            parts.append(c)
+        else:
+            parts.append(f'(?:{re.escape(c)}|{_ESCAPE.pattern})')
+    return ''.join(parts)
+
+
+class Redactor:
+    """Masks a fixed set of identifying values, plus emails and phone numbers."""
+
+    def __init__(self, values: Set[str]):
+        self._values = None
+        if values:
+            # Longest first, so "Jane Doe" is replaced before "Jane"
+            alternatives = '|'.join(_value_pattern(v) for v in sorted(values, key=len, reverse=True))
+            self._values = re.compile(rf'(?<!\w)(?:{alternatives})(?!\w)', re.IGNORECASE)
+
+    def text(self, text: str) -> str:
+        if self._values is not None:
+            text = self._values.sub(lambda m: mask(m.group(0)), text)
+        text = _EMAIL.sub(lambda m: mask(m.group(0)[:m.start(1) - m.start(0)]) + m.group(1), text)
+        return _PHONE.sub(lambda m: mask(m.group(0)), text)
+
+    def tree(self, node: Any) -> Any:
+        """Redact every string in a JSON-like structure."""
+        if isinstance(node, str):
+            return self.text(node)
+        if isinstance(node, dict):
+            return {key: self.tree(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [self.tree(value) for value in node]
+        return node
+
+
+def redact(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Redact a captured record's HTML and result in place.
+
+    Returns None, and the record must not be kept, if no identifying
+    value was found in it.
+    """
+    try:
+        values = pii_values(structured_data.extract(record['html']))
+    except Exception:
+        values = set()
+    values |= pii_values(record.get('result'))
+    values |= free_text_values(visible_text(record['html']))
+    text = (record.get('result') or {}).get('text')
+    if isinstance(text, str):
+        values |= free_text_values(text)
+    if not values:
+        return None
+    redactor = Redactor(values)
+    record['html'] = redactor.text(record['html'])
+    record['result'] = redactor.tree(record.get('result'))
+    return record
+
+
+class CorpusWriter:
+    """
+    Samples requests and appends them, redacted, to the corpus.
+
+    offer() is the only call on the request path: a sampling decision and
+    a non-blocking queue put. If the writer falls behind, records are
+    dropped rather than queued without bound. Each process writes its own
+    files (capture-<time>-<pid>.jsonl.gz), so server.py workers never
+    share one.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: float,
+        version: str,
+        file_bytes: int = 32 * 1024 * 1024,
+        max_bytes: int = 1024 * 1024 * 1024,
+    ):
+        self.directory = Path(directory)
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.version = version
+        self.file_bytes = file_bytes
+        self.max_bytes = max_bytes
+        self.captured = 0
+        self.dropped = 0
+        self.failed = 0
+        # Not captured because redaction found nothing to mask
+        self.unredacted = 0
+        # Compressed bytes in the corpus directory, as last seen by the writer
+        self.corpus_bytes = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._raw = None
+        self._file: Optional[gzip.GzipFile] = None
+        self._base_bytes = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def offer(self, html: str, reservation_type: str, sparse: bool, result: ExtractionResponse, context: Dict[str, Any]):
+        """Maybe capture one finished request."""
+        if random.random() >= self.sample_rate or self._full():
+            return
+        record = {
+            'id': context.get('requestId'),
+            'capturedAt': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'version': self.version,
+            'type': reservation_type,
+            'sparse': sparse,
+            'size': len(html),
+            'html': html,
+            'result': result.model_dump(exclude_none=True),
+            'timings': {
+                key: context[key] for key in ('queueMs', 'parseMs', 'extractMs', 'totalMs') if key in context
+            },
+        }
+        self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sampleRate": self.sample_rate,
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "unredacted": self.unredacted,
+            "corpusBytes": self.corpus_bytes,
+        }
+
+    def stop(self):
+        """Write out everything queued and close the current file."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='corpus-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                record = self._queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                # Idle: make what was written so far readable
+                if self._file is not None:
+                    self._file.flush()
+                continue
+            if record is None:
+                break
+            try:
+                redacted = redact(record)
+                if redacted is None:
+                    self.unredacted += 1
+                    continue
+                self._write(redacted)
+                self.captured += 1
+            except Exception as e:
+                self.failed += 1
+                logger.warning("Could not capture request %s: %s", record.get('id'), e)
+        self._close()
+
+    def _write(self, record: Dict[str, Any]):
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Includes other workers' files and earlier runs
+            self._base_bytes = self.corpus_bytes = sum(p.stat().st_size for p in self.directory.glob('*.jsonl.gz'))
+            if self._full():
+                self.dropped += 1
+                logger.warning("Capture corpus in %s is full, no longer capturing", self.directory)
+                return
+            stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+            path = self.directory / f"capture-{stamp}-{os.getpid()}.jsonl.gz"
+            self._raw = open(path, 'wb')
+            self._file = gzip.GzipFile(filename='', mode='wb', fileobj=self._raw, compresslevel=6)
+            logger.info("Capturing requests to %s", path)
+        self._file.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+        self.corpus_bytes = self._base_bytes + self._raw.tell()
+        if self._raw.tell() >= self.file_bytes or self._full():
+            self._close()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self.corpus_bytes = self._base_bytes + self._raw.tell()
+            self._raw.close()
+            self._file = self._raw = None
+
+    def _full(self) -> bool:
+        return bool(self.max_bytes) and self.corpus_bytes >= self.max_bytes
+
+
+def iter_corpus(paths: List[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Records from corpus files, or directories of them, in a stable order.
+
+    A file cut short (the worker was killed mid-write) yields every
+    complete record before the cut.
+    """
+    files = []
+    for path in paths:
+        path = Path(path)
+        files.extend(sorted(path.glob('*.jsonl.gz')) if path.is_dir() else [path])
+    for path in files:
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        break  # Partially written last line
+        except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+            logger.warning("%s is truncated (%s); using the records before the cut", path, e)
@@ -0,0 +1,165 @@
+"""
+Reference Python client for the extruct service.
+
+Keeps a small pool of persistent HTTP/1.1 connections, over TCP or a
+Unix domain socket (see SERVER_UDS in server.py), so callers pay for
+connection setup once instead of on every extraction. Uses only the
+standard library.
+
+Usage:
+    from client import ExtractClient
+
+    with ExtractClient('unix:///run/extruct/extruct.sock') as client:
+        result = client.extract(html, 'flight', timeout_ms=1500)
+        if result['success'] and result['completeness'] >= 0.8:
+            ...
+
+    ExtractClient('http://localhost:8001', pool_size=8, timeout=5)
+"""
+
+from typing import Any, Dict, Optional
+from urllib.parse import unquote, urlsplit
+import gzip
+import http.client
+import json
+import queue
+import socket
+
+# Bodies above this are gzipped (Content-Encoding, see compression.py)
+COMPRESS_MIN_BYTES = 16 * 1024
+
+# A pooled connection the server already closed (idle timeout, worker
+# recycled) fails with one of these on reuse; the request is retried once
+# on a fresh connection.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket."""
+
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class ExtractClient:
+    """
+    Pooled, thread-safe client for POST /extract.
+
+    `url` is `http://host:port` or `unix:///path/to/socket`. At most
+    `pool_size` idle connections are kept; extra concurrent callers open
+    short-lived ones.
+    """
+
+    def __init__(self, url: str = 'http://localhost:8001', pool_size: int = 4, timeout: float = 5.0):
+        parts = urlsplit(url)
+        if parts.scheme == 'unix':
+            path = unquote(parts.netloc + parts.path)
+            self._connect = lambda: UnixHTTPConnection(path, timeout=timeout)
+        elif parts.scheme == 'http':
+            host, port = parts.hostname or 'localhost', parts.port or 80
+            self._connect = lambda: http.client.HTTPConnection(host, port, timeout=timeout)
+        else:
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+
+    def extract(
+        self,
+        html: str,
+        reservation_type: str,
+        sparse: Optional[bool] = None,
+        request_id: Optional[str] = None,
+        timeout_ms: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Extract a reservation; returns the parsed response body.
+
+        `timeout_ms` is sent as X-Timeout-Ms: the service stops working on
+        the request once it passes and answers 504 with any partial result.
+        Keep it below the client's socket `timeout`.
+
+        Non-2xx responses (503 overloaded, 504 timeout, 413, ...) are
+        returned as-is rather than raised, so callers can fall back the
+        same way they do for not-found.
+        """
+        payload = {'html': html, 'type': reservation_type}
+        if sparse is not None:
+            payload['sparse'] = sparse
+        body = json.dumps(payload).encode('utf-8')
+
+        headers = {'Content-Type': 'application/json'}
+        if len(body) > COMPRESS_MIN_BYTES:
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        if request_id:
+            headers['X-Request-ID'] = request_id
+        if timeout_ms is not None:
+            headers['X-Timeout-Ms'] = str(int(timeout_ms))
+
+        status, data = self.request('POST', '/extract', body, headers)
+        result = json.loads(data)
+        if status >= 400 and 'success' not in result:
+            result = {'success': False, 'method': None, 'error': result.get('detail', f"HTTP {status}")}
+        return result
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None):
+        """Send one request on a pooled connection; returns (status, body bytes)."""
+        conn, reused = self._acquire()
+        try:
+            try:
+                response = self._send(conn, method, path, body, headers)
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                conn.close()
+                conn = self._connect()
+                response = self._send(conn, method, path, body, headers)
+            data = response.read()
+        except Exception:
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+        return response.status, data
+
+    def close(self):
+        """Close all idle pooled connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def __enter__(self) -> 'ExtractClient':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _send(self, conn, method, path, body, headers) -> http.client.HTTPResponse:
+        conn.request(method, path, body=body, headers=headers or {})
+        return conn.getresponse()
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return self._connect(), False
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
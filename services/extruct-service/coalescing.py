@@ -0,0 +1,113 @@
+"""
+Single-flight coalescing of identical concurrent requests.
+
+Quick Add double-submits and client retries often send the same HTML
+several times within milliseconds. Instead of parsing each copy, the
+first request for a key runs the work and every concurrent duplicate
+waits on that same in-flight computation.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+import asyncio
+import hashlib
+import logging
+
+from deadlines import Deadline, DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# The shared computation stops this long (seconds) before the callers'
+# deadline, so it can still answer with its partial result and a text
+# rendition (a few ms to parse and render) in time
+ANSWER_MARGIN = 0.05
+
+
+def content_key(html: str, reservation_type: str) -> tuple:
+    """Coalescing key for an extraction: reservation type + content hash."""
+    digest = hashlib.blake2b(html.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+    return (reservation_type, digest)
+
+
+class _Flight:
+    __slots__ = ('task', 'deadline', 'waiters')
+
+    def __init__(self, task: asyncio.Future, deadline: Deadline):
+        self.task = task
+        self.deadline = deadline
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time.
+
+    The computation is started as its own task, so it may hand work to
+    any executor (threadpool, process pool) and is not cancelled when
+    the request that started it goes away; the remaining waiters still
+    get its result. Keys are forgotten as soon as the computation
+    finishes or is cancelled, so this never serves stale results.
+
+    The computation gets its own Deadline, just ahead of the first
+    caller's and pushed out to the latest deadline of any caller that
+    joins. It is cancelled once every caller has gone (disconnected or
+    timed out), so nobody keeps paying for work no one will read.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[Deadline], Awaitable[T]], deadline: Deadline) -> T:
+        """
+        Await fn(shared deadline) for key, joining an identical in-flight call.
+
+        Raises DeadlineExceeded if this caller's deadline passes first;
+        the shared computation carries on for any other waiters.
+        """
+        flight = self._inflight.get(key)
+        if flight is None:
+            shared = deadline.earlier(ANSWER_MARGIN)
+            flight = _Flight(asyncio.ensure_future(fn(shared)), shared)
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda done: self._forget(key, done))
+            self.leaders += 1
+        else:
+            flight.deadline.extend(deadline.earlier(ANSWER_MARGIN))
+            self.coalesced += 1
+            logger.debug("Coalesced request onto in-flight %s", key[0] if isinstance(key, tuple) else key)
+
+        flight.waiters += 1
+        try:
+            # Shield so one waiter being cancelled does not cancel the
+            # shared computation for the others.
+            return await asyncio.wait_for(asyncio.shield(flight.task), timeout=deadline.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded('response') from None
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                flight.deadline.cancel()
+                # Forget it now rather than when its task unwinds, so a
+                # retry of the same content starts a fresh computation
+                # instead of joining the cancelled one
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """In-flight computations and lifetime counters."""
+        return {
+            'inFlight': len(self._inflight),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+        }
+
+    def _forget(self, key: Hashable, done: asyncio.Future):
+        flight = self._inflight.get(key)
+        if flight is not None and flight.task is done:
+            del self._inflight[key]
+        # Mark any exception as retrieved in case every waiter went away.
+        if not done.cancelled():
+            done.exception()
@@ -0,0 +1,320 @@
+"""
+Compressed request bodies (Content-Encoding: gzip / deflate / br / zstd).
+
+Confirmation emails compress 5-10x, so callers may send /extract bodies
+compressed. Bodies are decompressed incrementally as they arrive, and the
+decompressed size is capped: every decoder call is bounded, so a small
+zip-bomb style body is rejected once it passes the cap instead of being
+inflated into memory first.
+
+Brotli and zstd are optional; without the `brotli` / `zstandard`
+packages those encodings get a 415 and callers send plain bodies.
+
+Usage:
+    app.router.route_class = DecompressingRoute   # before declaring routes
+"""
+
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+import logging
+import zlib
+
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+
+import config
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# zlib window bits for a gzip header and trailer
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+class BodyTooLarge(Exception):
+    """Decompressed body exceeded the configured cap."""
+
+
+class UnsupportedEncoding(Exception):
+    """Content-Encoding we cannot decode."""
+
+
+class CorruptBody(Exception):
+    """Body does not decode with its declared encoding."""
+
+
+class _ZlibDecoder:
+    """
+    gzip and deflate; zlib bounds each call's output with max_length.
+
+    A gzip body may hold several members (concatenated .gz files), which
+    are decoded in turn. Anything else after the end of the stream is
+    rejected rather than silently dropped.
+    """
+
+    def __init__(self, wbits: int):
+        self._wbits = wbits
+        self._decompressor = zlib.decompressobj(wbits)
+
+    def decompress(self, data: bytes, max_length: int) -> Iterator[bytes]:
+        while data:
+            if self._decompressor.eof:
+                if self._wbits != GZIP_WBITS:
+                    raise CorruptBody("data after end of stream")
+                # zlib rejects it if this is not another gzip member
+                self._decompressor = zlib.decompressobj(self._wbits)
+            yield self._decompressor.decompress(data, max_length)
+            data = self._decompressor.unconsumed_tail or self._decompressor.unused_data
+
+    def finish(self):
+        if not self._decompressor.eof:
+            raise CorruptBody("truncated stream")
+
+
+class _BrotliDecoder:
+    def __init__(self):
+        self._decompressor = brotli.Decompressor()
+
+    def decompress(self, data: bytes, max_length: int) -> Iterator[bytes]:
+        yield self._decompressor.process(data, output_buffer_limit=max_length)
+        # Output was capped; drain what is buffered before taking more input
+        while not self._decompressor.can_accept_more_data():
+            yield self._decompressor.process(b'', output_buffer_limit=max_length)
+
+    def finish(self):
+        if not self._decompressor.is_finished():
+            raise CorruptBody("truncated stream")
+
+
+class _ZstdDecoder:
+    """
+    zstd, fed to the decompressor one block at a time.
+
+    zstandard's streaming decompressor has no output limit, but a zstd
+    block never decodes to more than 128 KiB. Input is cut at the block
+    boundaries given by the 3-byte block headers, so each call's output
+    is bounded while whole blocks (usually tens of KB of input) are
+    decoded at once. Concatenated frames are decoded in turn and
+    skippable frames are skipped; anything else between frames is rejected.
+    """
+
+    MAGIC = b'\x28\xb5\x2f\xfd'
+    BLOCK_MAX = 128 * 1024
+
+    def __init__(self):
+        self._pending = bytearray()
+        self._decompressor = None   # For the frame being decoded
+        self._checksum_next = False
+        self._skip = 0              # Bytes left of a skippable frame
+        self._frames = 0
+
+    def decompress(self, data: bytes, max_length: int) -> Iterator[bytes]:
+        self._pending += data
+        pos = 0
+        try:
+            while pos < len(self._pending):
+                if self._skip:
+                    skipped = min(self._skip, len(self._pending) - pos)
+                    self._skip -= skipped
+                    pos += skipped
+                    continue
+                size = self._unit_size(pos)
+                if size is None or pos + size > len(self._pending):
+                    break  # Rest of the unit has not arrived yet
+                unit = bytes(self._pending[pos:pos + size])
+                pos += size
+                if self._decompressor is None:
+                    self._start_frame(unit)
+                    continue
+                yield self._decompressor.decompress(unit)
+                if self._checksum_next:
+                    if not self._decompressor.eof:
+                        raise CorruptBody("frame continues after its checksum")
+                    self._checksum_next = False
+                elif unit[0] & 1 and not self._decompressor.eof:
+                    # Last block (bit 0 of its header) of a frame with a checksum
+                    self._checksum_next = True
+                if self._decompressor.eof:
+                    self._decompressor = None
+        finally:
+            del self._pending[:pos]
+
+    def finish(self):
+        if self._pending or self._skip or self._decompressor is not None or not self._frames:
+            raise CorruptBody("truncated stream")
+
+    def _unit_size(self, pos: int) -> Optional[int]:
+        """
+        Bytes in the next unit: a frame header, one block (header and
+        content) or a frame checksum. None until enough has arrived to tell.
+        """
+        available = len(self._pending) - pos
+        if self._decompressor is None:
+            if available < 8:
+                return None
+            magic = bytes(self._pending[pos:pos + 4])
+            if _is_skippable(magic):
+                return 8
+            if magic != self.MAGIC:
+                raise CorruptBody("data between zstd frames")
+            # The header is at most 18 bytes; its first 5 give its size
+            return zstandard.frame_header_size(bytes(self._pending[pos:pos + 18]))
+        if self._checksum_next:
+            return 4
+        if available < 3:
+            return None
+        header = int.from_bytes(self._pending[pos:pos + 3], 'little')
+        block_type, block_size = (header >> 1) & 3, header >> 3
+        if block_size > self.BLOCK_MAX:
+            raise CorruptBody("zstd block larger than 128 KiB")
+        # RLE blocks store one byte, repeated block_size times
+        return 3 + (1 if block_type == 1 else block_size)
+
+    def _start_frame(self, header: bytes):
+        if _is_skippable(header[:4]):
+            self._skip = int.from_bytes(header[4:8], 'little')
+            return
+        self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+        self._decompressor.decompress(header)
+        self._frames += 1
+
+
+def _is_skippable(magic: bytes) -> bool:
+    """zstd skippable frame magic: 0x184D2A50 to 0x184D2A5F."""
+    return magic[1:] == b'\x2a\x4d\x18' and magic[0] & 0xF0 == 0x50
+
+
+def _decoder_for(encoding: str):
+    if encoding in ('gzip', 'x-gzip'):
+        return _ZlibDecoder(GZIP_WBITS)
+    if encoding == 'deflate':
+        return _ZlibDecoder(zlib.MAX_WBITS)
+    if encoding == 'br' and brotli is not None:
+        return _BrotliDecoder()
+    if encoding == 'zstd' and zstandard is not None:
+        return _ZstdDecoder()
+    raise UnsupportedEncoding(encoding)
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """Encodings this process can decode, for Accept-Encoding style hints."""
+    encodings = ('gzip', 'deflate')
+    if brotli is not None:
+        encodings += ('br',)
+    if zstandard is not None:
+        encodings += ('zstd',)
+    return encodings
+
+
+async def read_decompressed(chunks: AsyncIterator[bytes], encoding: str, limit: int) -> Tuple[bytes, int]:
+    """
+    Decompress a streamed body.
+
+    Returns (decompressed body, compressed bytes received). Raises
+    BodyTooLarge as soon as the output passes limit, UnsupportedEncoding
+    or CorruptBody.
+    """
+    decoder = _decoder_for(encoding)
+    body = bytearray()
+    received = 0
+    try:
+        async for chunk in chunks:
+            received += len(chunk)
+            # One byte over the remaining room is enough to detect overflow
+            for piece in decoder.decompress(chunk, limit - len(body) + 1):
+                body += piece
+                if len(body) > limit:
+                    raise BodyTooLarge(f"decompressed body exceeds {limit} bytes")
+        decoder.finish()
+    except (BodyTooLarge, CorruptBody):
+        raise
+    except Exception as e:
+        # zlib.error, brotli.error and zstandard.ZstdError share no base class
+        raise CorruptBody(str(e)) from e
+    return bytes(body), received
+
+
+class CompressionStats:
+    """Counters for compressed request bodies, exposed on /stats."""
+
+    def __init__(self):
+        self.requests: Dict[str, int] = {}
+        self.compressed_bytes = 0
+        self.decompressed_bytes = 0
+        self.rejected = 0
+
+    def record(self, encoding: str, compressed: int, decompressed: int):
+        self.requests[encoding] = self.requests.get(encoding, 0) + 1
+        self.compressed_bytes += compressed
+        self.decompressed_bytes += decompressed
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "requests": dict(self.requests),
+            "compressedBytes": self.compressed_bytes,
+            "decompressedBytes": self.decompressed_bytes,
+            "bytesSaved": self.decompressed_bytes - self.compressed_bytes,
+            "rejected": self.rejected,
+        }
+
+
+compression_stats = CompressionStats()
+
+
+class DecompressingRoute(APIRoute):
+    """
+    Route that decodes a compressed body before FastAPI parses it.
+
+    Plain bodies pass through untouched. For compressed ones the
+    per-request sizes are left on `request.state.compression` so the
+    endpoint can log them.
+    """
+
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def decompressing_route_handler(request: Request) -> Response:
+            encoding = request.headers.get('content-encoding', '').strip().lower()
+            if encoding and encoding != 'identity':
+                request = await _decompressed_request(request, encoding)
+            return await original_route_handler(request)
+
+        return decompressing_route_handler
+
+
+async def _decompressed_request(request: Request, encoding: str) -> Request:
+    try:
+        body, received = await read_decompressed(request.stream(), encoding, config.MAX_BODY_BYTES)
+    except BodyTooLarge as e:
+        compression_stats.rejected += 1
+        logger.warning("Rejected %s body: %s", encoding, e)
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedEncoding:
+        compression_stats.rejected += 1
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported Content-Encoding: {encoding}",
+            headers={"Accept-Encoding": ", ".join(supported_encodings())},
+        )
+    except CorruptBody as e:
+        compression_stats.rejected += 1
+        raise HTTPException(status_code=400, detail=f"Invalid {encoding} body: {e}")
+
+    compression_stats.record(encoding, received, len(body))
+    request.state.compression = {
+        'encoding': encoding,
+        'wireBytes': received,
+        'bytesSaved': len(body) - received,
+    }
+    # Starlette's Request.body() returns the cached _body when set
+    decoded = Request(request.scope, request.receive)
+    decoded._body = body
+    return decoded
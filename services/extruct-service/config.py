@@ -0,0 +1,147 @@
+"""
+Runtime configuration for the extruct service.
+
+All settings come from environment variables so they can be tuned per
+deployment (docker-compose, Dockerfile) without code changes.
+"""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def available_cpus() -> int:
+    """
+    CPUs this process can actually use.
+
+    os.cpu_count() is the host's count. This honours the CPU affinity mask
+    (docker --cpuset-cpus, taskset) and a cgroup v2 CPU quota (docker --cpus,
+    Kubernetes limits), rounded up.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available outside Linux
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+        if quota != 'max':
+            cpus = min(cpus, -(-int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+
+def _invalid(name: str, value: str, default):
+    logger.warning("Ignoring invalid %s=%r, using %r", name, value, default)
+    return default
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting, falling back to default if unset or invalid."""
+    value = os.environ.get(name, '').strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return _invalid(name, value, default)
+
+
+def env_octal(name: str, default: int) -> int:
+    """Read file permissions in octal (660, 0o660), falling back to default if unset or invalid."""
+    value = os.environ.get(name, '').strip()
+    if not value:
+        return default
+    try:
+        mode = int(value, 8)
+    except ValueError:
+        mode = -1
+    if not 0 <= mode <= 0o7777:
+        logger.warning("Ignoring invalid %s=%r, using %o", name, value, default)
+        return default
+    return mode
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting (1/true/yes/on), falling back to default if unset."""
+    value = os.environ.get(name, '').strip().lower()
+    if not value:
+        return default
+    return value in ('1', 'true', 'yes', 'on')
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting, falling back to default if unset or invalid."""
+    value = os.environ.get(name, '').strip()
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return _invalid(name, value, default)
+
+
+# Admission control for /extract
+# Number of concurrent extraction "units" the service will run at once, in
+# total: server.py splits it evenly between its worker processes
+MAX_CONCURRENCY = env_int('EXTRACT_MAX_CONCURRENCY', available_cpus() * 2)
+# How long (ms) a request may wait for capacity before it is shed
+QUEUE_TIMEOUT_MS = env_int('EXTRACT_QUEUE_TIMEOUT_MS', 250)
+# HTML bytes per extra unit of weight (0 disables size-aware weighting)
+SIZE_WEIGHT_BYTES = env_int('EXTRACT_SIZE_WEIGHT_BYTES', 0)
+
+
+def worker_concurrency() -> int:
+    """This process's share of MAX_CONCURRENCY (rounded up, at least 1)."""
+    return max(-(-MAX_CONCURRENCY // max(WORKER_PROCESSES, 1)), 1)
+
+
+# Time budget (ms) for requests that don't send one; 0 means no deadline
+DEFAULT_TIMEOUT_MS = env_int('EXTRACT_DEFAULT_TIMEOUT_MS', 0)
+
+# Text rendition for the AI fallback (text_rendition.py)
+# Max characters of email text returned with not-found; 0 disables it
+TEXT_BUDGET = env_int('EXTRACT_TEXT_BUDGET', 8000)
+
+# Compressed request bodies
+# Largest body (bytes, after decompression) accepted with a Content-Encoding
+MAX_BODY_BYTES = env_int('EXTRACT_MAX_BODY_BYTES', 8 * 1024 * 1024)
+
+# Response shape
+# Default for ExtractionRequest.sparse; off keeps the full-key dict shape
+SPARSE_DEFAULT = env_bool('EXTRACT_SPARSE_DEFAULT', False)
+
+# Traffic capture for replay (capture.py); an empty directory disables it
+CAPTURE_DIR = os.environ.get('EXTRACT_CAPTURE_DIR', '')
+CAPTURE_SAMPLE_RATE = env_float('EXTRACT_CAPTURE_SAMPLE_RATE', 0.01)
+# Rotate corpus files at this compressed size, stop capturing at this total
+CAPTURE_FILE_MB = env_int('EXTRACT_CAPTURE_FILE_MB', 32)
+CAPTURE_MAX_MB = env_int('EXTRACT_CAPTURE_MAX_MB', 1024)
+# Recorded with captured requests and replay results (e.g. image tag or git sha)
+SERVICE_VERSION = os.environ.get('EXTRACT_VERSION', '1.0.0')
+
+# Process manager (server.py)
+SERVER_HOST = os.environ.get('SERVER_HOST', '0.0.0.0')
+SERVER_PORT = env_int('SERVER_PORT', 8001)
+SERVER_WORKERS = env_int('SERVER_WORKERS', available_cpus())
+# Worker processes sharing MAX_CONCURRENCY; set by server.py in each worker
+WORKER_PROCESSES = 1
+# Recycle a worker after this many requests (+ up to the jitter); 0 disables
+SERVER_MAX_REQUESTS = env_int('SERVER_MAX_REQUESTS', 10000)
+SERVER_MAX_REQUESTS_JITTER = env_int('SERVER_MAX_REQUESTS_JITTER', 1000)
+# Recycle a worker once its RSS passes this many MB; 0 disables
+SERVER_MAX_RSS_MB = env_int('SERVER_MAX_RSS_MB', 400)
+# Seconds a retiring worker gets to finish in-flight requests
+SERVER_DRAIN_TIMEOUT = env_int('SERVER_DRAIN_TIMEOUT', 30)
+# Also listen on this Unix domain socket (empty disables), with these permissions
+SERVER_UDS = os.environ.get('SERVER_UDS', '')
+SERVER_UDS_MODE = env_octal('SERVER_UDS_MODE', 0o660)
+SERVER_BACKLOG = env_int('SERVER_BACKLOG', 2048)
+# Seconds an idle keep-alive connection is held open. Longer than callers'
+# pool idle timeouts, so the client closes idle connections, never the
+# server mid-reuse.
+SERVER_KEEP_ALIVE = env_int('SERVER_KEEP_ALIVE', 65)
+# HTTP/1.1 parser: httptools handles pipelined requests; auto prefers it
+SERVER_HTTP = os.environ.get('SERVER_HTTP', 'auto')
@@ -0,0 +1,80 @@
+"""
+Per-request deadlines and cooperative cancellation.
+
+Callers send a time budget (X-Timeout-Ms header or `timeoutMs` field);
+the Quick Add route gives up after 5 seconds, and work nobody waits for
+any more only delays the requests behind it. A Deadline travels with
+the extraction into the worker thread and is checked between pipeline
+stages (pre-scan, parse, each item, scoring). Once it expires, or is
+cancelled because every client waiting on it went away, the next check
+raises DeadlineExceeded and the pipeline stops there.
+"""
+
+from typing import Optional
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised at a stage boundary once the deadline has passed or was cancelled."""
+
+    def __init__(self, stage: str, reason: str = 'deadline'):
+        super().__init__(f"{reason} reached before {stage}")
+        self.stage = stage
+        self.reason = reason
+
+
+class Deadline:
+    """
+    Absolute expiry time (time.monotonic) plus a cancellation flag.
+
+    A Deadline without an expiry never expires but can still be
+    cancelled. Shared between the event loop and one worker thread; the
+    flag and expiry are single attribute writes, so no lock is needed.
+    """
+
+    __slots__ = ('expires_at', 'cancelled')
+
+    def __init__(self, expires_at: Optional[float] = None):
+        self.expires_at = expires_at
+        self.cancelled = False
+
+    @classmethod
+    def after(cls, timeout_ms: Optional[float]) -> 'Deadline':
+        """Deadline timeout_ms from now; no expiry if None or <= 0."""
+        if not timeout_ms or timeout_ms <= 0:
+            return cls()
+        return cls(time.monotonic() + timeout_ms / 1000)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None if there is no expiry."""
+        if self.cancelled:
+            return 0.0
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.cancelled or (self.expires_at is not None and time.monotonic() >= self.expires_at)
+
+    def check(self, stage: str):
+        """Raise DeadlineExceeded if work should stop before `stage`."""
+        if self.cancelled:
+            raise DeadlineExceeded(stage, 'cancelled')
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            raise DeadlineExceeded(stage)
+
+    def earlier(self, seconds: float) -> 'Deadline':
+        """A new Deadline expiring `seconds` before this one."""
+        if self.expires_at is None:
+            return Deadline()
+        return Deadline(self.expires_at - seconds)
+
+    def extend(self, other: 'Deadline'):
+        """Push the expiry out to other's, for work shared by several callers."""
+        if self.expires_at is None:
+            return
+        if other.expires_at is None or other.expires_at > self.expires_at:
+            self.expires_at = other.expires_at
+
+    def cancel(self):
+        self.cancelled = True
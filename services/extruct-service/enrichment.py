@@ -0,0 +1,51 @@
+"""
+Offline enrichment of extracted legs from the reference index.
+
+Airlines and rail operators often leave out the city, and parse_time
+drops the UTC offset, so flight and train legs are completed here with
+city, IANA timezone and coordinates from the in-process airport/station
+index. Values the provider supplied are never overwritten.
+"""
+
+from typing import Optional
+import logging
+
+from extractors.models import FlightReservation, Record, TrainReservation
+from reference_index import Place, get_index
+
+logger = logging.getLogger(__name__)
+
+
+def enrich(record: Record):
+    """Fill in place details on the legs of a flight or train reservation."""
+    index = get_index()
+    if index is None:
+        return
+
+    if isinstance(record, FlightReservation):
+        for flight in record.flights:
+            _apply(flight, 'departure', index.airport(flight.departure_airport))
+            _apply(flight, 'arrival', index.airport(flight.arrival_airport))
+    elif isinstance(record, TrainReservation):
+        for train in record.trains:
+            departure = index.station(train.departure_station_code) or index.station(train.departure_station)
+            arrival = index.station(train.arrival_station_code) or index.station(train.arrival_station)
+            _apply(train, 'departure', departure)
+            _apply(train, 'arrival', arrival)
+            if departure and not train.departure_station_code:
+                train.departure_station_code = departure.code
+            if arrival and not train.arrival_station_code:
+                train.arrival_station_code = arrival.code
+
+
+def _apply(leg: Record, prefix: str, place: Optional[Place]):
+    """Set <prefix>_city/_timezone/_latitude/_longitude where still empty."""
+    if place is None:
+        return
+    if not getattr(leg, f'{prefix}_city'):
+        setattr(leg, f'{prefix}_city', place.city)
+    if not getattr(leg, f'{prefix}_timezone'):
+        setattr(leg, f'{prefix}_timezone', place.timezone)
+    if getattr(leg, f'{prefix}_latitude') is None:
+        setattr(leg, f'{prefix}_latitude', place.latitude)
+        setattr(leg, f'{prefix}_longitude', place.longitude)
@@ -4,10 +4,11 @@ Base utilities for all extractors.
 Common functions for parsing dates, times, and handling schema.org data.
 """
 
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 from dateutil import parser as date_parser
 from datetime import datetime
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +31,7 @@ def parse_date(date_str: Any) -> str:
         dt = date_parser.parse(str(date_str))
         return dt.strftime('%Y-%m-%d')
     except (ValueError, TypeError) as e:
-        logger.warning(f"Failed to parse date '{date_str}': {e}")
+        logger.warning("Failed to parse date '%s': %s", date_str, e)
         return ""
 
 
@@ -52,7 +53,7 @@ def parse_time(datetime_str: Any) -> str:
         # Return in 12-hour format with AM/PM
         return dt.strftime('%-I:%M %p')  # e.g., "2:00 PM"
     except (ValueError, TypeError) as e:
-        logger.warning(f"Failed to parse time from '{datetime_str}': {e}")
+        logger.warning("Failed to parse time from '%s': %s", datetime_str, e)
         return ""
 
 
@@ -161,3 +162,55 @@ def get_city_state(location: Any) -> str:
                 return city
     
     return ""
+
+
+def get_place_name(place: Any) -> str:
+    """
+    Extract the name of a schema.org Place (or a plain string place).
+    """
+    if isinstance(place, str):
+        return place
+    if isinstance(place, dict):
+        return place.get('name', '') or ''
+    return ""
+
+
+def parse_int(value: Any, default: int) -> int:
+    """
+    Parse a count (party size, number of guests) that may be a string.
+    
+    Returns default if missing or not a number.
+    """
+    if isinstance(value, bool) or value in (None, ''):
+        return default
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def get_price(json_ld: Any) -> Tuple[float, str]:
+    """
+    Extract (total price, currency) from a schema.org Reservation.
+    
+    Handles totalPrice as a number, a string like "$1,234.50", or a
+    PriceSpecification; priceCurrency may be on either level.
+    Returns (0.0, '') if not present.
+    """
+    if not isinstance(json_ld, dict):
+        return 0.0, ""
+    
+    price = json_ld.get('totalPrice', '')
+    currency = json_ld.get('priceCurrency', '')
+    if isinstance(price, dict):
+        currency = currency or price.get('priceCurrency', '')
+        price = price.get('price', '')
+    
+    if isinstance(price, str):
+        price = re.sub(r'[^0-9.]', '', price.replace(',', ''))
+    try:
+        total = float(price) if price not in (None, '') else 0.0
+    except (ValueError, TypeError):
+        total = 0.0
+    
+    return total, currency if isinstance(currency, str) else ""
@@ -3,13 +3,14 @@
 from typing import Dict, Any
 import logging
 from .base_extractor import parse_date, parse_time, safe_get, get_person_name
+from .models import CarRentalReservation
 
 logger = logging.getLogger(__name__)
 
 
-def extract_car_rental_reservation(json_ld: Dict[str, Any]) -> Dict[str, Any]:
+def extract_car_rental_reservation(json_ld: Dict[str, Any]) -> CarRentalReservation:
     """Map schema.org RentalCarReservation to our schema"""
-    logger.info("Extracting RentalCarReservation from schema.org data")
+    logger.debug("Extracting RentalCarReservation from schema.org data")
     
     confirmation_number = json_ld.get('reservationNumber', '')
     guest_name = get_person_name(json_ld.get('underName', {}))
@@ -38,24 +39,17 @@ def extract_car_rental_reservation(json_ld: Dict[str, Any]) -> Dict[str, Any]:
     provider = json_ld.get('provider', {})
     company = safe_get(provider, 'name', default='')
     
-    return {
-        'confirmationNumber': confirmation_number,
-        'guestName': guest_name,
-        'company': company,
-        'vehicleClass': '',
-        'vehicleModel': vehicle_model or vehicle_name,
-        'pickupLocation': pickup_name,
-        'pickupAddress': '',
-        'pickupDate': pickup_date,
-        'pickupTime': pickup_time,
-        'pickupFlightNumber': '',
-        'returnLocation': dropoff_name,
-        'returnAddress': '',
-        'returnDate': return_date,
-        'returnTime': return_time,
-        'totalCost': 0,
-        'currency': json_ld.get('priceCurrency', ''),
-        'options': [],
-        'oneWayCharge': 0,
-        'bookingDate': parse_date(json_ld.get('bookingTime', '')),
-    }
+    return CarRentalReservation(
+        confirmation_number=confirmation_number,
+        guest_name=guest_name,
+        company=company,
+        vehicle_model=vehicle_model or vehicle_name,
+        pickup_location=pickup_name,
+        pickup_date=pickup_date,
+        pickup_time=pickup_time,
+        return_location=dropoff_name,
+        return_date=return_date,
+        return_time=return_time,
+        currency=json_ld.get('priceCurrency', ''),
+        booking_date=parse_date(json_ld.get('bookingTime', '')),
+    )
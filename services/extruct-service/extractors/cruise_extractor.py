@@ -0,0 +1,128 @@
+"""Cruise extractor: schema.org BoatReservation → our format"""
+
+from typing import Dict, Any, List
+import logging
+from .base_extractor import (
+    parse_date, parse_time, safe_get, get_person_name, get_place_name,
+    get_address_string, get_city_state, get_price,
+)
+from .models import CruiseReservation, CruiseGuest, PortOfCall
+
+logger = logging.getLogger(__name__)
+
+
+def extract_cruise_reservation(json_ld: Dict[str, Any]) -> CruiseReservation:
+    """
+    Map schema.org BoatReservation to our schema.
+
+    Example input:
+    {
+      "@type": "BoatReservation",
+      "reservationNumber": "8XK2QZ",
+      "underName": {"name": "Jane Doe"},
+      "reservationFor": {
+        "@type": "BoatTrip",
+        "name": "Celebrity Edge",
+        "provider": {"name": "Celebrity Cruises"},
+        "departureBoatTerminal": {"name": "Port Everglades", "address": {...}},
+        "departureTime": "2026-03-01T16:00:00-05:00",
+        "arrivalBoatTerminal": {"name": "Port Everglades"},
+        "arrivalTime": "2026-03-08T07:00:00-05:00",
+        "itinerary": [{"name": "Cozumel", "arrivalTime": ..., "departureTime": ...}]
+      },
+      "reservedTicket": {"ticketedSeat": {"seatNumber": "9215", "seatingType": "Veranda", "seatSection": "9"}}
+    }
+    """
+    logger.debug("Extracting BoatReservation from schema.org data")
+
+    confirmation_number = json_ld.get('reservationNumber', '')
+
+    reservation_for = json_ld.get('reservationFor', {})
+    if isinstance(reservation_for, list):
+        reservation_for = reservation_for[0] if reservation_for else {}
+    if not isinstance(reservation_for, dict):
+        # A plain string names the trip (usually the ship)
+        reservation_for = {'name': reservation_for} if isinstance(reservation_for, str) else {}
+
+    # Cruise line is the trip's provider, or the reservation's
+    provider = reservation_for.get('provider') or json_ld.get('provider', {})
+    cruise_line = get_place_name(provider)
+    ship_name = safe_get(reservation_for, 'name', default='')
+
+    # Cabin, modelled as the ticket's seat
+    seat = safe_get(json_ld, 'reservedTicket', 'ticketedSeat', default={})
+    cabin_number = safe_get(seat, 'seatNumber', default='')
+    cabin_type = safe_get(seat, 'seatingType', default='')
+    deck = safe_get(seat, 'seatSection', default='')
+
+    # Embarkation / disembarkation
+    departure_terminal = reservation_for.get('departureBoatTerminal', {})
+    arrival_terminal = reservation_for.get('arrivalBoatTerminal', {}) or departure_terminal
+    departure_time_str = reservation_for.get('departureTime', '') or json_ld.get('startTime', '')
+    arrival_time_str = reservation_for.get('arrivalTime', '') or json_ld.get('endTime', '')
+
+    total_cost, currency = get_price(json_ld)
+
+    return CruiseReservation(
+        confirmation_number=confirmation_number,
+        guests=_extract_guests(json_ld.get('underName', {}), cabin_number),
+        cruise_line=cruise_line,
+        ship_name=ship_name,
+        cabin_number=cabin_number,
+        cabin_type=cabin_type,
+        deck=str(deck),
+        embarkation_port=get_place_name(departure_terminal),
+        embarkation_location=get_city_state(departure_terminal) or get_address_string(departure_terminal),
+        embarkation_date=parse_date(departure_time_str),
+        embarkation_time=parse_time(departure_time_str),
+        disembarkation_port=get_place_name(arrival_terminal),
+        disembarkation_location=get_city_state(arrival_terminal) or get_address_string(arrival_terminal),
+        disembarkation_date=parse_date(arrival_time_str),
+        disembarkation_time=parse_time(arrival_time_str),
+        ports_of_call=_extract_ports(reservation_for.get('itinerary', [])),
+        total_cost=total_cost,
+        currency=currency,
+        booking_date=parse_date(json_ld.get('bookingTime', '')),
+    )
+
+
+def _extract_guests(under_name: Any, cabin_number: str) -> List[CruiseGuest]:
+    """underName may be one Person or a list of them"""
+    people = under_name if isinstance(under_name, list) else [under_name]
+    return [
+        CruiseGuest(name=name, cabin_number=cabin_number)
+        for name in (get_person_name(person) for person in people)
+        if name
+    ]
+
+
+def _extract_ports(itinerary: Any) -> List[PortOfCall]:
+    """
+    Ports of call from the trip's itinerary.
+
+    Accepts a list of Places or an ItemList whose elements are Places
+    (optionally wrapped in ListItems).
+    """
+    if isinstance(itinerary, dict):
+        itinerary = itinerary.get('itemListElement', [])
+    if not isinstance(itinerary, list):
+        return []
+
+    ports = []
+    for place in itinerary:
+        if isinstance(place, dict) and 'item' in place:
+            place = place['item']
+        name = get_place_name(place)
+        if not name:
+            continue
+        arrival = safe_get(place, 'arrivalTime', default='')
+        departure = safe_get(place, 'departureTime', default='')
+        ports.append(PortOfCall(
+            port_name=name,
+            port_location=get_city_state(place) or get_address_string(place),
+            arrival_date=parse_date(arrival),
+            arrival_time=parse_time(arrival),
+            departure_date=parse_date(departure),
+            departure_time=parse_time(departure),
+        ))
+    return ports
@@ -3,13 +3,14 @@
 from typing import Dict, Any
 import logging
 from .base_extractor import parse_date, parse_time, safe_get, get_person_name
+from .models import EventReservation, EventTicket
 
 logger = logging.getLogger(__name__)
 
 
-def extract_event_reservation(json_ld: Dict[str, Any]) -> Dict[str, Any]:
+def extract_event_reservation(json_ld: Dict[str, Any]) -> EventReservation:
     """Map schema.org EventReservation to our schema"""
-    logger.info("Extracting EventReservation from schema.org data")
+    logger.debug("Extracting EventReservation from schema.org data")
     
     confirmation_number = json_ld.get('reservationNumber', '')
     guest_name = get_person_name(json_ld.get('underName', {}))
@@ -32,27 +33,20 @@ def extract_event_reservation(json_ld: Dict[str, Any]) -> Dict[str, Any]:
     tickets = []
     num_seats = json_ld.get('numSeats', 1)
     if num_seats:
-        tickets.append({
-            'ticketType': 'General Admission',
-            'quantity': num_seats,
-            'price': 0,
-            'seatInfo': '',
-        })
+        tickets.append(EventTicket(
+            ticket_type='General Admission',
+            quantity=num_seats,
+        ))
     
-    return {
-        'confirmationNumber': confirmation_number,
-        'guestName': guest_name,
-        'eventName': event_name,
-        'venueName': venue_name,
-        'address': address if isinstance(address, str) else '',
-        'eventDate': event_date,
-        'eventTime': event_time,
-        'doorsOpenTime': '',
-        'tickets': tickets,
-        'totalCost': 0,
-        'currency': json_ld.get('priceCurrency', ''),
-        'bookingDate': parse_date(json_ld.get('bookingTime', '')),
-        'platform': '',
-        'eventType': '',
-        'specialInstructions': '',
-    }
+    return EventReservation(
+        confirmation_number=confirmation_number,
+        guest_name=guest_name,
+        event_name=event_name,
+        venue_name=venue_name,
+        address=address if isinstance(address, str) else '',
+        event_date=event_date,
+        event_time=event_time,
+        tickets=tickets,
+        currency=json_ld.get('priceCurrency', ''),
+        booking_date=parse_date(json_ld.get('bookingTime', '')),
+    )
@@ -9,11 +9,12 @@ import logging
 from .base_extractor import (
     parse_date, parse_time, safe_get, get_person_name, get_city_state
 )
+from .models import FlightReservation, FlightSegment
 
 logger = logging.getLogger(__name__)
 
 
-def extract_flight_reservation(json_ld: Dict[str, Any]) -> Dict[str, Any]:
+def extract_flight_reservation(json_ld: Dict[str, Any]) -> FlightReservation:
     """
     Map schema.org FlightReservation to our FlightExtraction schema.
     
@@ -33,7 +34,7 @@ def extract_flight_reservation(json_ld: Dict[str, Any]) -> Dict[str, Any]:
       }
     }
     """
-    logger.info("Extracting FlightReservation from schema.org data")
+    logger.debug("Extracting FlightReservation from schema.org data")
     
     # Extract top-level fields
     confirmation_number = json_ld.get('reservationNumber', '')
@@ -60,18 +61,18 @@ def extract_flight_reservation(json_ld: Dict[str, Any]) -> Dict[str, Any]:
         if flight:
             flights.append(flight)
     
-    result = {
-        'confirmationNumber': confirmation_number,
-        'bookingDate': booking_date,
-        'passengerName': passenger_name,
-        'flights': flights,
-    }
+    result = FlightReservation(
+        confirmation_number=confirmation_number,
+        booking_date=booking_date,
+        passenger_name=passenger_name,
+        flights=flights,
+    )
     
-    logger.info(f"Extracted {len(flights)} flight(s)")
+    logger.debug("Extracted %d flight(s)", len(flights))
     return result
 
 
-def extract_single_flight(flight_data: Dict[str, Any]) -> Dict[str, Any]:
+def extract_single_flight(flight_data: Dict[str, Any]) -> FlightSegment:
     """Extract a single Flight object from schema.org data"""
     
     # Basic flight info
@@ -109,29 +110,28 @@ def extract_single_flight(flight_data: Dict[str, Any]) -> Dict[str, Any]:
     departure_gate = flight_data.get('departureGate', '')
     arrival_gate = flight_data.get('arrivalGate', '')
     
-    flight = {
-        'flightNumber': flight_number,
-        'carrier': carrier,
-        'carrierCode': carrier_code,
-        'departureAirport': departure_airport,
-        'departureAirportName': departure_airport_name,
-        'departureCity': departure_city,
-        'departureDate': departure_date,
-        'departureTime': departure_time,
-        'departureTerminal': departure_terminal,
-        'departureGate': departure_gate,
-        'arrivalAirport': arrival_airport,
-        'arrivalAirportName': arrival_airport_name,
-        'arrivalCity': arrival_city,
-        'arrivalDate': arrival_date,
-        'arrivalTime': arrival_time,
-        'arrivalTerminal': arrival_terminal,
-        'arrivalGate': arrival_gate,
-        'aircraft': aircraft_type,
-        'bookingClass': '',  # Not typically in schema.org
-        'seatNumber': '',    # Not typically in schema.org FlightReservation
-        'operatedBy': '',    # Not typically in schema.org
-    }
-    
-    logger.debug(f"Extracted flight {flight_number}: {departure_airport} → {arrival_airport}")
+    # bookingClass, seatNumber and operatedBy are not typically in
+    # schema.org and are left at their empty defaults
+    flight = FlightSegment(
+        flight_number=flight_number,
+        carrier=carrier,
+        carrier_code=carrier_code,
+        departure_airport=departure_airport,
+        departure_airport_name=departure_airport_name,
+        departure_city=departure_city,
+        departure_date=departure_date,
+        departure_time=departure_time,
+        departure_terminal=departure_terminal,
+        departure_gate=departure_gate,
+        arrival_airport=arrival_airport,
+        arrival_airport_name=arrival_airport_name,
+        arrival_city=arrival_city,
+        arrival_date=arrival_date,
+        arrival_time=arrival_time,
+        arrival_terminal=arrival_terminal,
+        arrival_gate=arrival_gate,
+        aircraft=aircraft_type,
+    )
+    
+    logger.debug("Extracted flight %s: %s → %s", flight_number, departure_airport, arrival_airport)
     return flight
@@ -0,0 +1,99 @@
+"""Generic extractor: any schema.org Reservation → our generic format"""
+
+from typing import Dict, Any
+import logging
+from .base_extractor import (
+    parse_date, parse_time, safe_get, get_person_name, get_place_name,
+    get_address_string, get_price, parse_int,
+)
+from .models import GenericReservation
+
+logger = logging.getLogger(__name__)
+
+# schema.org reservation type (without "Reservation") → our category
+CATEGORIES = {
+    'flight': 'Travel',
+    'train': 'Travel',
+    'bus': 'Travel',
+    'boat': 'Travel',
+    'taxi': 'Travel',
+    'rentalcar': 'Travel',
+    'lodging': 'Stay',
+    'foodestablishment': 'Dining',
+    'event': 'Activity',
+}
+
+# Where the different Reservation subtypes keep their start/end times,
+# checked in order on the reservation and then on reservationFor
+START_KEYS = ('startTime', 'checkinTime', 'pickupTime', 'departureTime', 'startDate')
+END_KEYS = ('endTime', 'checkoutTime', 'dropoffTime', 'arrivalTime', 'endDate')
+LOCATION_KEYS = ('location', 'pickupLocation', 'departureAirport', 'departureStation',
+                 'departureBusStop', 'departureBoatTerminal')
+
+
+def extract_generic_reservation(json_ld: Dict[str, Any]) -> GenericReservation:
+    """
+    Normalize any schema.org Reservation or subtype (e.g. a spa booking
+    marked up as a plain "Reservation") to our generic schema.
+
+    Only uses properties common to Reservation, plus the usual per-subtype
+    places to find the start, end and location.
+    """
+    item_type = json_ld.get('@type', '') or 'Reservation'
+    logger.debug("Extracting %s as a generic reservation", item_type)
+
+    reservation_for = json_ld.get('reservationFor', {})
+    if isinstance(reservation_for, list):
+        reservation_for = reservation_for[0] if reservation_for else {}
+    if not isinstance(reservation_for, dict):
+        reservation_for = {'name': reservation_for} if isinstance(reservation_for, str) else {}
+
+    # "SpaReservation" → "Spa"; a plain "Reservation" uses what was booked
+    kind = item_type[:-len('Reservation')] if item_type.endswith('Reservation') else ''
+    reservation_type = kind or reservation_for.get('@type', '') or 'Reservation'
+
+    # Flights and trains name the carrier rather than the trip
+    provider = json_ld.get('provider') or reservation_for.get('provider') \
+        or reservation_for.get('airline') or reservation_for.get('trainCompany', {})
+    name = reservation_for.get('name', '') or get_place_name(provider)
+
+    start_str = _first(json_ld, reservation_for, START_KEYS)
+    end_str = _first(json_ld, reservation_for, END_KEYS)
+
+    # Events and venues have a location; lodgings and restaurants are one
+    location = next((reservation_for[key] for key in LOCATION_KEYS if reservation_for.get(key)), None) \
+        or next((json_ld[key] for key in LOCATION_KEYS if json_ld.get(key)), None)
+    if location is None and 'address' in reservation_for:
+        location = reservation_for
+
+    total_cost, currency = get_price(json_ld)
+
+    return GenericReservation(
+        reservation_type=reservation_type,
+        category=CATEGORIES.get(kind.lower(), 'Other'),
+        name=name,
+        confirmation_number=json_ld.get('reservationNumber', ''),
+        guest_name=get_person_name(json_ld.get('underName', {})),
+        vendor=get_place_name(provider),
+        location=get_place_name(location),
+        address=get_address_string(location),
+        start_date=parse_date(start_str),
+        start_time=parse_time(start_str) if 'T' in str(start_str) else '',
+        end_date=parse_date(end_str) or parse_date(start_str),
+        end_time=parse_time(end_str) if 'T' in str(end_str) else '',
+        cost=total_cost,
+        currency=currency,
+        participants=parse_int(json_ld.get('partySize') or json_ld.get('numSeats'), 1),
+        booking_date=parse_date(json_ld.get('bookingTime', '')),
+        contact_phone=safe_get(provider, 'telephone', default=''),
+        contact_email=safe_get(provider, 'email', default=''),
+    )
+
+
+def _first(json_ld: Dict[str, Any], reservation_for: Dict[str, Any], keys) -> Any:
+    """First non-empty value for keys on the reservation, then on reservationFor"""
+    for source in (json_ld, reservation_for):
+        for key in keys:
+            if source.get(key):
+                return source[key]
+    return ''
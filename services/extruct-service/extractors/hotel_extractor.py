@@ -9,11 +9,12 @@ import logging
 from .base_extractor import (
     parse_date, parse_time, safe_get, get_person_name, get_address_string
 )
+from .models import HotelReservation
 
 logger = logging.getLogger(__name__)
 
 
-def extract_hotel_reservation(json_ld: Dict[str, Any]) -> Dict[str, Any]:
+def extract_hotel_reservation(json_ld: Dict[str, Any]) -> HotelReservation:
     """
     Map schema.org LodgingReservation to our HotelExtraction schema.
     
@@ -32,7 +33,7 @@ def extract_hotel_reservation(json_ld: Dict[str, Any]) -> Dict[str, Any]:
       "checkoutTime": "2026-02-02T11:00:00"
     }
     """
-    logger.info("Extracting LodgingReservation from schema.org data")
+    logger.debug("Extracting LodgingReservation from schema.org data")
     
     # Extract top-level fields
     confirmation_number = json_ld.get('reservationNumber', '')
@@ -85,22 +86,22 @@ def extract_hotel_reservation(json_ld: Dict[str, Any]) -> Dict[str, Any]:
     if 'priceCurrency' in json_ld:
         currency = json_ld['priceCurrency']
     
-    result = {
-        'confirmationNumber': confirmation_number,
-        'guestName': guest_name,
-        'hotelName': hotel_name,
-        'address': address,
-        'checkInDate': checkin_date,
-        'checkInTime': checkin_time,
-        'checkOutDate': checkout_date,
-        'checkOutTime': checkout_time,
-        'roomType': room_type,
-        'numberOfRooms': num_rooms,
-        'numberOfGuests': num_guests,
-        'totalCost': total_cost,
-        'currency': currency,
-        'bookingDate': booking_date,
-    }
+    result = HotelReservation(
+        confirmation_number=confirmation_number,
+        guest_name=guest_name,
+        hotel_name=hotel_name,
+        address=address,
+        check_in_date=checkin_date,
+        check_in_time=checkin_time,
+        check_out_date=checkout_date,
+        check_out_time=checkout_time,
+        room_type=room_type,
+        number_of_rooms=num_rooms,
+        number_of_guests=num_guests,
+        total_cost=total_cost,
+        currency=currency,
+        booking_date=booking_date,
+    )
     
-    logger.info(f"Extracted hotel: {hotel_name}")
+    logger.debug("Extracted hotel: %s", hotel_name)
     return result
@@ -0,0 +1,347 @@
+"""
+Typed result structures for extracted reservations.
+
+Each reservation type is a slotted dataclass, so an extraction allocates
+one compact object per record instead of a wide dict padded with empty
+strings and zeros. Records are turned into the JSON shape the Next.js
+app expects only once, at the end of the pipeline, by `to_dict()`:
+
+- `to_dict()` returns every key (the original full-key dict shape)
+- `to_dict(sparse=True)` leaves out empty fields ('', 0, [], None)
+
+Attribute names are snake_case; output keys are the camelCase names used
+by the app's extraction schemas.
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _camel_case(name: str) -> str:
+    head, *rest = name.split('_')
+    return head + ''.join(part[:1].upper() + part[1:] for part in rest)
+
+
+class Record:
+    """Base for result records: dict rendering and key-based access."""
+
+    __slots__ = ()
+
+    # Per-class (attribute, output key) pairs, built on first use
+    _keys: Tuple[Tuple[str, str], ...] = ()
+    _attrs_by_key: Dict[str, str] = {}
+
+    @classmethod
+    def _key_table(cls) -> Tuple[Tuple[str, str], ...]:
+        if '_keys' not in cls.__dict__:
+            cls._keys = tuple(
+                (f.name, f.metadata.get('key') or _camel_case(f.name))
+                for f in fields(cls)
+            )
+            cls._attrs_by_key = {key: attr for attr, key in cls._keys}
+        return cls._keys
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Look up a field by its output key (e.g. 'flightNumber')."""
+        self._key_table()
+        attr = self._attrs_by_key.get(key)
+        return getattr(self, attr) if attr else default
+
+    def to_dict(self, sparse: bool = False) -> Dict[str, Any]:
+        """Render as a JSON-ready dict; sparse omits empty fields."""
+        result = {}
+        for attr, key in self._key_table():
+            value = getattr(self, attr)
+            if sparse and not value:
+                continue
+            if isinstance(value, Record):
+                value = value.to_dict(sparse)
+            elif isinstance(value, list) and value and isinstance(value[0], Record):
+                value = [item.to_dict(sparse) for item in value]
+            result[key] = value
+        return result
+
+
+# Flights
+
+@dataclass(slots=True)
+class FlightSegment(Record):
+    flight_number: str = ''
+    carrier: str = ''
+    carrier_code: str = ''
+    departure_airport: str = ''
+    departure_airport_name: str = ''
+    departure_city: str = ''
+    departure_timezone: str = ''
+    departure_latitude: Optional[float] = None
+    departure_longitude: Optional[float] = None
+    departure_date: str = ''
+    departure_time: str = ''
+    departure_terminal: str = ''
+    departure_gate: str = ''
+    arrival_airport: str = ''
+    arrival_airport_name: str = ''
+    arrival_city: str = ''
+    arrival_timezone: str = ''
+    arrival_latitude: Optional[float] = None
+    arrival_longitude: Optional[float] = None
+    arrival_date: str = ''
+    arrival_time: str = ''
+    arrival_terminal: str = ''
+    arrival_gate: str = ''
+    aircraft: str = ''
+    booking_class: str = ''  # Not typically in schema.org
+    seat_number: str = ''    # Not typically in schema.org FlightReservation
+    operated_by: str = ''    # Not typically in schema.org
+
+
+@dataclass(slots=True)
+class FlightReservation(Record):
+    confirmation_number: str = ''
+    booking_date: str = ''
+    passenger_name: str = ''
+    flights: List[FlightSegment] = field(default_factory=list)
+
+
+# Hotels
+
+@dataclass(slots=True)
+class HotelReservation(Record):
+    confirmation_number: str = ''
+    guest_name: str = ''
+    hotel_name: str = ''
+    address: str = ''
+    check_in_date: str = ''
+    check_in_time: str = ''
+    check_out_date: str = ''
+    check_out_time: str = ''
+    room_type: str = ''
+    number_of_rooms: int = 1
+    number_of_guests: int = 0
+    total_cost: float = 0.0
+    currency: str = ''
+    booking_date: str = ''
+
+
+# Car rentals
+
+@dataclass(slots=True)
+class CarRentalReservation(Record):
+    confirmation_number: str = ''
+    guest_name: str = ''
+    company: str = ''
+    vehicle_class: str = ''
+    vehicle_model: str = ''
+    pickup_location: str = ''
+    pickup_address: str = ''
+    pickup_date: str = ''
+    pickup_time: str = ''
+    pickup_flight_number: str = ''
+    return_location: str = ''
+    return_address: str = ''
+    return_date: str = ''
+    return_time: str = ''
+    total_cost: float = 0
+    currency: str = ''
+    options: List[str] = field(default_factory=list)
+    one_way_charge: float = 0
+    booking_date: str = ''
+
+
+# Trains
+
+@dataclass(slots=True)
+class TrainPassenger(Record):
+    name: str = ''
+    ticket_number: str = ''
+
+
+@dataclass(slots=True)
+class TrainSegment(Record):
+    train_number: str = ''
+    operator: str = ''
+    operator_code: str = ''
+    departure_station: str = ''
+    departure_station_code: str = ''
+    departure_city: str = ''
+    departure_timezone: str = ''
+    departure_latitude: Optional[float] = None
+    departure_longitude: Optional[float] = None
+    departure_date: str = ''
+    departure_time: str = ''
+    departure_platform: str = ''
+    arrival_station: str = ''
+    arrival_station_code: str = ''
+    arrival_city: str = ''
+    arrival_timezone: str = ''
+    arrival_latitude: Optional[float] = None
+    arrival_longitude: Optional[float] = None
+    arrival_date: str = ''
+    arrival_time: str = ''
+    arrival_platform: str = ''
+    travel_class: str = field(default='', metadata={'key': 'class'})
+    coach: str = ''
+    seat: str = ''
+    duration: str = ''
+
+
+@dataclass(slots=True)
+class TrainReservation(Record):
+    confirmation_number: str = ''
+    passengers: List[TrainPassenger] = field(default_factory=list)
+    purchase_date: str = ''
+    total_cost: float = 0
+    currency: str = ''
+    trains: List[TrainSegment] = field(default_factory=list)
+
+
+# Restaurants
+
+@dataclass(slots=True)
+class RestaurantReservation(Record):
+    confirmation_number: str = ''
+    guest_name: str = ''
+    restaurant_name: str = ''
+    address: str = ''
+    phone: str = ''
+    reservation_date: str = ''
+    reservation_time: str = ''
+    party_size: int = 2
+    special_requests: str = ''
+    cost: float = 0
+    currency: str = ''
+    booking_date: str = ''
+    platform: str = ''
+    cancellation_policy: str = ''
+
+
+# Events
+
+@dataclass(slots=True)
+class EventTicket(Record):
+    ticket_type: str = ''
+    quantity: int = 1
+    price: float = 0
+    seat_info: str = ''
+
+
+@dataclass(slots=True)
+class EventReservation(Record):
+    confirmation_number: str = ''
+    guest_name: str = ''
+    event_name: str = ''
+    venue_name: str = ''
+    address: str = ''
+    event_date: str = ''
+    event_time: str = ''
+    doors_open_time: str = ''
+    tickets: List[EventTicket] = field(default_factory=list)
+    total_cost: float = 0
+    currency: str = ''
+    booking_date: str = ''
+    platform: str = ''
+    event_type: str = ''
+    special_instructions: str = ''
+
+
+# Cruises
+
+@dataclass(slots=True)
+class CruiseGuest(Record):
+    name: str = ''
+    cabin_number: str = ''
+
+
+@dataclass(slots=True)
+class PortOfCall(Record):
+    port_name: str = ''
+    port_location: str = ''
+    arrival_date: str = ''
+    arrival_time: str = ''
+    departure_date: str = ''
+    departure_time: str = ''
+
+
+@dataclass(slots=True)
+class CruiseReservation(Record):
+    confirmation_number: str = ''
+    guests: List[CruiseGuest] = field(default_factory=list)
+    cruise_line: str = ''
+    ship_name: str = ''
+    cabin_number: str = ''
+    cabin_type: str = ''
+    deck: str = ''
+    embarkation_port: str = ''
+    embarkation_location: str = ''
+    embarkation_date: str = ''
+    embarkation_time: str = ''
+    disembarkation_port: str = ''
+    disembarkation_location: str = ''
+    disembarkation_date: str = ''
+    disembarkation_time: str = ''
+    ports_of_call: List[PortOfCall] = field(default_factory=list)
+    total_cost: float = 0
+    currency: str = ''
+    booking_date: str = ''
+    dining_time: str = ''
+    special_requests: str = ''
+
+
+# Private drivers / transfers
+
+@dataclass(slots=True)
+class PrivateDriverReservation(Record):
+    confirmation_number: str = ''
+    guest_name: str = ''
+    cost: float = 0
+    currency: str = ''
+    contact_email: str = ''
+    contact_phone: str = ''
+    notes: str = ''
+    booking_date: str = ''
+    driver_name: str = ''
+    driver_phone: str = ''
+    vehicle_type: str = ''
+    plate_number: str = ''
+    company: str = ''
+    pickup_location: str = ''
+    pickup_address: str = ''
+    pickup_date: str = ''
+    pickup_time: str = ''
+    pickup_instructions: str = ''
+    dropoff_location: str = ''
+    dropoff_address: str = ''
+    flight_number: str = ''
+    flight_arrival_time: str = ''
+    transfer_duration: str = ''
+    waiting_instructions: str = ''
+    passenger_count: int = 1
+    luggage_details: str = ''
+    meet_and_greet: bool = False
+    special_requests: str = ''
+
+
+# Anything else (generic schema.org Reservation)
+
+@dataclass(slots=True)
+class GenericReservation(Record):
+    reservation_type: str = ''
+    category: str = ''
+    name: str = ''
+    confirmation_number: str = ''
+    guest_name: str = ''
+    vendor: str = ''
+    location: str = ''
+    address: str = ''
+    start_date: str = ''
+    start_time: str = ''
+    end_date: str = ''
+    end_time: str = ''
+    cost: float = 0
+    currency: str = ''
+    participants: int = 1
+    notes: str = ''
+    booking_date: str = ''
+    contact_phone: str = ''
+    contact_email: str = ''
+    cancellation_policy: str = ''
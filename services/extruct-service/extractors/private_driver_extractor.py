@@ -0,0 +1,65 @@
+"""Private driver extractor: schema.org TaxiReservation / BusReservation → our format"""
+
+from typing import Dict, Any
+import logging
+from .base_extractor import (
+    parse_date, parse_time, safe_get, get_person_name, get_place_name,
+    get_address_string, get_price, parse_int,
+)
+from .models import PrivateDriverReservation
+
+logger = logging.getLogger(__name__)
+
+
+def extract_private_driver_reservation(json_ld: Dict[str, Any]) -> PrivateDriverReservation:
+    """
+    Map schema.org TaxiReservation or BusReservation to our schema.
+
+    Transfers are marked up either as a TaxiReservation (pickupLocation,
+    pickupTime; some senders add a dropoffLocation) or, for shuttles and
+    chauffeured transfers, as a BusReservation whose BusTrip has the
+    pickup and dropoff as departure/arrival bus stops.
+    """
+    item_type = json_ld.get('@type', '')
+    logger.debug("Extracting %s from schema.org data", item_type)
+
+    reservation_for = json_ld.get('reservationFor', {})
+    if isinstance(reservation_for, list):
+        reservation_for = reservation_for[0] if reservation_for else {}
+    if not isinstance(reservation_for, dict):
+        reservation_for = {}
+
+    if item_type.lower() == 'busreservation':
+        pickup = reservation_for.get('departureBusStop', {})
+        dropoff = reservation_for.get('arrivalBusStop', {})
+        pickup_time_str = reservation_for.get('departureTime', '')
+        vehicle_type = reservation_for.get('busName', '')
+    else:
+        pickup = json_ld.get('pickupLocation', {})
+        dropoff = json_ld.get('dropoffLocation', {}) or json_ld.get('dropOffLocation', {})
+        pickup_time_str = json_ld.get('pickupTime', '')
+        vehicle_type = safe_get(reservation_for, 'name', default='')
+
+    # Transfer company
+    provider = json_ld.get('provider') or reservation_for.get('provider', {})
+
+    total_cost, currency = get_price(json_ld)
+
+    return PrivateDriverReservation(
+        confirmation_number=json_ld.get('reservationNumber', ''),
+        guest_name=get_person_name(json_ld.get('underName', {})),
+        cost=total_cost,
+        currency=currency,
+        contact_email=safe_get(provider, 'email', default=''),
+        contact_phone=safe_get(provider, 'telephone', default=''),
+        booking_date=parse_date(json_ld.get('bookingTime', '')),
+        vehicle_type=vehicle_type,
+        company=get_place_name(provider),
+        pickup_location=get_place_name(pickup),
+        pickup_address=get_address_string(pickup),
+        pickup_date=parse_date(pickup_time_str),
+        pickup_time=parse_time(pickup_time_str),
+        dropoff_location=get_place_name(dropoff),
+        dropoff_address=get_address_string(dropoff),
+        passenger_count=parse_int(json_ld.get('partySize'), 1),
+    )
@@ -3,13 +3,14 @@
 from typing import Dict, Any
 import logging
 from .base_extractor import parse_date, parse_time, safe_get, get_person_name
+from .models import RestaurantReservation
 
 logger = logging.getLogger(__name__)
 
 
-def extract_restaurant_reservation(json_ld: Dict[str, Any]) -> Dict[str, Any]:
+def extract_restaurant_reservation(json_ld: Dict[str, Any]) -> RestaurantReservation:
     """Map schema.org FoodEstablishmentReservation to our schema"""
-    logger.info("Extracting FoodEstablishmentReservation from schema.org data")
+    logger.debug("Extracting FoodEstablishmentReservation from schema.org data")
     
     confirmation_number = json_ld.get('reservationNumber', '')
     guest_name = get_person_name(json_ld.get('underName', {}))
@@ -33,19 +34,15 @@ def extract_restaurant_reservation(json_ld: Dict[str, Any]) -> Dict[str, Any]:
         except ValueError:
             party_size = 2
     
-    return {
-        'confirmationNumber': confirmation_number,
-        'guestName': guest_name,
-        'restaurantName': restaurant_name,
-        'address': address if isinstance(address, str) else '',
-        'phone': phone,
-        'reservationDate': reservation_date,
-        'reservationTime': reservation_time,
-        'partySize': party_size,
-        'specialRequests': '',
-        'cost': 0,
-        'currency': json_ld.get('priceCurrency', ''),
-        'bookingDate': parse_date(json_ld.get('bookingTime', '')),
-        'platform': '',
-        'cancellationPolicy': '',
-    }
+    return RestaurantReservation(
+        confirmation_number=confirmation_number,
+        guest_name=guest_name,
+        restaurant_name=restaurant_name,
+        address=address if isinstance(address, str) else '',
+        phone=phone,
+        reservation_date=reservation_date,
+        reservation_time=reservation_time,
+        party_size=party_size,
+        currency=json_ld.get('priceCurrency', ''),
+        booking_date=parse_date(json_ld.get('bookingTime', '')),
+    )
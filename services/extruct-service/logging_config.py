@@ -0,0 +1,167 @@
+"""
+Logging setup for the extruct service.
+
+Keeps logging off the request hot path:
+- Records are handed to a queue and written by a background thread, so
+  log I/O never blocks a request. Messages are formatted there too.
+- Per-request context (request id, type, size, ...) is attached from a
+  context variable instead of being formatted into every message.
+- Each request emits one summary line; detail logging is DEBUG only.
+- Summary and detail lines can be sampled; warnings and errors are
+  always kept.
+
+Settings (environment):
+    LOG_LEVEL        debug | info | warning | error   (default: info)
+    LOG_FORMAT       text | json                      (default: text)
+    LOG_SAMPLE_RATE  fraction of requests logged       (default: 1.0)
+"""
+
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+import uuid
+
+from config import env_float
+
+# Context of the request being handled, shared by everything that logs
+# while serving it (including work run in the threadpool).
+request_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar('request_context', default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_sample_rate = 1.0
+
+# Attributes every LogRecord has; anything else was passed via `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'context', 'color_message'}
+
+
+def start_request(request_id: Optional[str] = None, **fields: Any) -> Dict[str, Any]:
+    """
+    Begin logging context for a request.
+
+    Decides whether this request is sampled and returns the context dict;
+    callers may add fields (method, timings, ...) to it as they go.
+    """
+    context = {
+        'requestId': request_id or uuid.uuid4().hex[:12],
+        'sampled': _sample_rate >= 1.0 or random.random() < _sample_rate,
+        'startedAt': time.perf_counter(),
+        **fields,
+    }
+    request_context.set(context)
+    return context
+
+
+def annotate(**fields: Any):
+    """Add fields (timings, method, ...) to the current request's context."""
+    context = request_context.get()
+    if context is not None:
+        context.update(fields)
+
+
+def log_request_summary(logger: logging.Logger, context: Dict[str, Any], **fields: Any):
+    """Emit the single per-request summary line."""
+    context.update(fields)
+    context['totalMs'] = round((time.perf_counter() - context['startedAt']) * 1000, 2)
+    logger.info("request complete")
+
+
+class ContextFilter(logging.Filter):
+    """Attaches the current request context and applies sampling."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = request_context.get()
+        if context is None:
+            return True
+        if record.levelno < logging.WARNING and not context['sampled']:
+            return False
+        record.context = dict(context)
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    """`LEVEL:logger:message key=value ...` with request context appended."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"{record.levelname}:{record.name}:{record.getMessage()}"
+        fields = _fields(record)
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, suitable for log aggregation."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            **_fields(record),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock handler formats every record before enqueueing it, which
+    puts the formatting cost back on the request thread. Records stay in
+    this process, so they can be passed through as-is.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging():
+    """Install the queue-based handler on the root logger (idempotent)."""
+    global _listener, _sample_rate
+    if _listener is not None:
+        return
+
+    _sample_rate = min(max(env_float('LOG_SAMPLE_RATE', 1.0), 0.0), 1.0)
+    level = getattr(logging, os.environ.get('LOG_LEVEL', 'info').upper(), logging.INFO)
+    formatter = JsonFormatter() if os.environ.get('LOG_FORMAT', 'text').lower() == 'json' else TextFormatter()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def _fields(record: logging.LogRecord) -> Dict[str, Any]:
+    """Request context plus any `extra` fields, without internal keys."""
+    fields = {}
+    context = getattr(record, 'context', None)
+    if context:
+        fields.update((key, value) for key, value in context.items() if key not in ('sampled', 'startedAt'))
+    for key, value in vars(record).items():
+        if key not in _RECORD_ATTRS:
+            fields[key] = value
+    return fields
@@ -5,26 +5,35 @@ Uses extruct to parse JSON-LD and microdata from HTML, then normalizes
 to our schema format. Falls back to AI if structured data is incomplete.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, Dict, Any, Literal
-import extruct
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from typing import Awaitable, Optional, Literal, TypeVar
+import asyncio
 import logging
-
-from extractors.flight_extractor import extract_flight_reservation
-from extractors.hotel_extractor import extract_hotel_reservation
-from extractors.car_rental_extractor import extract_car_rental_reservation
-from extractors.train_extractor import extract_train_reservation
-from extractors.restaurant_extractor import extract_restaurant_reservation
-from extractors.event_extractor import extract_event_reservation
-from validators import calculate_completeness, validate_required_fields
+import time
+
+from pipeline import ExtractionResponse, run_extraction, timed_out
+from deadlines import Deadline, DeadlineExceeded
+from reference_index import get_index
+from admission import AdmissionController, Overloaded
+from coalescing import SingleFlight, content_key
+from compression import DecompressingRoute, compression_stats
+from capture import CorpusWriter
+from workers import worker_stats
+from logging_config import configure_logging, start_request, annotate, log_request_summary
+import structured_data
+import config
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Extruct Service", version="1.0.0")
+app = FastAPI(title="Extruct Service", version=config.SERVICE_VERSION)
+# Accept gzip/deflate/br/zstd request bodies on every route
+app.router.route_class = DecompressingRoute
 
 # Enable CORS for Next.js app
 app.add_middleware(
@@ -35,162 +44,204 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+admission = AdmissionController(
+    capacity=config.worker_concurrency(),
+    queue_timeout=config.QUEUE_TIMEOUT_MS / 1000,
+    size_unit=config.SIZE_WEIGHT_BYTES,
+)
+inflight = SingleFlight()
+corpus = CorpusWriter(
+    config.CAPTURE_DIR,
+    sample_rate=config.CAPTURE_SAMPLE_RATE,
+    version=config.SERVICE_VERSION,
+    file_bytes=config.CAPTURE_FILE_MB * 1024 * 1024,
+    max_bytes=config.CAPTURE_MAX_MB * 1024 * 1024,
+) if config.CAPTURE_DIR else None
+warm = False
+
+T = TypeVar('T')
+
 
 class ExtractionRequest(BaseModel):
     html: str
     type: Literal["flight", "hotel", "car-rental", "train", "restaurant", "event", "cruise", "private-driver", "generic"]
+    # Leave empty fields out of `data` (defaults to EXTRACT_SPARSE_DEFAULT;
+    # false keeps the full-key shape)
+    sparse: Optional[bool] = None
+    # Time budget in ms (alternative to the X-Timeout-Ms header)
+    timeout_ms: Optional[int] = Field(None, alias="timeoutMs")
+
+
+@app.on_event("startup")
+def prewarm():
+    """
+    Parse a reference document before serving traffic.
+    
+    Maps the airport/station reference index, imports the parsers,
+    compiles their XPath expressions and loads the extractors in this
+    worker, so the first real request does not pay
+    for it and /health only reports ready once the worker is warm.
+    """
+    global warm
+    started = time.perf_counter()
+    get_index()
+    run_extraction(structured_data.REFERENCE_HTML, 'flight')
+    warm = True
+    logger.info("Worker prewarmed in %.1fms", (time.perf_counter() - started) * 1000)
 
 
-class ExtractionResponse(BaseModel):
-    success: bool
-    method: Optional[Literal["json-ld", "microdata", "not-found"]] = None
-    data: Optional[Dict[str, Any]] = None
-    completeness: float = 0.0
-    confidence: Literal["high", "medium", "low"] = "low"
-    error: Optional[str] = None
+@app.on_event("shutdown")
+def stop_capture():
+    """Write out captured requests still queued."""
+    if corpus is not None:
+        corpus.stop()
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint for Docker healthcheck"""
+    if not warm:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "starting", "service": "extruct-service"},
+        )
     return {"status": "healthy", "service": "extruct-service"}
 
 
+@app.get("/stats")
+async def stats():
+    """Load and admission counters for monitoring"""
+    return {
+        "admission": admission.stats(),
+        "coalescing": inflight.stats(),
+        "compression": compression_stats.stats(),
+        "workers": worker_stats(),
+        "capture": corpus.stats() if corpus is not None else None,
+        "referencePlaces": len(get_index() or ()),
+    }
+
+
 @app.post("/extract", response_model=ExtractionResponse)
-async def extract_structured_data(request: ExtractionRequest):
+async def extract_structured_data(
+    request: ExtractionRequest,
+    http_request: Request,
+    x_request_id: Optional[str] = Header(None),
+    x_timeout_ms: Optional[int] = Header(None),
+):
     """
     Extract structured data from HTML confirmation email.
     
     Returns normalized data if found with high completeness,
     otherwise returns not-found to trigger AI fallback.
+    
+    When the service is over its admission budget the request is shed
+    right away with a 503 "overloaded" response, so the caller can go
+    straight to AI instead of waiting out its own timeout.
+    
+    Identical concurrent requests (same HTML and type) share a single
+    extraction and all receive its result.
+    
+    With `sparse`, empty fields are left out of `data` and null fields
+    out of the response.
+    
+    The body may be sent compressed (Content-Encoding gzip, deflate, br
+    or zstd); see compression.py.
+    
+    A not-found response carries `text`, a compact rendition of the
+    email (see text_rendition.py), to send to the AI instead of the HTML.
+    
+    A time budget (`timeoutMs` or X-Timeout-Ms) bounds queueing and is
+    checked between pipeline stages. When it runs out the response is a
+    504 "timeout" with the best incomplete data found so far, if any.
+    Work for a client that disconnects is cancelled the same way.
     """
+    sparse = config.SPARSE_DEFAULT if request.sparse is None else request.sparse
+    deadline = Deadline.after(request.timeout_ms or x_timeout_ms or config.DEFAULT_TIMEOUT_MS)
+    log_context = start_request(
+        x_request_id, type=request.type, size=len(request.html),
+        **getattr(http_request.state, 'compression', {}),
+    )
     try:
-        logger.info(f"Extracting {request.type} from HTML (length: {len(request.html)})")
-        
-        # Use extruct to parse all structured data formats
-        data = extruct.extract(
-            request.html,
-            syntaxes=['json-ld', 'microdata'],
-            errors='ignore'
-        )
-        
-        logger.info(f"Extruct found: {len(data.get('json-ld', []))} JSON-LD, {len(data.get('microdata', []))} microdata")
-        
-        # Try JSON-LD first (most common for email confirmations)
-        json_ld_items = data.get('json-ld', [])
-        for item in json_ld_items:
-            result = _process_structured_data(item, request.type, 'json-ld')
-            if result:
-                return result
-        
-        # Try microdata as fallback
-        microdata_items = data.get('microdata', [])
-        for item in microdata_items:
-            result = _process_structured_data(item, request.type, 'microdata')
-            if result:
-                return result
-        
-        # No structured data found
-        logger.info(f"No structured data found for {request.type}")
-        return ExtractionResponse(
-            success=False,
-            method="not-found",
-            completeness=0.0,
-            confidence="low"
+        result = await _cancel_on_disconnect(http_request, inflight.do(
+            content_key(request.html, request.type) + (sparse,),
+            lambda shared: _admitted_extraction(request.html, request.type, sparse, shared),
+            deadline,
+        ))
+    except Overloaded:
+        log_request_summary(logger, log_context, method="overloaded")
+        return JSONResponse(
+            status_code=503,
+            headers={"Retry-After": "1"},
+            content=ExtractionResponse(
+                success=False,
+                method="overloaded",
+                completeness=0.0,
+                confidence="low",
+                error="Service overloaded",
+            ).model_dump(),
         )
-        
-    except Exception as e:
-        logger.error(f"Extraction error: {str(e)}", exc_info=True)
-        return ExtractionResponse(
-            success=False,
-            method="not-found",
-            completeness=0.0,
-            confidence="low",
-            error=str(e)
+    except DeadlineExceeded as e:
+        result = timed_out(e)
+
+    log_request_summary(
+        logger, log_context,
+        method=result.method, completeness=round(result.completeness, 2),
+    )
+    if corpus is not None:
+        corpus.offer(request.html, request.type, sparse, result, log_context)
+    if result.method == "timeout":
+        return JSONResponse(status_code=504, content=result.model_dump(exclude_none=sparse))
+    if sparse:
+        return JSONResponse(content=result.model_dump(exclude_none=True))
+    return result
+
+
+async def _admitted_extraction(
+    html: str,
+    reservation_type: str,
+    sparse: bool,
+    deadline: Deadline,
+) -> ExtractionResponse:
+    """Run the extraction pipeline once admission control lets it in."""
+    queued = time.perf_counter()
+    # Never queue for longer than the caller is still waiting
+    deadline.check('admission')
+    async with admission.admit(len(html), timeout=deadline.remaining()):
+        annotate(queueMs=round((time.perf_counter() - queued) * 1000, 2))
+        # Parsing is CPU-bound; run it off the event loop so the
+        # loop stays free to admit and shed other requests.
+        return await run_in_threadpool(
+            run_extraction, html, reservation_type, sparse, deadline, config.TEXT_BUDGET,
         )
 
 
-def _process_structured_data(
-    item: Dict[str, Any],
-    reservation_type: str,
-    method: str
-) -> Optional[ExtractionResponse]:
+async def _cancel_on_disconnect(request: Request, work: Awaitable[T]) -> T:
     """
-    Process a single structured data item and extract reservation data.
+    Await work, giving up as soon as the client disconnects.
     
-    Returns ExtractionResponse if data is found and complete enough,
-    None if not the right type or incomplete.
+    Abandoning the wait lets SingleFlight cancel the shared extraction
+    once no caller is left, so the worker thread stops at its next stage.
     """
-    item_type = item.get('@type', '').lower()
-    
-    # Map reservation types to schema.org types
-    type_mapping = {
-        'flight': 'flightreservation',
-        'hotel': ['lodgingreservation', 'hotelreservation'],
-        'car-rental': 'rentalcarreservation',
-        'train': 'trainreservation',
-        'restaurant': ['foodestablishmentreservation', 'restaurantreservation'],
-        'event': 'eventreservation',
-        'cruise': 'boatreservation',  # Cruises sometimes use BoatReservation
-        'private-driver': 'taxireservation',
-    }
-    
-    expected_types = type_mapping.get(reservation_type)
-    if isinstance(expected_types, str):
-        expected_types = [expected_types]
-    
-    if not expected_types or item_type not in expected_types:
-        return None
-    
-    logger.info(f"Found {item_type} structured data, extracting...")
-    
-    # Extract and normalize data based on type
+    work = asyncio.ensure_future(work)
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(request))
     try:
-        if reservation_type == 'flight':
-            extracted_data = extract_flight_reservation(item)
-        elif reservation_type == 'hotel':
-            extracted_data = extract_hotel_reservation(item)
-        elif reservation_type == 'car-rental':
-            extracted_data = extract_car_rental_reservation(item)
-        elif reservation_type == 'train':
-            extracted_data = extract_train_reservation(item)
-        elif reservation_type == 'restaurant':
-            extracted_data = extract_restaurant_reservation(item)
-        elif reservation_type == 'event':
-            extracted_data = extract_event_reservation(item)
-        else:
-            logger.warning(f"No extractor for type: {reservation_type}")
-            return None
-        
-        # Calculate completeness score
-        completeness = calculate_completeness(extracted_data, reservation_type)
-        logger.info(f"Completeness score: {completeness:.2f}")
-        
-        # Determine confidence based on completeness
-        if completeness >= 0.8:
-            confidence = "high"
-        elif completeness >= 0.5:
-            confidence = "medium"
-        else:
-            confidence = "low"
-        
-        # Only return if completeness is high enough (>= 0.8)
-        if completeness >= 0.8:
-            logger.info(f"Structured extraction successful ({method})")
-            return ExtractionResponse(
-                success=True,
-                method=method,
-                data=extracted_data,
-                completeness=completeness,
-                confidence=confidence
-            )
-        else:
-            logger.info(f"Completeness too low ({completeness:.2f}), will fall back to AI")
-            return None
-            
-    except Exception as e:
-        logger.error(f"Extraction failed: {str(e)}", exc_info=True)
-        return None
+        await asyncio.wait((work, disconnected), return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        work.cancel()
+        raise
+    finally:
+        disconnected.cancel()
+    if work.done():
+        return work.result()
+    work.cancel()
+    await asyncio.wait((work,))
+    raise DeadlineExceeded('response', 'disconnected')
+
+
+async def _wait_for_disconnect(request: Request):
+    # The body has been read, so the next message is the disconnect
+    while (await request.receive())['type'] != 'http.disconnect':
+        pass
 
 
 if __name__ == "__main__":
@@ -0,0 +1,301 @@
+"""
+Extraction pipeline: HTML -> structured data -> normalized reservation.
+
+Shared by the HTTP service (main.py) and offline tools, so they produce
+identical results. Everything here is synchronous and safe to run in a
+worker thread or process.
+"""
+
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, List, Literal
+import logging
+import time
+
+from extractors.flight_extractor import extract_flight_reservation
+from extractors.hotel_extractor import extract_hotel_reservation
+from extractors.car_rental_extractor import extract_car_rental_reservation
+from extractors.train_extractor import extract_train_reservation
+from extractors.restaurant_extractor import extract_restaurant_reservation
+from extractors.event_extractor import extract_event_reservation
+from extractors.cruise_extractor import extract_cruise_reservation
+from extractors.private_driver_extractor import extract_private_driver_reservation
+from extractors.generic_extractor import extract_generic_reservation
+from validators import calculate_completeness
+from enrichment import enrich
+from logging_config import annotate
+from deadlines import Deadline, DeadlineExceeded
+import structured_data
+import text_rendition
+
+logger = logging.getLogger(__name__)
+
+# Reservation types accepted by /extract
+RESERVATION_TYPES = (
+    "flight", "hotel", "car-rental", "train", "restaurant", "event",
+    "cruise", "private-driver", "generic",
+)
+
+
+# Largest HTML given a text rendition after a timeout: parse and render
+# take about 10 ms per 130 KB, which must fit in ANSWER_MARGIN
+TIMEOUT_TEXT_MAX_BYTES = 256 * 1024
+
+
+class ExtractionResponse(BaseModel):
+    success: bool
+    method: Optional[Literal["json-ld", "microdata", "not-found", "overloaded", "timeout"]] = None
+    data: Optional[Dict[str, Any]] = None
+    completeness: float = 0.0
+    confidence: Literal["high", "medium", "low"] = "low"
+    error: Optional[str] = None
+    # Compact text of the email for the AI fallback (not-found and timeout)
+    text: Optional[str] = None
+
+
+def run_extraction(
+    html: str,
+    reservation_type: str,
+    sparse: bool = False,
+    deadline: Optional[Deadline] = None,
+    text_budget: int = 0
+) -> ExtractionResponse:
+    """
+    Run the full extraction pipeline for one HTML document.
+    
+    Synchronous so it can run in a worker thread. The deadline is checked
+    between stages; once it passes (or is cancelled) the pipeline stops
+    and returns a "timeout" response.
+    
+    With a text_budget, a not-found or timeout response also carries a
+    text rendition of the email of at most that many characters, for the
+    AI fallback. After a timeout it is rendered past the deadline, in the
+    margin SingleFlight keeps before the callers' (ANSWER_MARGIN), and
+    only for HTML up to TIMEOUT_TEXT_MAX_BYTES.
+    """
+    deadline = deadline or Deadline()
+    tree = None
+    try:
+        logger.debug("Extracting %s from HTML (length: %d)", reservation_type, len(html))
+        
+        # Skip the structured data parse for emails without any markup
+        deadline.check('pre-scan')
+        if structured_data.has_markup(html):
+            # Parse JSON-LD and microdata (the only syntaxes we use)
+            deadline.check('parse')
+            started = time.perf_counter()
+            tree = structured_data.parse(html)
+            data = structured_data.extract_items(tree, deadline) if tree is not None else {}
+            annotate(parseMs=round((time.perf_counter() - started) * 1000, 2))
+            result = extract_from_items(data, reservation_type, sparse, deadline)
+        else:
+            logger.debug("No JSON-LD or microdata markers in HTML")
+            result = not_found()
+        
+    except DeadlineExceeded as e:
+        logger.debug("Stopped extraction: %s", e)
+        result = timed_out(e)
+    except Exception as e:
+        logger.error("Extraction error: %s", e, exc_info=True)
+        return ExtractionResponse(
+            success=False,
+            method="not-found",
+            completeness=0.0,
+            confidence="low",
+            error=str(e)
+        )
+    
+    if result.method == "timeout":
+        # Past the deadline: only HTML that parses and renders well within
+        # the margin left before the callers' deadline
+        render = not deadline.cancelled and len(html) <= TIMEOUT_TEXT_MAX_BYTES
+    else:
+        # Skipped once the caller has stopped waiting
+        render = result.method == "not-found" and not deadline.expired()
+    if text_budget > 0 and render:
+        result.text = _render_text(html, tree, text_budget)
+    return result
+
+
+def extract_from_items(
+    data: Dict[str, List[Dict[str, Any]]],
+    reservation_type: str,
+    sparse: bool = False,
+    deadline: Optional[Deadline] = None
+) -> ExtractionResponse:
+    """
+    Extract a reservation from already-parsed structured data items.
+    
+    `data` is the output of structured_data.extract(); split out so
+    callers can parse once and try several reservation types.
+    
+    If the deadline passes partway through, the most complete (but
+    below-threshold) result seen so far comes back with the timeout.
+    """
+    deadline = deadline or Deadline()
+    started = time.perf_counter()
+    json_ld_items = data.get('json-ld', [])
+    microdata_items = data.get('microdata', [])
+    logger.debug("Extruct found: %d JSON-LD, %d microdata", len(json_ld_items), len(microdata_items))
+    
+    best_partial = None
+    try:
+        # Try JSON-LD first (most common for email confirmations),
+        # then microdata as fallback
+        items = [(item, 'json-ld') for item in json_ld_items] + [(item, 'microdata') for item in microdata_items]
+        for item, method in items:
+            deadline.check('extract')
+            result = _process_structured_data(item, reservation_type, method, sparse, deadline)
+            if result is None:
+                continue
+            if result.success:
+                return result
+            if best_partial is None or result.completeness > best_partial.completeness:
+                best_partial = result
+    except DeadlineExceeded as e:
+        logger.debug("Stopped extraction: %s", e)
+        return timed_out(e, best_partial)
+    finally:
+        annotate(extractMs=round((time.perf_counter() - started) * 1000, 2))
+    
+    # No structured data found
+    logger.debug("No structured data found for %s", reservation_type)
+    return not_found()
+
+
+def not_found() -> ExtractionResponse:
+    return ExtractionResponse(
+        success=False,
+        method="not-found",
+        completeness=0.0,
+        confidence="low"
+    )
+
+
+def timed_out(error: DeadlineExceeded, partial: Optional[ExtractionResponse] = None) -> ExtractionResponse:
+    """Timeout response, carrying the best incomplete extraction if there is one."""
+    return ExtractionResponse(
+        success=False,
+        method="timeout",
+        data=partial.data if partial else None,
+        completeness=partial.completeness if partial else 0.0,
+        confidence=partial.confidence if partial else "low",
+        error=f"Deadline exceeded ({error.reason} before {error.stage})",
+    )
+
+
+def _render_text(html: str, tree, budget: int) -> Optional[str]:
+    """Text rendition for the AI fallback, reusing the parsed tree if there is one."""
+    started = time.perf_counter()
+    try:
+        if tree is None:
+            tree = structured_data.parse(html)
+        return (text_rendition.render(tree, budget) or None) if tree is not None else None
+    except Exception as e:
+        # A rendition is optional; never fail the response over it
+        logger.warning("Text rendition failed: %s", e)
+        return None
+    finally:
+        annotate(renderMs=round((time.perf_counter() - started) * 1000, 2))
+
+
+def _process_structured_data(
+    item: Dict[str, Any],
+    reservation_type: str,
+    method: str,
+    sparse: bool = False,
+    deadline: Optional[Deadline] = None
+) -> Optional[ExtractionResponse]:
+    """
+    Process a single structured data item and extract reservation data.
+    
+    Returns a successful ExtractionResponse if data is found and complete
+    enough, an unsuccessful one carrying the incomplete data otherwise,
+    and None if the item is not the right type.
+    """
+    item_type = item.get('@type', '').lower()
+    
+    # Map reservation types to schema.org types
+    type_mapping = {
+        'flight': 'flightreservation',
+        'hotel': ['lodgingreservation', 'hotelreservation'],
+        'car-rental': 'rentalcarreservation',
+        'train': 'trainreservation',
+        'restaurant': ['foodestablishmentreservation', 'restaurantreservation'],
+        'event': 'eventreservation',
+        'cruise': 'boatreservation',  # Cruises sometimes use BoatReservation
+        'private-driver': ['taxireservation', 'busreservation'],  # Shuttles use BusReservation
+    }
+    
+    if reservation_type == 'generic':
+        # Any schema.org Reservation (or subtype) can be normalized generically
+        if not item_type.endswith('reservation'):
+            return None
+    else:
+        expected_types = type_mapping.get(reservation_type)
+        if isinstance(expected_types, str):
+            expected_types = [expected_types]
+        
+        if not expected_types or item_type not in expected_types:
+            return None
+    
+    logger.debug("Found %s structured data, extracting...", item_type)
+    
+    # Extract and normalize data based on type
+    try:
+        if reservation_type == 'flight':
+            extracted_data = extract_flight_reservation(item)
+        elif reservation_type == 'hotel':
+            extracted_data = extract_hotel_reservation(item)
+        elif reservation_type == 'car-rental':
+            extracted_data = extract_car_rental_reservation(item)
+        elif reservation_type == 'train':
+            extracted_data = extract_train_reservation(item)
+        elif reservation_type == 'restaurant':
+            extracted_data = extract_restaurant_reservation(item)
+        elif reservation_type == 'event':
+            extracted_data = extract_event_reservation(item)
+        elif reservation_type == 'cruise':
+            extracted_data = extract_cruise_reservation(item)
+        elif reservation_type == 'private-driver':
+            extracted_data = extract_private_driver_reservation(item)
+        elif reservation_type == 'generic':
+            extracted_data = extract_generic_reservation(item)
+        else:
+            logger.warning("No extractor for type: %s", reservation_type)
+            return None
+        
+        # Fill in city/timezone/coordinates from the reference index
+        enrich(extracted_data)
+        
+        # Calculate completeness score
+        if deadline is not None:
+            deadline.check('score')
+        completeness = calculate_completeness(extracted_data, reservation_type)
+        logger.debug("Completeness score: %.2f", completeness)
+        
+        # Determine confidence based on completeness
+        if completeness >= 0.8:
+            confidence = "high"
+        elif completeness >= 0.5:
+            confidence = "medium"
+        else:
+            confidence = "low"
+        
+        # Only successful if completeness is high enough (>= 0.8)
+        if completeness >= 0.8:
+            logger.debug("Structured extraction successful (%s)", method)
+        else:
+            logger.debug("Completeness too low (%.2f), will fall back to AI", completeness)
+        return ExtractionResponse(
+            success=completeness >= 0.8,
+            method=method,
+            data=extracted_data.to_dict(sparse),
+            completeness=completeness,
+            confidence=confidence
+        )
+            
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        logger.error("Extraction failed: %s", e, exc_info=True)
+        return None
@@ -0,0 +1,298 @@
+"""
+In-process airport and rail-station reference index.
+
+Lets the service fill in city, IANA timezone and coordinates for every
+extracted leg without a network or database round trip. The CSV sources
+in data/ are compiled into one binary file that is memory-mapped at
+startup: lookups are O(1) hash probes into the mapping, and all workers
+share the same pages through the OS page cache.
+
+File layout (little-endian):
+    header    magic, record count, slot count, section offsets
+    records   fixed-size: kind, string offsets, latitude, longitude
+    slots     open-addressing hash table: key hash, key offset, record
+    strings   deduplicated UTF-8 strings, each prefixed by its length
+
+Keys are "A:<IATA>" for airports, "S:<code>" for stations and
+"N:<normalized name>" for station names and aliases.
+
+Rebuild after editing the CSVs (also done automatically at startup when
+the index is missing or older than its sources):
+    python reference_index.py build
+    python reference_index.py build --airports full_airports.csv --stations stations.csv
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import argparse
+import csv
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import unicodedata
+import zlib
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+AIRPORTS_CSV = DATA_DIR / 'airports.csv'
+STATIONS_CSV = DATA_DIR / 'stations.csv'
+INDEX_PATH = Path(os.environ.get('REFERENCE_INDEX_PATH', DATA_DIR / 'reference.idx'))
+
+MAGIC = b'XREFIDX1'
+HEADER = struct.Struct('<8sIIIII')      # magic, records, slots, records/slots/strings offsets
+RECORD = struct.Struct('<B3xIIIIIff')   # kind, code, name, city, country, timezone, lat, lon
+SLOT = struct.Struct('<III')            # key hash, key string offset, record index + 1
+LENGTH = struct.Struct('<H')
+
+KIND_AIRPORT = 1
+KIND_STATION = 2
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+@dataclass(slots=True, frozen=True)
+class Place:
+    """One airport or station from the reference table."""
+    code: str
+    name: str
+    city: str
+    country: str
+    timezone: str
+    latitude: float
+    longitude: float
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation: 'Köln Hbf' -> 'koln hbf'."""
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return _NON_ALNUM.sub(' ', ascii_name.lower()).strip()
+
+
+def _key_hash(key: bytes) -> int:
+    return zlib.crc32(key)
+
+
+class ReferenceIndex:
+    """Read-only view over a memory-mapped reference index file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.record_count, self._slot_count, self._records_at, self._slots_at, self._strings_at = \
+            HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a reference index")
+        self._slot_mask = self._slot_count - 1
+        # Decoded records are tiny and the table is bounded, so cache them
+        self._place = lru_cache(maxsize=4096)(self._decode_place)
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def airport(self, code: str) -> Optional[Place]:
+        """Look up an airport by IATA code."""
+        if not code:
+            return None
+        return self._lookup('A:' + code.strip().upper())
+
+    def station(self, code_or_name: str) -> Optional[Place]:
+        """Look up a station by its code, name or a known alias."""
+        if not code_or_name:
+            return None
+        return (self._lookup('S:' + code_or_name.strip().upper())
+                or self._lookup('N:' + normalize_name(code_or_name)))
+
+    def close(self):
+        self._mmap.close()
+
+    def _lookup(self, key: str) -> Optional[Place]:
+        key_bytes = key.encode('utf-8')
+        key_hash = _key_hash(key_bytes)
+        slot = key_hash & self._slot_mask
+        while True:
+            stored_hash, key_offset, record = SLOT.unpack_from(self._mmap, self._slots_at + slot * SLOT.size)
+            if not record:
+                return None
+            if stored_hash == key_hash and self._string_bytes(key_offset) == key_bytes:
+                return self._place(record - 1)
+            slot = (slot + 1) & self._slot_mask
+
+    def _string_bytes(self, offset: int) -> bytes:
+        start = self._strings_at + offset
+        (length,) = LENGTH.unpack_from(self._mmap, start)
+        return self._mmap[start + LENGTH.size:start + LENGTH.size + length]
+
+    def _decode_place(self, index: int) -> Place:
+        _, code, name, city, country, timezone, lat, lon = RECORD.unpack_from(
+            self._mmap, self._records_at + index * RECORD.size
+        )
+        text = lambda offset: self._string_bytes(offset).decode('utf-8')
+        return Place(
+            code=text(code),
+            name=text(name),
+            city=text(city),
+            country=text(country),
+            timezone=text(timezone),
+            latitude=round(lat, 4),
+            longitude=round(lon, 4),
+        )
+
+
+def _read_rows(path: Path) -> Iterable[Dict[str, str]]:
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get('code') and row.get('timezone'):
+                yield row
+
+
+def build_index(sources: List[Tuple[int, Path]], output: Path) -> int:
+    """
+    Compile CSV sources into an index file at output.
+
+    Each source is (KIND_AIRPORT | KIND_STATION, csv path) with columns
+    code,name,city,country,timezone,latitude,longitude,aliases (aliases
+    '|'-separated). Returns the number of records written.
+    """
+    strings = bytearray()
+    string_offsets: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in string_offsets:
+            encoded = value.encode('utf-8')[:0xFFFF]
+            string_offsets[value] = len(strings)
+            strings.extend(LENGTH.pack(len(encoded)))
+            strings.extend(encoded)
+        return string_offsets[value]
+
+    records = bytearray()
+    keys: Dict[str, int] = {}
+    count = 0
+
+    for kind, path in sources:
+        for row in _read_rows(path):
+            code = row['code'].strip().upper()
+            try:
+                lat, lon = float(row.get('latitude') or 0), float(row.get('longitude') or 0)
+            except ValueError:
+                lat = lon = 0.0
+            records.extend(RECORD.pack(
+                kind,
+                intern(code),
+                intern(row.get('name', '').strip()),
+                intern(row.get('city', '').strip()),
+                intern(row.get('country', '').strip()),
+                intern(row['timezone'].strip()),
+                lat,
+                lon,
+            ))
+
+            if kind == KIND_AIRPORT:
+                record_keys = ['A:' + code]
+            else:
+                names = [row.get('name', '')] + (row.get('aliases') or '').split('|')
+                record_keys = ['S:' + code] + ['N:' + normalize_name(n) for n in names if n.strip()]
+            for key in dict.fromkeys(record_keys):
+                if key in keys:
+                    logger.warning("Duplicate reference key %s in %s, keeping first", key, path.name)
+                    continue
+                keys[key] = count
+            count += 1
+
+    # Power-of-two table at most half full keeps probe chains short
+    slot_count = 1
+    while slot_count < max(len(keys) * 2, 8):
+        slot_count *= 2
+    slots = bytearray(slot_count * SLOT.size)
+    for key, record in keys.items():
+        key_bytes = key.encode('utf-8')
+        key_hash = _key_hash(key_bytes)
+        slot = key_hash & (slot_count - 1)
+        while SLOT.unpack_from(slots, slot * SLOT.size)[2]:
+            slot = (slot + 1) & (slot_count - 1)
+        SLOT.pack_into(slots, slot * SLOT.size, key_hash, intern(key), record + 1)
+
+    records_at = HEADER.size
+    slots_at = records_at + len(records)
+    strings_at = slots_at + len(slots)
+
+    # Write to a temp file and rename, so concurrently starting workers
+    # never map a half-written index
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=output.parent, prefix='.reference-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, count, slot_count, records_at, slots_at, strings_at))
+        f.write(records)
+        f.write(slots)
+        f.write(strings)
+    # mkstemp creates the file 0600; the service may run as another user
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, output)
+    return count
+
+
+def _default_sources() -> List[Tuple[int, Path]]:
+    return [(KIND_AIRPORT, AIRPORTS_CSV), (KIND_STATION, STATIONS_CSV)]
+
+
+def _is_stale(path: Path, sources: List[Tuple[int, Path]]) -> bool:
+    if not path.exists():
+        return True
+    built = path.stat().st_mtime
+    return any(source.exists() and source.stat().st_mtime > built for _, source in sources)
+
+
+_index: Optional[ReferenceIndex] = None
+_load_attempted = False
+
+
+def get_index() -> Optional[ReferenceIndex]:
+    """
+    The process-wide index, loaded on first use.
+
+    Rebuilds the index from the CSVs if it is missing or stale. Returns
+    None (enrichment is skipped) if it cannot be built or opened.
+    """
+    global _index, _load_attempted
+    if _load_attempted:
+        return _index
+    _load_attempted = True
+
+    sources = _default_sources()
+    try:
+        if _is_stale(INDEX_PATH, sources):
+            count = build_index(sources, INDEX_PATH)
+            logger.info("Built reference index with %d places at %s", count, INDEX_PATH)
+        _index = ReferenceIndex(INDEX_PATH)
+    except (OSError, ValueError, struct.error) as e:
+        logger.warning("Reference index unavailable, skipping enrichment: %s", e)
+        _index = None
+    return _index
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the airport/station reference index")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help='Compile CSV sources into the index file')
+    build.add_argument('--airports', type=Path, default=AIRPORTS_CSV)
+    build.add_argument('--stations', type=Path, default=STATIONS_CSV)
+    build.add_argument('--output', type=Path, default=INDEX_PATH)
+    args = parser.parse_args()
+
+    count = build_index([(KIND_AIRPORT, args.airports), (KIND_STATION, args.stations)], args.output)
+    print(f"Wrote {count} places to {args.output} ({args.output.stat().st_size} bytes)")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Replay a captured traffic corpus through the pipeline and compare versions.
+
+Feeds every request in a corpus written by capture.py back through this
+version's pipeline (pipeline.run_extraction), in-process and one at a
+time, and compares output and latency with a baseline: by default the
+results and timings recorded when the traffic was captured, or with
+--baseline the saved output (-o) of an earlier replay. Timings recorded
+in production include contention with other requests, so for latency
+compare two replays on the same machine.
+
+Usage (from services/extruct-service):
+    python replay.py /var/lib/extruct/captures -o before.jsonl.gz
+    # ...change an extractor...
+    python replay.py /var/lib/extruct/captures --baseline before.jsonl.gz
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import argparse
+import gzip
+import json
+import logging
+import statistics
+import sys
+import time
+
+from capture import iter_corpus
+from logging_config import start_request
+from pipeline import run_extraction
+import config
+import structured_data
+
+
+def replay_one(record: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    """Run one captured request `repeat` times; keeps the fastest timings."""
+    best = None
+    for _ in range(repeat):
+        context = start_request(record.get('id'))
+        started = time.perf_counter()
+        result = run_extraction(
+            record['html'], record['type'], record.get('sparse', False), text_budget=config.TEXT_BUDGET,
+        )
+        timings = {
+            'parseMs': context.get('parseMs', 0.0),
+            'extractMs': context.get('extractMs', 0.0),
+            'totalMs': round((time.perf_counter() - started) * 1000, 2),
+        }
+        if best is None or timings['totalMs'] < best['totalMs']:
+            best = timings
+    return {
+        'id': record.get('id'),
+        'version': config.SERVICE_VERSION,
+        'type': record['type'],
+        'result': result.model_dump(exclude_none=True),
+        'timings': best,
+    }
+
+
+def work_ms(record: Dict[str, Any]) -> float:
+    """Parse + extract time, the part comparable between capture and replay."""
+    timings = record.get('timings') or {}
+    return timings.get('parseMs', 0.0) + timings.get('extractMs', 0.0)
+
+
+def diff_paths(before: Any, after: Any, path: str = '') -> List[str]:
+    """Paths (data.flights[0].departureTime, ...) where two results differ."""
+    if isinstance(before, dict) and isinstance(after, dict):
+        paths = []
+        for key in sorted(set(before) | set(after), key=str):
+            paths += diff_paths(before.get(key), after.get(key), f"{path}.{key}" if path else key)
+        return paths
+    if isinstance(before, list) and isinstance(after, list) and len(before) == len(after):
+        paths = []
+        for i, (b, a) in enumerate(zip(before, after)):
+            paths += diff_paths(b, a, f"{path}[{i}]")
+        return paths
+    if isinstance(before, float) and isinstance(after, float):
+        return [] if round(before, 4) == round(after, 4) else [path]
+    return [] if before == after else [path]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+class Comparison:
+    """Output and latency differences between a baseline and this replay."""
+
+    def __init__(self, show: int):
+        self.show = show
+        self.count = 0
+        self.unchanged = 0
+        self.changed = 0
+        self.improved = 0
+        self.regressed = 0
+        self.unmatched = 0
+        self.skipped = 0
+        self.baseline_versions = set()
+        self.baseline_ms: List[float] = []
+        self.current_ms: List[float] = []
+        self.slowdowns: List[tuple] = []
+        self.examples: List[str] = []
+
+    def add(self, baseline: Optional[Dict[str, Any]], current: Dict[str, Any]):
+        self.count += 1
+        if baseline is None:
+            self.unmatched += 1
+            return
+        self.baseline_versions.add(baseline.get('version', '?'))
+        before, after = baseline.get('result') or {}, current['result']
+        if before.get('method') == 'timeout':
+            # Cut short when captured; its output says nothing about the old version
+            self.skipped += 1
+        else:
+            paths = diff_paths(before, after)
+            if not paths:
+                self.unchanged += 1
+            else:
+                self.changed += 1
+                if after.get('success') and not before.get('success'):
+                    self.improved += 1
+                elif before.get('success') and not after.get('success'):
+                    self.regressed += 1
+                if len(self.examples) < self.show:
+                    self.examples.append(f"  {current['id']} ({current['type']}): {', '.join(paths[:8])}")
+
+        if baseline.get('timings'):
+            before_ms, after_ms = work_ms(baseline), work_ms(current)
+            self.baseline_ms.append(before_ms)
+            self.current_ms.append(after_ms)
+            if before_ms > 0:
+                self.slowdowns.append((after_ms / before_ms, current['id'], before_ms, after_ms))
+
+    def report(self) -> str:
+        versions = ', '.join(sorted(self.baseline_versions)) or 'none'
+        lines = [
+            f"Replayed:    {self.count} requests with {config.SERVICE_VERSION} (baseline: {versions})",
+            f"Output:      {self.unchanged} unchanged, {self.changed} changed "
+            f"({self.improved} newly successful, {self.regressed} no longer successful)",
+        ]
+        if self.skipped or self.unmatched:
+            lines.append(f"Not compared: {self.skipped} timed out when captured, "
+                         f"{self.unmatched} missing from the baseline")
+        if self.current_ms:
+            lines.append("Latency (parse + extract ms):")
+            lines.append(f"  {'':<10}{'p50':>10}{'p95':>10}{'p99':>10}")
+            for name, values in (('baseline', self.baseline_ms), ('current', self.current_ms)):
+                lines.append(f"  {name:<10}" + ''.join(
+                    f"{percentile(values, pct):>10.2f}" for pct in (50, 95, 99)))
+            ratios = [ratio for ratio, *_ in self.slowdowns]
+            if ratios:
+                lines.append(f"  median per-request change: {statistics.median(ratios) - 1:+.0%}")
+                slowest = [entry for entry in sorted(self.slowdowns, reverse=True)[:3] if entry[0] > 1]
+                if slowest:
+                    lines.append("  largest slowdowns: " + ', '.join(
+                        f"{request_id} {before:.1f}->{after:.1f}ms" for _, request_id, before, after in slowest))
+        if self.examples:
+            lines.append("Changed output:")
+            lines.extend(self.examples)
+        return '\n'.join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('corpus', nargs='+', help='Corpus directories and/or capture-*.jsonl.gz files')
+    parser.add_argument('--baseline', type=Path,
+                        help='Output of an earlier replay to compare with (default: results recorded at capture)')
+    parser.add_argument('-o', '--output', type=Path, help='Save this replay (gzipped JSONL) for later comparison')
+    parser.add_argument('-t', '--type', help='Only replay requests of this reservation type')
+    parser.add_argument('-n', '--limit', type=int, help='Replay at most this many requests')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per request; the fastest is kept (default: 3)')
+    parser.add_argument('--show', type=int, default=10, help='Changed requests to list (default: 10)')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit 1 if any request is no longer extracted successfully')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    baseline = None
+    if args.baseline:
+        baseline = {record['id']: record for record in iter_corpus([args.baseline])}
+
+    # Same prewarm as a server worker, so the first request is not an outlier
+    run_extraction(structured_data.REFERENCE_HTML, 'flight')
+
+    comparison = Comparison(args.show)
+    out = gzip.open(args.output, 'wt', encoding='utf-8') if args.output else None
+    try:
+        for record in iter_corpus(args.corpus):
+            if args.type and record['type'] != args.type:
+                continue
+            if args.limit is not None and comparison.count >= args.limit:
+                break
+            current = replay_one(record, max(args.repeat, 1))
+            comparison.add(baseline.get(record.get('id')) if baseline is not None else record, current)
+            if out is not None:
+                out.write(json.dumps(current, ensure_ascii=False) + '\n')
+    finally:
+        if out is not None:
+            out.close()
+
+    print(comparison.report())
+    return 1 if args.fail_on_regression and comparison.regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Production server: a small multi-worker process manager around uvicorn.
+
+lxml and extruct leave fragmented heaps behind after very large inputs,
+so a long-lived worker slowly grows. The manager runs SERVER_WORKERS
+uvicorn workers on one shared listening socket and recycles each of them
+after SERVER_MAX_REQUESTS requests (plus jitter) or once its RSS passes
+SERVER_MAX_RSS_MB:
+
+1. The worker marks itself as retiring in the shared table (workers.py)
+2. The manager starts a replacement, which prewarms (startup event)
+3. Once the replacement is ready, the old worker gets SIGTERM and drains
+   its in-flight requests (up to SERVER_DRAIN_TIMEOUT seconds)
+
+Workers that die unexpectedly are replaced. Workers that die before
+becoming ready are restarted with exponential backoff, and after
+CRASH_LOOP_LIMIT such failures in a row the manager gives up and exits
+non-zero. SIGHUP recycles every worker the same way (rolling restart);
+SIGTERM / SIGINT drain all and exit.
+Per-worker request counts and memory are reported under `workers` on
+GET /stats.
+
+Besides TCP the workers can also listen on a Unix domain socket
+(SERVER_UDS), which saves co-located callers the loopback TCP stack.
+Both listeners keep connections alive for SERVER_KEEP_ALIVE seconds and
+accept pipelined HTTP/1.1 requests (httptools parser, answered in order).
+
+Usage:
+    python server.py
+    python server.py --workers 4 --max-requests 5000 --max-rss-mb 300
+    python server.py --uds /run/extruct/extruct.sock
+"""
+
+from typing import Any, Dict, List, Optional, Set
+import argparse
+import logging
+import multiprocessing
+import multiprocessing.sharedctypes
+import os
+import signal
+import socket
+import stat
+import sys
+import time
+
+from logging_config import configure_logging
+from workers import DRAINING, FREE, READY, RETIRING, STARTING, WorkerSlot, run_worker
+import config
+
+logger = logging.getLogger(__name__)
+
+# How often the manager checks on its workers
+POLL_INTERVAL = 0.2
+# Extra time after the drain timeout before a draining worker is killed
+KILL_GRACE = 5.0
+# Delay before restarting after a worker dies during startup, doubled for
+# each further failure in a row up to the maximum
+RESTART_BACKOFF = 0.5
+MAX_RESTART_BACKOFF = 30.0
+# Exit after this many workers in a row die before becoming ready
+CRASH_LOOP_LIMIT = 10
+
+
+class ProcessManager:
+    """Starts, watches and recycles the uvicorn worker processes."""
+
+    def __init__(self, sockets: List[socket.socket], workers: int, settings: Dict[str, Any]):
+        self.sockets = sockets
+        self.workers = workers
+        self.settings = settings
+        # Spawn, so workers start from a clean interpreter rather than a
+        # copy of the manager
+        self._context = multiprocessing.get_context('spawn')
+        # Room for every worker to have a replacement starting and its
+        # predecessor draining. Beyond that (restarts in quick succession),
+        # spawns wait for a slot to free up.
+        self.table = multiprocessing.sharedctypes.RawArray(WorkerSlot, workers * 3)
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self._replacements: Dict[int, int] = {}  # retiring slot -> replacement slot
+        self._drain_deadlines: Dict[int, float] = {}
+        self._starting: Set[int] = set()         # spawned, not yet seen ready
+        self._startup_failures = 0
+        self._next_spawn_at = 0.0
+        self._table_full = False
+        self._should_exit = False
+        self._exit_code = 0
+
+    def run(self) -> int:
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self._handle_exit)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        for _ in range(self.workers):
+            self._spawn()
+        logger.info("Manager %d started %d workers", os.getpid(), self.workers)
+
+        while not self._should_exit:
+            self._check_workers()
+            time.sleep(POLL_INTERVAL)
+
+        self._shutdown()
+        return self._exit_code
+
+    def _handle_exit(self, signum, frame):
+        self._should_exit = True
+
+    def _handle_reload(self, signum, frame):
+        logger.info("Rolling restart of all workers")
+        for index in self.processes:
+            if self.table[index].state == READY:
+                self.table[index].state = RETIRING
+
+    def _spawn(self) -> Optional[int]:
+        """Start a worker in a free slot; None if restarts are backing off or no slot is free."""
+        if time.monotonic() < self._next_spawn_at:
+            return None
+        index = next(
+            (i for i in range(len(self.table)) if i not in self.processes and self.table[i].state == FREE),
+            None,
+        )
+        if index is None:
+            if not self._table_full:
+                logger.warning("All %d worker slots in use, waiting for a worker to exit", len(self.table))
+            self._table_full = True
+            return None
+        self._table_full = False
+        slot = self.table[index]
+        slot.state = STARTING
+        slot.requests = 0
+        slot.rss = 0
+        slot.started_at = time.time()
+        process = self._context.Process(
+            target=run_worker,
+            args=(index, self.table, self.sockets, self.settings),
+            name=f"extruct-worker-{index}",
+        )
+        process.start()
+        slot.pid = process.pid
+        self.processes[index] = process
+        self._starting.add(index)
+        return index
+
+    def _check_workers(self):
+        # A worker that got through startup ends any crash loop
+        for index in list(self._starting):
+            if self.table[index].state != STARTING:
+                self._starting.discard(index)
+                self._startup_failures = 0
+
+        # Reap exited workers; replace any that were not being retired
+        for index, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self.processes[index]
+            slot = self.table[index]
+            if slot.state == DRAINING:
+                logger.info("Worker %d recycled after %d requests", process.pid, slot.requests)
+            elif slot.state == STARTING:
+                self._startup_failed(process)
+            else:
+                logger.warning("Worker %d exited unexpectedly (code %s)", process.pid, process.exitcode)
+            slot.state = FREE
+            self._starting.discard(index)
+            self._drain_deadlines.pop(index, None)
+            self._replacements.pop(index, None)
+        if self._should_exit:
+            return
+        while self._serving() < self.workers:
+            if self._spawn() is None:
+                break
+
+        # Start a replacement for each retiring worker; retire it once the
+        # replacement has prewarmed
+        for index in list(self.processes):
+            if self.table[index].state != RETIRING:
+                continue
+            replacement = self._replacements.get(index)
+            if replacement is None or replacement not in self.processes:
+                replacement = self._spawn()
+                if replacement is not None:
+                    self._replacements[index] = replacement
+            elif self.table[replacement].state == READY:
+                del self._replacements[index]
+                self._retire(index)
+
+        # Kill workers that did not finish draining in time
+        now = time.monotonic()
+        for index, deadline in list(self._drain_deadlines.items()):
+            if now > deadline and index in self.processes:
+                logger.warning("Worker %d did not drain in time, killing it", self.processes[index].pid)
+                self.processes[index].kill()
+                del self._drain_deadlines[index]
+
+    def _startup_failed(self, process: multiprocessing.Process):
+        self._startup_failures += 1
+        if self._startup_failures >= CRASH_LOOP_LIMIT:
+            logger.error(
+                "Worker %d died during startup (code %s), %d in a row; giving up",
+                process.pid, process.exitcode, self._startup_failures,
+            )
+            self._should_exit = True
+            self._exit_code = 1
+            return
+        delay = min(RESTART_BACKOFF * 2 ** (self._startup_failures - 1), MAX_RESTART_BACKOFF)
+        self._next_spawn_at = time.monotonic() + delay
+        logger.warning(
+            "Worker %d died during startup (code %s); restarting in %.1fs",
+            process.pid, process.exitcode, delay,
+        )
+
+    def _serving(self) -> int:
+        """Workers serving or starting; a retiring worker and its replacement count once."""
+        live = sum(1 for index in self.processes if self.table[index].state != DRAINING)
+        paired = sum(1 for index in self._replacements.values() if index in self.processes)
+        return live - paired
+
+    def _retire(self, index: int):
+        self.table[index].state = DRAINING
+        self._drain_deadlines[index] = time.monotonic() + self.settings['drain_timeout'] + KILL_GRACE
+        os.kill(self.processes[index].pid, signal.SIGTERM)
+
+    def _shutdown(self):
+        logger.info("Shutting down %d workers", len(self.processes))
+        for index, process in self.processes.items():
+            self.table[index].state = DRAINING
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.settings['drain_timeout'] + KILL_GRACE
+        for process in self.processes.values():
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+
+def bind_tcp(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.create_server((host, port), backlog=backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def bind_unix(path: str, backlog: int, mode: int) -> socket.socket:
+    """Listen on a Unix domain socket, replacing a stale one from a previous run."""
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    os.chmod(path, mode)
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the extruct service with managed workers")
+    parser.add_argument('--host', default=config.SERVER_HOST)
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT,
+                        help='TCP port (0 disables the TCP listener when --uds is set)')
+    parser.add_argument('--uds', default=config.SERVER_UDS,
+                        help='Also listen on this Unix domain socket path')
+    parser.add_argument('--workers', type=int, default=config.SERVER_WORKERS)
+    parser.add_argument('--max-requests', type=int, default=config.SERVER_MAX_REQUESTS,
+                        help='Recycle a worker after this many requests (0 disables)')
+    parser.add_argument('--max-requests-jitter', type=int, default=config.SERVER_MAX_REQUESTS_JITTER)
+    parser.add_argument('--max-rss-mb', type=int, default=config.SERVER_MAX_RSS_MB,
+                        help='Recycle a worker once its RSS passes this (0 disables)')
+    parser.add_argument('--drain-timeout', type=int, default=config.SERVER_DRAIN_TIMEOUT,
+                        help='Seconds a retiring worker gets to finish in-flight requests')
+    args = parser.parse_args()
+
+    configure_logging()
+    workers = max(args.workers, 1)
+    settings = {
+        'workers': workers,
+        'max_requests': max(args.max_requests, 0),
+        'max_requests_jitter': max(args.max_requests_jitter, 0),
+        'max_rss_mb': max(args.max_rss_mb, 0),
+        'drain_timeout': args.drain_timeout,
+        'keep_alive': config.SERVER_KEEP_ALIVE,
+        'http': config.SERVER_HTTP,
+    }
+
+    sockets = []
+    if args.port or not args.uds:
+        sockets.append(bind_tcp(args.host, args.port, config.SERVER_BACKLOG))
+        logger.info("Listening on http://%s:%d", args.host, args.port)
+    if args.uds:
+        sockets.append(bind_unix(args.uds, config.SERVER_BACKLOG, config.SERVER_UDS_MODE))
+        logger.info("Listening on unix:%s", args.uds)
+
+    try:
+        return ProcessManager(sockets, workers, settings).run()
+    finally:
+        if args.uds:
+            try:
+                os.unlink(args.uds)
+            except OSError:
+                pass
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Structured data parsing: JSON-LD and microdata from HTML.
+
+We only use two of the syntaxes extruct supports, but `import extruct`
+runs the package __init__, which imports every one of them (rdflib for
+RDFa, mf2py for microformats, Open Graph, ...). To keep startup time and
+per-worker memory down, only the JSON-LD and microdata submodules (and
+their own dependencies) are imported, under a bare stand-in for the
+package that is removed again once they have loaded.
+"""
+
+from typing import Any, Dict, List, Optional
+import importlib
+import importlib.util
+import logging
+import re
+import sys
+import types
+
+from deadlines import Deadline
+
+logger = logging.getLogger(__name__)
+
+_extractors = None
+
+# Every JSON-LD block or microdata item has one of these in its markup
+_MARKUP_HINT = re.compile(r'application/ld\+json|itemscope', re.IGNORECASE)
+
+
+def has_markup(html: str) -> bool:
+    """
+    Cheap pre-scan: could this HTML contain JSON-LD or microdata at all?
+
+    Most confirmation emails have neither; for those the full parse can
+    be skipped.
+    """
+    return _MARKUP_HINT.search(html) is not None
+
+
+def _import_extruct_submodules(*names: str) -> List[types.ModuleType]:
+    """
+    Import extruct.<name> modules without executing extruct/__init__.py.
+
+    The submodules import each other as `extruct.utils`, so a bare
+    `extruct` package stands in while they load. It is then taken out of
+    sys.modules again, with every extruct.* module loaded under it, so a
+    later `import extruct` elsewhere gets the real package, complete with
+    extract(). The modules returned here keep working on their own.
+    """
+    if 'extruct' in sys.modules:
+        # Already imported in full; its submodules cost nothing more
+        return [importlib.import_module(f'extruct.{name}') for name in names]
+
+    spec = importlib.util.find_spec('extruct')
+    if spec is None or not spec.submodule_search_locations:
+        raise ImportError("extruct is not installed")
+    package = types.ModuleType('extruct')
+    package.__path__ = list(spec.submodule_search_locations)
+    package.__spec__ = spec
+    sys.modules['extruct'] = package
+    try:
+        return [importlib.import_module(f'extruct.{name}') for name in names]
+    finally:
+        for module_name in [m for m in sys.modules if m == 'extruct' or m.startswith('extruct.')]:
+            del sys.modules[module_name]
+
+
+def _load_extractors():
+    """Import the parsers on first use and keep single instances around."""
+    global _extractors
+    if _extractors is None:
+        utils, jsonld, microdata = _import_extruct_submodules('utils', 'jsonld', 'w3cmicrodata')
+        _extractors = (
+            utils.parse_html,
+            jsonld.JsonLdExtractor(),
+            microdata.MicrodataExtractor(),
+        )
+    return _extractors
+
+
+def parse(html: str):
+    """Parse an HTML string into an lxml tree, or None if it cannot be parsed."""
+    parse_html = _load_extractors()[0]
+    try:
+        return parse_html(html, encoding='UTF-8')
+    except Exception as e:
+        logger.debug("Failed to parse HTML: %s", e)
+        return None
+
+
+def extract(html: str, deadline: Optional[Deadline] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Parse JSON-LD and microdata items from an HTML string.
+
+    Equivalent to extruct.extract(html, syntaxes=['json-ld', 'microdata'],
+    errors='ignore'): the HTML is parsed once, and a syntax that fails to
+    extract is left out of the result rather than raising. The deadline,
+    if given, is checked before each syntax.
+    """
+    tree = parse(html)
+    if tree is None:
+        return {}
+    return extract_items(tree, deadline)
+
+
+def extract_items(tree, deadline: Optional[Deadline] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Like extract(), for an already parsed tree (see parse())."""
+    _, jsonld_extractor, microdata_extractor = _load_extractors()
+
+    output = {}
+    for syntax, extractor in (('microdata', microdata_extractor), ('json-ld', jsonld_extractor)):
+        if deadline is not None:
+            deadline.check(syntax)
+        try:
+            output[syntax] = list(extractor.extract_items(tree, base_url=None))
+        except Exception as e:
+            logger.debug("Failed to extract %s: %s", syntax, e)
+    return output
+
+
+# Small document that exercises both parsers and the flight extractor,
+# used to prewarm a worker before it reports ready.
+REFERENCE_HTML = """<html><head>
+<script type="application/ld+json">
+{
+  "@context": "http://schema.org",
+  "@type": "FlightReservation",
+  "reservationNumber": "ABC123",
+  "underName": {"@type": "Person", "name": "Jane Doe"},
+  "reservationFor": {
+    "@type": "Flight",
+    "flightNumber": "UA1234",
+    "airline": {"@type": "Airline", "name": "United Airlines", "iataCode": "UA"},
+    "departureAirport": {"@type": "Airport", "name": "San Francisco International", "iataCode": "SFO"},
+    "departureTime": "2026-01-30T10:00:00-08:00",
+    "arrivalAirport": {"@type": "Airport", "name": "Los Angeles International", "iataCode": "LAX"},
+    "arrivalTime": "2026-01-30T11:30:00-08:00"
+  }
+}
+</script>
+</head><body>
+<div itemscope itemtype="http://schema.org/LodgingReservation">
+  <meta itemprop="reservationNumber" content="H98765">
+  <div itemprop="underName" itemscope itemtype="http://schema.org/Person">
+    <meta itemprop="name" content="Jane Doe">
+  </div>
+  <div itemprop="reservationFor" itemscope itemtype="http://schema.org/LodgingBusiness">
+    <meta itemprop="name" content="Example Downtown Hotel">
+  </div>
+  <meta itemprop="checkinTime" content="2026-01-30T15:00:00-08:00">
+  <meta itemprop="checkoutTime" content="2026-02-02T11:00:00-08:00">
+</div>
+<table><tr><td>Confirmation</td><td>ABC123</td></tr></table>
+</body></html>"""
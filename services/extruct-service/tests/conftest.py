@@ -0,0 +1,15 @@
+"""
+Shared test setup.
+
+The service modules are imported by their top-level names (`import config`,
+`from pipeline import ...`), as they are when run from this directory.
+"""
+
+from pathlib import Path
+import sys
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_DIR = SERVICE_DIR.parent.parent / 'sample data'
+
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
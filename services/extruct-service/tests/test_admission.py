@@ -0,0 +1,157 @@
+"""Tests for admission.AdmissionController weights, queueing and shedding."""
+
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, Overloaded
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_weight_is_one_without_size_unit():
+    controller = AdmissionController(capacity=4, queue_timeout=0)
+    assert controller.weight_for(0) == 1
+    assert controller.weight_for(10_000_000) == 1
+
+
+def test_weight_grows_with_size_and_is_capped_at_capacity():
+    controller = AdmissionController(capacity=4, queue_timeout=0, size_unit=1000)
+    assert controller.weight_for(0) == 1
+    assert controller.weight_for(999) == 1
+    assert controller.weight_for(1000) == 2
+    assert controller.weight_for(2999) == 3
+    # A huge request still fits on its own once everything else is done
+    assert controller.weight_for(10_000_000) == 4
+
+
+def test_settings_are_clamped():
+    controller = AdmissionController(capacity=0, queue_timeout=-1, size_unit=-5)
+    assert controller.capacity == 1
+    assert controller.queue_timeout == 0
+    assert controller.weight_for(10_000) == 1
+
+
+def test_admits_up_to_capacity_and_releases():
+    async def scenario():
+        controller = AdmissionController(capacity=2, queue_timeout=0)
+        async with controller.admit():
+            async with controller.admit():
+                assert controller.stats()['inUse'] == 2
+        return controller.stats()
+
+    stats = run(scenario())
+    assert stats['inUse'] == 0
+    assert stats['admitted'] == 2
+    assert stats['shed'] == 0
+
+
+def test_sheds_immediately_without_queue_budget():
+    async def scenario():
+        controller = AdmissionController(capacity=1, queue_timeout=0)
+        async with controller.admit():
+            with pytest.raises(Overloaded):
+                async with controller.admit():
+                    pass
+        return controller.stats()
+
+    stats = run(scenario())
+    assert stats['shed'] == 1
+    assert stats['waiting'] == 0
+
+
+def test_heavy_request_is_shed_while_light_ones_fit():
+    async def scenario():
+        controller = AdmissionController(capacity=3, queue_timeout=0, size_unit=100)
+        async with controller.admit(size=0):
+            with pytest.raises(Overloaded):
+                async with controller.admit(size=250):  # weight 3
+                    pass
+            async with controller.admit(size=150):      # weight 2
+                assert controller.stats()['inUse'] == 3
+
+    run(scenario())
+
+
+def test_waiting_request_is_admitted_when_capacity_frees():
+    async def scenario():
+        controller = AdmissionController(capacity=1, queue_timeout=1.0)
+        order = []
+
+        async def holder():
+            async with controller.admit():
+                order.append('first')
+                await asyncio.sleep(0.05)
+
+        async def waiter():
+            await asyncio.sleep(0.01)
+            async with controller.admit():
+                order.append('second')
+
+        await asyncio.gather(holder(), waiter())
+        return order, controller.stats()
+
+    order, stats = run(scenario())
+    assert order == ['first', 'second']
+    assert stats['admitted'] == 2
+    assert stats['shed'] == 0
+
+
+def test_sheds_after_queue_timeout():
+    async def scenario():
+        controller = AdmissionController(capacity=1, queue_timeout=0.05)
+        async with controller.admit():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            with pytest.raises(Overloaded):
+                async with controller.admit():
+                    pass
+            return loop.time() - started, controller.stats()
+
+    waited, stats = run(scenario())
+    assert 0.04 <= waited < 0.5
+    assert stats['shed'] == 1
+    assert stats['waiting'] == 0
+
+
+def test_caller_timeout_shortens_queue_budget():
+    async def scenario():
+        controller = AdmissionController(capacity=1, queue_timeout=10)
+        async with controller.admit():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            with pytest.raises(Overloaded):
+                async with controller.admit(timeout=0.02):
+                    pass
+            return loop.time() - started
+
+    assert run(scenario()) < 0.5
+
+
+def test_zero_caller_timeout_sheds_without_waiting():
+    async def scenario():
+        controller = AdmissionController(capacity=1, queue_timeout=10)
+        async with controller.admit():
+            with pytest.raises(Overloaded):
+                async with controller.admit(timeout=0):
+                    pass
+        return controller.stats()
+
+    assert run(scenario())['shed'] == 1
+
+
+def test_capacity_is_released_when_the_block_raises():
+    async def scenario():
+        controller = AdmissionController(capacity=1, queue_timeout=0)
+        with pytest.raises(ValueError):
+            async with controller.admit():
+                raise ValueError('extraction failed')
+        async with controller.admit():
+            pass
+        return controller.stats()
+
+    stats = run(scenario())
+    assert stats['inUse'] == 0
+    assert stats['admitted'] == 2
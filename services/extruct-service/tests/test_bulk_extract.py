@@ -0,0 +1,123 @@
+"""Tests for offline bulk re-extraction."""
+
+from email.message import EmailMessage
+import json
+import mailbox
+import sys
+
+import pytest
+
+from bulk_extract import (
+    AUTO, extract_auto, iter_sources, load_done, main, process_one, trim_partial_line,
+)
+from pipeline import extract_from_items
+import structured_data
+
+
+def make_email(subject: str, html=None) -> bytes:
+    message = EmailMessage()
+    message['Subject'] = subject
+    message['From'] = 'bookings@example.com'
+    message.set_content(f'{subject} (plain text)')
+    if html is not None:
+        message.add_alternative(html, subtype='html')
+    return message.as_bytes()
+
+
+@pytest.fixture
+def eml_dir(tmp_path):
+    directory = tmp_path / 'emails'
+    (directory / 'nested').mkdir(parents=True)
+    (directory / 'b.eml').write_bytes(make_email('b', structured_data.REFERENCE_HTML))
+    (directory / 'nested' / 'a.eml').write_bytes(make_email('a'))
+    (directory / 'notes.txt').write_text('not an email')
+    return directory
+
+
+def test_iter_sources_walks_directories_for_eml_files(eml_dir):
+    sources = list(iter_sources([eml_dir]))
+    assert [source for source, _ in sources] == [str(eml_dir / 'b.eml'), str(eml_dir / 'nested' / 'a.eml')]
+    assert b'Subject: b' in sources[0][1]()
+    assert [source for source, _ in iter_sources([str(eml_dir)])] == [source for source, _ in sources]
+
+
+def test_iter_sources_reads_mbox_messages(tmp_path):
+    path = tmp_path / 'archive.mbox'
+    box = mailbox.mbox(str(path))
+    for subject in ('first', 'second'):
+        box.add(make_email(subject))
+    box.close()
+
+    def read_all():
+        return [(source, read()) for source, read in iter_sources([path])]
+
+    first = read_all()
+    assert [source for source, _ in first] == [f'{path}#0', f'{path}#1']
+    assert b'Subject: first' in first[0][1] and b'Subject: second' in first[1][1]
+    assert [source for source, _ in read_all()] == [source for source, _ in first]
+
+
+def test_load_done_ignores_a_partial_last_line(tmp_path):
+    output = tmp_path / 'results.jsonl'
+    assert load_done(output) == set()
+    output.write_text('{"source": "a.eml", "success": true}\n{"source": "b.eml"}\n{"source": "c.e')
+    assert load_done(output) == {'a.eml', 'b.eml'}
+
+
+def test_trim_partial_line(tmp_path):
+    output = tmp_path / 'results.jsonl'
+    output.write_text('{"source": "a.eml"}\n{"source": "b.e')
+    trim_partial_line(output)
+    assert output.read_text() == '{"source": "a.eml"}\n'
+    trim_partial_line(output)
+    assert output.read_text() == '{"source": "a.eml"}\n'
+    output.write_text('{"source": "only partial')
+    trim_partial_line(output)
+    assert output.read_text() == ''
+
+
+def test_resume_skips_done_sources(eml_dir, tmp_path, monkeypatch, capsys):
+    output = tmp_path / 'results.jsonl'
+    done = str(eml_dir / 'b.eml')
+    output.write_text(json.dumps({'source': done, 'method': 'json-ld'}) + '\n{"source": "interrupt')
+
+    monkeypatch.setattr(sys, 'argv', ['bulk_extract.py', str(eml_dir), '-o', str(output), '--resume', '-j', '1'])
+    assert main() == 0
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [record['source'] for record in records] == [done, str(eml_dir / 'nested' / 'a.eml')]
+    assert '1 emails (1 skipped as already done)' in capsys.readouterr().out
+
+
+def test_process_one_record(eml_dir):
+    source = str(eml_dir / 'b.eml')
+    record = process_one(source, (eml_dir / 'b.eml').read_bytes(), AUTO, sparse=False)
+    assert record['source'] == source
+    assert record['type'] == 'flight'
+    assert record['success'] is True
+    assert record['method'] == 'json-ld'
+    assert record['data']['flights'][0]['flightNumber']
+    assert record['elapsedMs'] >= 0
+    # Full shape unless sparse
+    assert 'error' in record and record['error'] is None
+    assert 'error' not in process_one(source, (eml_dir / 'b.eml').read_bytes(), 'flight', sparse=True)
+
+
+def test_process_one_without_html_body(eml_dir):
+    record = process_one('a', (eml_dir / 'nested' / 'a.eml').read_bytes(), 'hotel', sparse=True)
+    assert record == {
+        'source': 'a', 'type': 'hotel', 'elapsedMs': record['elapsedMs'], 'success': False,
+        'method': 'not-found', 'completeness': 0.0, 'confidence': 'low', 'error': 'No HTML body',
+    }
+
+
+def test_extract_auto_prefers_the_specific_type():
+    html = structured_data.REFERENCE_HTML
+    # Generic extraction would succeed too; it is only the last resort
+    assert extract_from_items(structured_data.extract(html), 'generic').success
+    reservation_type, result = extract_auto(html, sparse=False)
+    assert reservation_type == 'flight'
+    assert result.success
+
+    reservation_type, result = extract_auto('<p>No markup here</p>', sparse=False)
+    assert (reservation_type, result.method) == (AUTO, 'not-found')
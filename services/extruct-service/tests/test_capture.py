@@ -0,0 +1,88 @@
+"""Tests for capture redaction and the corpus writer."""
+
+import json
+
+import pytest
+
+from bulk_extract import html_body
+from capture import CorpusWriter, free_text_values, iter_corpus, mask, redact, visible_text
+from conftest import SAMPLE_DIR
+from pipeline import run_extraction
+import config
+
+# Personal data in the sample emails, none of it in structured data
+SAMPLE_PII = {
+    'transfer in.eml': ['Alex', 'Kaplinsky', 'R08010702', '8908 9969', 'Marumoto'],
+    'united_conf.eml': ['Alexander', 'KAPLINSKY', 'HQYJ5G', '0162363753568'],
+    'airport_hotels.eml': ['Alex', 'Kaplinsky'],
+}
+
+
+def _sample_html(name: str) -> str:
+    return html_body((SAMPLE_DIR / name).read_bytes())
+
+
+@pytest.mark.parametrize('name', sorted(SAMPLE_PII))
+def test_sample_emails_are_captured_without_personal_data(tmp_path, name):
+    html = _sample_html(name)
+    # With a text budget, so the result carries the email's text too
+    result = run_extraction(html, 'flight', text_budget=config.TEXT_BUDGET)
+    assert result.text
+
+    writer = CorpusWriter(str(tmp_path), sample_rate=1.0, version='test')
+    writer.offer(html, 'flight', False, result, {'requestId': name})
+    writer.stop()
+
+    [record] = list(iter_corpus([str(tmp_path)]))
+    stored = record['html'] + json.dumps(record['result'], ensure_ascii=False)
+    for value in SAMPLE_PII[name]:
+        assert value.lower() not in stored.lower()
+    assert writer.captured == 1
+    # Same shape: tags and length are untouched
+    assert len(record['html']) == len(html)
+    assert record['html'].count('<') == html.count('<')
+
+
+def test_labelled_values_in_free_text():
+    text = visible_text(
+        '<p>Dear Mr Alex Kaplinsky,</p>'
+        '<p>Lead guest：</p><b>Mr Jane Doe</b>'
+        '<p>Passengers： 2 adults</p>'
+        '<p>Booking No： R08010702</p>'
+        '<p>Confirmation Number:</p><p>HQYJ5G</p>'
+        '<p>Reservation CONFIRMED</p>'
+        '<p>KAPLINSKY/ALEXANDER eTicket number: 0162363753568</p>'
+        '<p>SFO/HND departs 10:15 AM/PM</p>'
+        '<p>Hotel name: Sansui Niseko</p>'
+        '<p>Contact number：81(0)&nbsp;</span>90 8908 9969</p>'
+    )
+    values = free_text_values(text)
+    for value in ('Alex', 'Kaplinsky', 'Jane Doe', 'R08010702', 'HQYJ5G', 'KAPLINSKY/ALEXANDER',
+                  'ALEXANDER', '0162363753568', '81(0) 90 8908 9969'):
+        assert value in values
+    for value in ('Mr', 'CONFIRMED', 'SFO/HND', 'HND', 'AM/PM', 'Sansui', 'adults', 'Passengers'):
+        assert value not in values
+
+
+def test_values_split_by_tags_are_masked_around_them():
+    record = redact({
+        'html': '<p>Dear Alex,</p><b>Contact number：81(0)&nbsp;</span>90 8908 9969</b>',
+        'result': {'success': False, 'text': 'Dear Alex, Contact number：81(0) 90 8908 9969'},
+    })
+    assert record['html'] == '<p>Dear Xxxx,</p><b>Contact number：00(0)&nbsp;</span>00 0000 0000</b>'
+    assert record['result']['text'] == 'Dear Xxxx, Contact number：00(0) 00 0000 0000'
+
+
+def test_mask_keeps_escapes_and_tags():
+    assert mask("O&#39;Brien</b> Zo\\u00eb") == "X&#39;Xxxxx</b> Xx\\u00eb"
+
+
+def test_records_with_nothing_to_redact_are_not_captured(tmp_path):
+    html = '<p>Your table for two is booked at 7pm.</p>'
+    assert redact({'html': html, 'result': {'success': False}}) is None
+
+    writer = CorpusWriter(str(tmp_path), sample_rate=1.0, version='test')
+    writer.offer(html, 'restaurant', False, run_extraction(html, 'restaurant'), {'requestId': 'x'})
+    writer.stop()
+    assert list(iter_corpus([str(tmp_path)])) == []
+    assert (writer.captured, writer.unredacted) == (0, 1)
@@ -0,0 +1,79 @@
+"""Tests for client.ExtractClient headers, compression and connection reuse."""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import gzip
+import json
+import threading
+
+import pytest
+
+from client import COMPRESS_MIN_BYTES, ExtractClient
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        Handler.received.append((dict(self.headers), json.loads(body), self.client_address))
+        timed_out = 'X-Timeout-Ms' in self.headers and int(self.headers['X-Timeout-Ms']) < 10
+        status, response = (504, {'success': False, 'method': 'timeout'}) if timed_out else (200, {'success': True})
+        data = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def service():
+    Handler.received = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_sends_timeout_header(service):
+    with ExtractClient(service) as client:
+        assert client.extract('<p>hi</p>', 'flight', timeout_ms=1500.7)['success']
+        client.extract('<p>hi</p>', 'flight')
+    (with_timeout, _, _), (without, _, _) = Handler.received
+    assert with_timeout['X-Timeout-Ms'] == '1500'
+    assert 'X-Timeout-Ms' not in without
+
+
+def test_timeout_response_is_returned(service):
+    with ExtractClient(service) as client:
+        result = client.extract('<p>hi</p>', 'flight', timeout_ms=5)
+    assert result == {'success': False, 'method': 'timeout'}
+
+
+def test_payload_and_compression(service):
+    html = '<p>' + 'x' * COMPRESS_MIN_BYTES + '</p>'
+    with ExtractClient(service) as client:
+        client.extract('<p>small</p>', 'hotel', sparse=True, request_id='req-1')
+        client.extract(html, 'flight')
+    (small_headers, small, _), (large_headers, large, _) = Handler.received
+    assert small == {'html': '<p>small</p>', 'type': 'hotel', 'sparse': True}
+    assert small_headers['X-Request-ID'] == 'req-1'
+    assert 'Content-Encoding' not in small_headers
+    assert large_headers['Content-Encoding'] == 'gzip'
+    assert large['html'] == html
+
+
+def test_reuses_pooled_connections(service):
+    with ExtractClient(service, pool_size=1) as client:
+        for _ in range(3):
+            client.extract('<p>hi</p>', 'flight')
+    ports = {address[1] for _, _, address in Handler.received}
+    assert len(ports) == 1
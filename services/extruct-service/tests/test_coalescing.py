@@ -0,0 +1,104 @@
+"""Tests for coalescing.SingleFlight joining and forgetting in-flight work."""
+
+import asyncio
+
+import pytest
+
+from coalescing import SingleFlight, content_key
+from deadlines import Deadline, DeadlineExceeded
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_content_key_depends_on_type_and_content():
+    assert content_key('<p>a</p>', 'flight') == content_key('<p>a</p>', 'flight')
+    assert content_key('<p>a</p>', 'flight') != content_key('<p>a</p>', 'hotel')
+    assert content_key('<p>a</p>', 'flight') != content_key('<p>b</p>', 'flight')
+    # Lone surrogates from a bad decode must not raise
+    content_key('\udcff', 'flight')
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+
+        async def work(deadline):
+            calls.append(deadline)
+            await asyncio.sleep(0.02)
+            return 'result'
+
+        results = await asyncio.gather(*(flights.do('key', work, Deadline()) for _ in range(5)))
+        return results, calls, flights.stats()
+
+    results, calls, stats = run(scenario())
+    assert results == ['result'] * 5
+    assert len(calls) == 1
+    assert stats == {'inFlight': 0, 'leaders': 1, 'coalesced': 4}
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def work(deadline):
+            await asyncio.sleep(0.01)
+            return 'done'
+
+        await asyncio.gather(flights.do('a', work, Deadline()), flights.do('b', work, Deadline()))
+        return flights.stats()
+
+    assert run(scenario())['leaders'] == 2
+
+
+def test_finished_computation_is_not_reused():
+    async def scenario():
+        flights = SingleFlight()
+        calls = 0
+
+        async def work(deadline):
+            nonlocal calls
+            calls += 1
+            return calls
+
+        first = await flights.do('key', work, Deadline())
+        second = await flights.do('key', work, Deadline())
+        return first, second
+
+    assert run(scenario()) == (1, 2)
+
+
+def test_exception_reaches_every_waiter():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def work(deadline):
+            await asyncio.sleep(0.01)
+            raise ValueError('bad html')
+
+        return await asyncio.gather(
+            *(flights.do('key', work, Deadline()) for _ in range(3)), return_exceptions=True,
+        ), flights.stats()
+
+    results, stats = run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert stats['inFlight'] == 0
+
+
+def test_waiter_past_its_deadline_leaves_others_waiting():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def work(deadline):
+            await asyncio.sleep(0.1)
+            return 'result'
+
+        patient = asyncio.ensure_future(flights.do('key', work, Deadline()))
+        await asyncio.sleep(0)
+        with pytest.raises(DeadlineExceeded):
+            await flights.do('key', work, Deadline.after(20))
+        return await patient
+
+    assert run(scenario()) == 'result'
@@ -0,0 +1,160 @@
+"""Tests for compression: decoding, the decompressed-size cap and error statuses."""
+
+import asyncio
+import gzip
+import json
+import zlib
+
+import pytest
+from fastapi import FastAPI, Request
+
+from compression import DecompressingRoute, compression_stats
+import config
+
+brotli = pytest.importorskip('brotli')
+zstandard = pytest.importorskip('zstandard')
+
+LIMIT = 64 * 1024
+HTML = b'<html><body>' + b'<p>Confirmation ABC123, departs 10:05</p>' * 500 + b'</body></html>'
+
+app = FastAPI()
+app.router.route_class = DecompressingRoute
+
+
+@app.post('/echo')
+async def echo(request: Request):
+    body = await request.body()
+    return {'size': len(body), 'body': body.decode('utf-8')}
+
+
+@pytest.fixture(autouse=True)
+def small_limit(monkeypatch):
+    monkeypatch.setattr(config, 'MAX_BODY_BYTES', LIMIT)
+
+
+def post(body: bytes, encoding: str = '', chunk_size: int = 4096):
+    """POST body to /echo through the ASGI app in chunks; returns (status, headers, JSON)."""
+    headers = [(b'content-type', b'application/octet-stream')]
+    if encoding:
+        headers.append((b'content-encoding', encoding.encode()))
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+        'scheme': 'http', 'path': '/echo', 'raw_path': b'/echo', 'root_path': '', 'query_string': b'',
+        'headers': headers, 'client': ('test', 1), 'server': ('test', 80),
+    }
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b'']
+    messages = [
+        {'type': 'http.request', 'body': chunk, 'more_body': i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    response_body = b''.join(message.get('body', b'') for message in sent[1:])
+    return start['status'], dict(start['headers']), json.loads(response_body)
+
+
+def zstd_stream(data: bytes) -> bytes:
+    """zstd frame without a content size, as a streaming compressor writes it."""
+    compressor = zstandard.ZstdCompressor(write_checksum=True).compressobj()
+    return b''.join(compressor.compress(data[i:i + 1000]) for i in range(0, len(data), 1000)) + compressor.flush()
+
+
+ENCODERS = {
+    'gzip': gzip.compress,
+    'deflate': zlib.compress,
+    'br': lambda data: brotli.compress(data),
+    'zstd': lambda data: zstandard.ZstdCompressor().compress(data),
+}
+
+
+def test_plain_body_passes_through():
+    status, _, body = post(HTML)
+    assert status == 200 and body['size'] == len(HTML)
+
+
+@pytest.mark.parametrize('encoding', list(ENCODERS))
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096])
+def test_decodes(encoding, chunk_size):
+    status, _, body = post(ENCODERS[encoding](HTML), encoding, chunk_size)
+    assert status == 200
+    assert body['body'].encode() == HTML
+
+
+@pytest.mark.parametrize('chunk_size', [1, 13, 4096])
+def test_decodes_streamed_zstd(chunk_size):
+    status, _, body = post(zstd_stream(HTML), 'zstd', chunk_size)
+    assert status == 200 and body['body'].encode() == HTML
+
+
+def test_decodes_concatenated_gzip_members():
+    status, _, body = post(gzip.compress(HTML[:1000]) + gzip.compress(HTML[1000:]), 'gzip', 100)
+    assert status == 200 and body['body'].encode() == HTML
+
+
+def test_decodes_concatenated_and_skippable_zstd_frames():
+    skippable = b'\x5a\x2a\x4d\x18' + (3).to_bytes(4, 'little') + b'abc'
+    data = ENCODERS['zstd'](HTML[:1000]) + skippable + zstd_stream(HTML[1000:])
+    status, _, body = post(data, 'zstd', 5)
+    assert status == 200 and body['body'].encode() == HTML
+
+
+@pytest.mark.parametrize('encoding', list(ENCODERS))
+def test_bomb_is_rejected_with_413(encoding):
+    bomb = ENCODERS[encoding](b'\0' * (8 * 1024 * 1024))
+    assert len(bomb) < LIMIT
+    rejected = compression_stats.rejected
+    status, _, body = post(bomb, encoding)
+    assert status == 413
+    assert str(LIMIT) in body['detail']
+    assert compression_stats.rejected == rejected + 1
+
+
+@pytest.mark.parametrize('encoding', list(ENCODERS))
+def test_body_just_under_the_limit_is_accepted(encoding):
+    data = b'x' * LIMIT
+    status, _, body = post(ENCODERS[encoding](data), encoding)
+    assert status == 200 and body['size'] == LIMIT
+
+
+@pytest.mark.parametrize('encoding', list(ENCODERS))
+def test_truncated_body_is_rejected_with_400(encoding):
+    data = ENCODERS[encoding](HTML)
+    status, _, body = post(data[:len(data) // 2], encoding)
+    assert status == 400
+    assert encoding in body['detail']
+
+
+@pytest.mark.parametrize('encoding', list(ENCODERS))
+def test_corrupt_body_is_rejected_with_400(encoding):
+    status, _, _ = post(b'this is not compressed at all' * 10, encoding)
+    assert status == 400
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'deflate', 'zstd'])
+def test_trailing_garbage_is_rejected_with_400(encoding):
+    status, _, _ = post(ENCODERS[encoding](HTML) + b'trailing garbage', encoding)
+    assert status == 400
+
+
+def test_oversized_zstd_block_is_rejected_before_buffering():
+    frame_header = ENCODERS['zstd'](b'')[:6]
+    # Raw block header claiming 2 MiB
+    block_header = ((2 * 1024 * 1024 - 1) << 3 | 0b000).to_bytes(3, 'little')
+    status, _, body = post(frame_header + block_header + b'\0' * 100, 'zstd')
+    assert status == 400
+    assert 'larger than 128 KiB' in body['detail']
+
+
+def test_unknown_encoding_is_rejected_with_415():
+    status, headers, body = post(gzip.compress(HTML), 'compress')
+    assert status == 415
+    assert 'compress' in body['detail']
+    assert headers[b'accept-encoding'] == b'gzip, deflate, br, zstd'
@@ -0,0 +1,61 @@
+"""Tests for config: CPU detection and the per-worker concurrency share."""
+
+import os
+
+import pytest
+
+import config
+
+
+def test_available_cpus_is_within_the_affinity_mask():
+    cpus = config.available_cpus()
+    assert 1 <= cpus <= len(os.sched_getaffinity(0))
+
+
+def test_available_cpus_honours_cgroup_quota(monkeypatch, tmp_path):
+    real_open = open
+
+    def fake_open(path, *args, **kwargs):
+        if path == '/sys/fs/cgroup/cpu.max':
+            return real_open(tmp_path / 'cpu.max', *args, **kwargs)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr('builtins.open', fake_open)
+    monkeypatch.setattr(os, 'sched_getaffinity', lambda pid: set(range(16)))
+
+    (tmp_path / 'cpu.max').write_text('150000 100000\n')
+    assert config.available_cpus() == 2
+    (tmp_path / 'cpu.max').write_text('max 100000\n')
+    assert config.available_cpus() == 16
+    (tmp_path / 'cpu.max').write_text('5000 100000\n')
+    assert config.available_cpus() == 1
+
+
+@pytest.mark.parametrize('total, processes, share', [
+    (8, 1, 8), (8, 4, 2), (8, 3, 3), (2, 4, 1), (1, 1, 1), (8, 0, 8),
+])
+def test_worker_concurrency_splits_the_total(monkeypatch, total, processes, share):
+    monkeypatch.setattr(config, 'MAX_CONCURRENCY', total)
+    monkeypatch.setattr(config, 'WORKER_PROCESSES', processes)
+    assert config.worker_concurrency() == share
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('', 0o660), ('600', 0o600), ('0600', 0o600), ('0o640', 0o640), (' 777 ', 0o777),
+    ('abc', 0o660), ('99999', 0o660), ('-1', 0o660), ('8', 0o660),
+])
+def test_env_octal(monkeypatch, value, expected):
+    monkeypatch.setenv('TEST_MODE', value)
+    assert config.env_octal('TEST_MODE', 0o660) == expected
+
+
+def test_invalid_settings_fall_back_with_a_warning(monkeypatch, caplog):
+    monkeypatch.setenv('TEST_INT', 'lots')
+    monkeypatch.setenv('TEST_FLOAT', '1,5')
+    monkeypatch.setenv('TEST_MODE', 'rw-rw----')
+    assert config.env_int('TEST_INT', 4) == 4
+    assert config.env_float('TEST_FLOAT', 0.5) == 0.5
+    assert config.env_octal('TEST_MODE', 0o660) == 0o660
+    warned = [record.getMessage() for record in caplog.records]
+    assert len(warned) == 3
+    assert all(name in ' '.join(warned) for name in ('TEST_INT', 'TEST_FLOAT', 'TEST_MODE'))
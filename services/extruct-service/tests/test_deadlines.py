@@ -0,0 +1,188 @@
+"""Tests for deadlines.Deadline and cancellation of shared work."""
+
+import asyncio
+import time
+
+import pytest
+
+from coalescing import ANSWER_MARGIN, SingleFlight
+from deadlines import Deadline, DeadlineExceeded
+from pipeline import TIMEOUT_TEXT_MAX_BYTES, run_extraction
+import structured_data
+
+
+def test_no_expiry():
+    deadline = Deadline.after(None)
+    assert deadline.expires_at is None
+    assert deadline.remaining() is None
+    assert not deadline.expired()
+    deadline.check('parse')
+    assert Deadline.after(0).expires_at is None
+    assert Deadline.after(-5).expires_at is None
+
+
+def test_after_and_remaining():
+    before = time.monotonic()
+    deadline = Deadline.after(500)
+    assert before + 0.5 <= deadline.expires_at <= time.monotonic() + 0.5
+    assert 0.4 < deadline.remaining() <= 0.5
+    assert not deadline.expired()
+
+
+def test_expired_deadline_raises_with_stage():
+    deadline = Deadline(time.monotonic() - 1)
+    assert deadline.expired()
+    assert deadline.remaining() == 0.0
+    with pytest.raises(DeadlineExceeded) as raised:
+        deadline.check('extract')
+    assert (raised.value.stage, raised.value.reason) == ('extract', 'deadline')
+    assert str(raised.value) == 'deadline reached before extract'
+
+
+def test_cancel():
+    deadline = Deadline.after(None)
+    deadline.cancel()
+    assert deadline.expired()
+    assert deadline.remaining() == 0.0
+    with pytest.raises(DeadlineExceeded) as raised:
+        deadline.check('parse')
+    assert raised.value.reason == 'cancelled'
+
+
+def test_earlier():
+    deadline = Deadline(100.0)
+    assert deadline.earlier(0.025).expires_at == pytest.approx(99.975)
+    assert deadline.expires_at == 100.0
+    assert Deadline().earlier(0.025).expires_at is None
+    # A new object: cancelling it leaves the original alone
+    earlier = deadline.earlier(1)
+    earlier.cancel()
+    assert not deadline.cancelled
+
+
+def test_extend_only_pushes_out():
+    deadline = Deadline(100.0)
+    deadline.extend(Deadline(90.0))
+    assert deadline.expires_at == 100.0
+    deadline.extend(Deadline(110.0))
+    assert deadline.expires_at == 110.0
+    # A caller without a deadline keeps the shared work going indefinitely
+    deadline.extend(Deadline())
+    assert deadline.expires_at is None
+    deadline.extend(Deadline(120.0))
+    assert deadline.expires_at is None
+
+
+def test_shared_deadline_runs_ahead_of_callers_and_extends():
+    async def scenario():
+        flights = SingleFlight()
+        seen = []
+
+        async def work(deadline):
+            seen.append(deadline)
+            await asyncio.sleep(0.02)
+            return 'result'
+
+        first, second = Deadline(time.monotonic() + 10), Deadline(time.monotonic() + 20)
+        await asyncio.gather(flights.do('key', work, first), flights.do('key', work, second))
+        return seen[0], first, second
+
+    shared, first, second = asyncio.run(scenario())
+    assert shared.expires_at == pytest.approx(second.expires_at - ANSWER_MARGIN)
+
+
+def test_shared_work_is_cancelled_when_every_caller_leaves():
+    async def scenario():
+        flights = SingleFlight()
+        seen = []
+
+        async def work(deadline):
+            seen.append(deadline)
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        caller = asyncio.ensure_future(flights.do('key', work, Deadline()))
+        await asyncio.sleep(0.01)
+        caller.cancel()  # The client disconnected
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0.06)
+        return seen[0], flights.stats()
+
+    shared, stats = asyncio.run(scenario())
+    assert shared.cancelled
+    assert stats['inFlight'] == 0
+
+
+def test_shared_work_continues_while_a_caller_remains():
+    async def scenario():
+        flights = SingleFlight()
+        seen = []
+
+        async def work(deadline):
+            seen.append(deadline)
+            await asyncio.sleep(0.05)
+            deadline.check('extract')
+            return 'result'
+
+        leaving = asyncio.ensure_future(flights.do('key', work, Deadline()))
+        staying = asyncio.ensure_future(flights.do('key', work, Deadline()))
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+        return await staying, seen[0]
+
+    result, shared = asyncio.run(scenario())
+    assert result == 'result'
+    assert not shared.cancelled
+
+
+def test_retry_after_disconnect_starts_fresh_work():
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+
+        async def work(deadline):
+            calls.append(deadline)
+            # Cooperative: like the pipeline, notices cancellation only
+            # at its next stage boundary
+            await asyncio.sleep(0.05)
+            deadline.check('extract')
+            return 'result'
+
+        first = asyncio.ensure_future(flights.do('key', work, Deadline()))
+        await asyncio.sleep(0.01)
+        first.cancel()  # Client disconnects...
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        # ...and retries straight away, while the cancelled work unwinds
+        retried = await flights.do('key', work, Deadline())
+        return retried, calls, flights.stats()
+
+    retried, calls, stats = asyncio.run(scenario())
+    assert retried == 'result'
+    assert len(calls) == 2
+    assert calls[0].cancelled and not calls[1].cancelled
+    assert stats['leaders'] == 2
+    assert stats['inFlight'] == 0
+
+
+def test_timeout_response_carries_text_rendition():
+    result = run_extraction(structured_data.REFERENCE_HTML, 'hotel', deadline=Deadline(time.monotonic() - 1),
+                            text_budget=1000)
+    assert result.method == 'timeout'
+    assert 'Confirmation | ABC123' in result.text
+
+
+def test_no_text_rendition_once_cancelled():
+    deadline = Deadline()
+    deadline.cancel()
+    result = run_extraction(structured_data.REFERENCE_HTML, 'hotel', deadline=deadline, text_budget=1000)
+    assert result.method == 'timeout'
+    assert result.text is None
+
+
+def test_no_text_rendition_for_large_html_after_timeout():
+    html = structured_data.REFERENCE_HTML + '<p>padding</p>' * (TIMEOUT_TEXT_MAX_BYTES // 10)
+    result = run_extraction(html, 'hotel', deadline=Deadline(time.monotonic() - 1), text_budget=1000)
+    assert result.method == 'timeout'
+    assert result.text is None
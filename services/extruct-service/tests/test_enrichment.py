@@ -0,0 +1,95 @@
+"""Tests for enrichment: completing flight and train legs from the reference index."""
+
+import pytest
+
+from extractors.models import FlightReservation, FlightSegment, HotelReservation, TrainReservation, TrainSegment
+from reference_index import KIND_AIRPORT, KIND_STATION, ReferenceIndex, build_index
+import enrichment
+
+AIRPORTS = """code,name,city,country,timezone,latitude,longitude,aliases
+SFO,San Francisco International Airport,San Francisco,US,America/Los_Angeles,37.6188,-122.375,
+HND,Tokyo Haneda Airport,Tokyo,JP,Asia/Tokyo,35.5494,139.7798,
+"""
+STATIONS = """code,name,city,country,timezone,latitude,longitude,aliases
+KOLN,Köln Hbf,Cologne,DE,Europe/Berlin,50.9430,6.9589,Cologne Central|Koeln Hauptbahnhof
+FRA,Frankfurt (Main) Hbf,Frankfurt,DE,Europe/Berlin,50.1071,8.6636,
+"""
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    (tmp_path / 'airports.csv').write_text(AIRPORTS, encoding='utf-8')
+    (tmp_path / 'stations.csv').write_text(STATIONS, encoding='utf-8')
+    output = tmp_path / 'reference.idx'
+    build_index([(KIND_AIRPORT, tmp_path / 'airports.csv'), (KIND_STATION, tmp_path / 'stations.csv')], output)
+    index = ReferenceIndex(output)
+    monkeypatch.setattr(enrichment, 'get_index', lambda: index)
+    yield index
+    index.close()
+
+
+def test_flight_legs_get_city_timezone_and_coordinates(index):
+    record = FlightReservation(flights=[FlightSegment(departure_airport='SFO', arrival_airport='hnd')])
+    enrichment.enrich(record)
+    flight = record.flights[0]
+    assert (flight.departure_city, flight.departure_timezone) == ('San Francisco', 'America/Los_Angeles')
+    assert (flight.departure_latitude, flight.departure_longitude) == (37.6188, -122.375)
+    assert (flight.arrival_city, flight.arrival_timezone) == ('Tokyo', 'Asia/Tokyo')
+    assert (flight.arrival_latitude, flight.arrival_longitude) == (35.5494, 139.7798)
+
+
+def test_train_legs_get_station_codes_from_names_and_aliases(index):
+    record = TrainReservation(trains=[
+        TrainSegment(departure_station='Koeln Hauptbahnhof', arrival_station='Frankfurt (Main) Hbf'),
+        TrainSegment(departure_station_code='fra', arrival_station='KÖLN HBF'),
+    ])
+    enrichment.enrich(record)
+    first, second = record.trains
+    assert (first.departure_station_code, first.arrival_station_code) == ('KOLN', 'FRA')
+    assert (first.departure_city, first.departure_timezone) == ('Cologne', 'Europe/Berlin')
+    assert (first.arrival_latitude, first.arrival_longitude) == (50.1071, 8.6636)
+    # A code the provider gave is kept as written
+    assert (second.departure_station_code, second.departure_city) == ('fra', 'Frankfurt')
+    assert (second.arrival_station_code, second.arrival_city) == ('KOLN', 'Cologne')
+
+
+def test_provider_values_are_never_overwritten(index):
+    flight = FlightSegment(
+        departure_airport='SFO', departure_city='SF Bay Area', departure_timezone='US/Pacific',
+        departure_latitude=37.0, departure_longitude=-122.0,
+        arrival_airport='HND', arrival_city='Tokyo (Haneda)',
+    )
+    train = TrainSegment(departure_station='Cologne Central', departure_station_code='8000207',
+                         departure_city='Köln')
+    enrichment.enrich(FlightReservation(flights=[flight]))
+    enrichment.enrich(TrainReservation(trains=[train]))
+
+    assert (flight.departure_city, flight.departure_timezone) == ('SF Bay Area', 'US/Pacific')
+    assert (flight.departure_latitude, flight.departure_longitude) == (37.0, -122.0)
+    assert (flight.arrival_city, flight.arrival_timezone) == ('Tokyo (Haneda)', 'Asia/Tokyo')
+    # Found by name, since the provider's code is not in the index
+    assert (train.departure_station_code, train.departure_city) == ('8000207', 'Köln')
+    assert train.departure_timezone == 'Europe/Berlin'
+
+
+def test_unknown_places_leave_fields_empty(index):
+    flight = FlightSegment(departure_airport='XXX', arrival_airport='')
+    train = TrainSegment(departure_station='Nowhere Central', arrival_station_code='ZZZ')
+    enrichment.enrich(FlightReservation(flights=[flight]))
+    enrichment.enrich(TrainReservation(trains=[train]))
+
+    assert (flight.departure_city, flight.departure_timezone, flight.departure_latitude) == ('', '', None)
+    assert (flight.arrival_city, flight.arrival_timezone, flight.arrival_latitude) == ('', '', None)
+    assert (train.departure_station_code, train.departure_city, train.departure_latitude) == ('', '', None)
+    assert (train.arrival_station_code, train.arrival_city, train.arrival_longitude) == ('ZZZ', '', None)
+
+
+def test_other_records_and_a_missing_index_are_left_alone(index, monkeypatch):
+    hotel = HotelReservation(hotel_name='Sansui Niseko')
+    enrichment.enrich(hotel)
+    assert hotel == HotelReservation(hotel_name='Sansui Niseko')
+
+    monkeypatch.setattr(enrichment, 'get_index', lambda: None)
+    flight = FlightSegment(departure_airport='SFO')
+    enrichment.enrich(FlightReservation(flights=[flight]))
+    assert flight.departure_city == ''
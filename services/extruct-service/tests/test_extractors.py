@@ -0,0 +1,55 @@
+"""Tests for the cruise, private-driver and generic extractors."""
+
+import pytest
+
+from extractors.cruise_extractor import extract_cruise_reservation
+from extractors.generic_extractor import extract_generic_reservation
+from extractors.private_driver_extractor import extract_private_driver_reservation
+
+EXTRACTORS = {
+    'BoatReservation': extract_cruise_reservation,
+    'TaxiReservation': extract_private_driver_reservation,
+    'Reservation': extract_generic_reservation,
+}
+
+
+def test_cruise_reservation():
+    cruise = extract_cruise_reservation({
+        '@type': 'BoatReservation',
+        'reservationNumber': 'CR12345',
+        'underName': [{'@type': 'Person', 'name': 'Jane Doe'}, {'@type': 'Person', 'name': 'John Doe'}],
+        'reservedTicket': {'ticketedSeat': {'seatNumber': '8204', 'seatingType': 'Balcony', 'seatSection': 8}},
+        'reservationFor': {
+            '@type': 'BoatTrip',
+            'name': 'Harmony of the Seas',
+            'provider': {'@type': 'Organization', 'name': 'Royal Caribbean'},
+            'departureBoatTerminal': {'@type': 'BoatTerminal', 'name': 'Port Everglades'},
+            'departureTime': '2026-03-01T16:00:00-05:00',
+            'arrivalTime': '2026-03-08T07:00:00-05:00',
+            'itinerary': [{'@type': 'Place', 'name': 'Cozumel'}],
+        },
+    })
+    assert (cruise.confirmation_number, cruise.ship_name, cruise.cruise_line) == (
+        'CR12345', 'Harmony of the Seas', 'Royal Caribbean')
+    assert [guest.name for guest in cruise.guests] == ['Jane Doe', 'John Doe']
+    assert (cruise.cabin_number, cruise.deck) == ('8204', '8')
+    assert (cruise.embarkation_port, cruise.disembarkation_port) == ('Port Everglades', 'Port Everglades')
+    assert [port.port_name for port in cruise.ports_of_call] == ['Cozumel']
+
+
+def test_cruise_reservation_for_as_a_string():
+    cruise = extract_cruise_reservation({
+        '@type': 'BoatReservation', 'reservationNumber': 'CR1', 'reservationFor': 'Harmony of the Seas',
+    })
+    assert cruise.ship_name == 'Harmony of the Seas'
+    assert cruise.confirmation_number == 'CR1'
+
+
+@pytest.mark.parametrize('item_type', list(EXTRACTORS))
+@pytest.mark.parametrize('reservation_for', ['Airport transfer', ['Airport transfer'], [], 42, None])
+def test_reservation_for_that_is_not_an_object(item_type, reservation_for):
+    # Valid JSON-LD, but not a Thing: must not raise
+    record = EXTRACTORS[item_type]({
+        '@type': item_type, 'reservationNumber': 'R1', 'reservationFor': reservation_for,
+    })
+    assert record.confirmation_number == 'R1'
@@ -0,0 +1,144 @@
+"""Tests for request-scoped, queued logging."""
+
+import atexit
+import json
+import logging
+import queue
+import sys
+
+import pytest
+
+import logging_config
+from logging_config import (
+    ContextFilter, JsonFormatter, TextFormatter, _DeferredQueueHandler, annotate, configure_logging,
+    log_request_summary, request_context, start_request,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture(autouse=True)
+def no_request():
+    token = request_context.set(None)
+    yield
+    request_context.reset(token)
+
+
+def make_record(level=logging.INFO, msg='hello %s', args=('world',), **attrs):
+    record = logging.LogRecord('test', level, __file__, 1, msg, args, None)
+    record.__dict__.update(attrs)
+    return record
+
+
+def test_unsampled_requests_keep_only_warnings(monkeypatch):
+    monkeypatch.setattr(logging_config, '_sample_rate', 0.0)
+    context = start_request('abc')
+    assert context['sampled'] is False
+
+    log_filter = ContextFilter()
+    assert not log_filter.filter(make_record(logging.DEBUG))
+    assert not log_filter.filter(make_record(logging.INFO))
+    for level in (logging.WARNING, logging.ERROR):
+        record = make_record(level)
+        assert log_filter.filter(record)
+        assert record.context['requestId'] == 'abc'
+
+
+def test_sampled_requests_and_records_outside_requests_are_kept(monkeypatch):
+    log_filter = ContextFilter()
+    assert log_filter.filter(make_record(logging.DEBUG))
+
+    monkeypatch.setattr(logging_config, '_sample_rate', 1.0)
+    start_request('abc')
+    record = make_record(logging.INFO)
+    assert log_filter.filter(record)
+    # A copy: later annotations don't change a record already queued
+    annotate(method='json-ld')
+    assert 'method' not in record.context
+
+
+def test_summary_is_one_line_with_context_and_timings():
+    handler = ListHandler()
+    handler.addFilter(ContextFilter())
+    logger = logging.getLogger('test.summary')
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    try:
+        context = start_request('abc123', type='flight', size=2048)
+        annotate(queueMs=0.1, parseMs=1.5, extractMs=0.4)
+        log_request_summary(logger, context, method='json-ld', completeness=0.95)
+    finally:
+        logger.removeHandler(handler)
+
+    [record] = handler.records
+    line = TextFormatter().format(record)
+    assert '\n' not in line
+    assert line.startswith('INFO:test.summary:request complete requestId=abc123 type=flight size=2048 ')
+    for field in ('queueMs=0.1', 'parseMs=1.5', 'extractMs=0.4', 'method=json-ld', 'completeness=0.95', 'totalMs='):
+        assert field in line
+    assert 'sampled' not in line and 'startedAt' not in line
+
+
+def test_queue_handler_leaves_formatting_to_the_listener():
+    log_queue = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(log_queue)
+    record = make_record()
+    handler.handle(record)
+
+    queued = log_queue.get_nowait()
+    assert queued is record
+    # Still unformatted: message and args untouched, nothing rendered yet
+    assert (queued.msg, queued.args) == ('hello %s', ('world',))
+    assert not hasattr(queued, 'message')
+
+
+def test_json_lines_without_internal_fields():
+    start_request('abc', type='hotel')
+    record = make_record(logging.WARNING, extra_field=3)
+    ContextFilter().filter(record)
+    try:
+        raise ValueError('bad\nvalue')
+    except ValueError:
+        record.exc_info = sys.exc_info()
+
+    line = JsonFormatter().format(record)
+    assert '\n' not in line
+    entry = json.loads(line)
+    assert entry['level'] == 'WARNING'
+    assert entry['msg'] == 'hello world'
+    assert (entry['requestId'], entry['type'], entry['extra_field']) == ('abc', 'hotel', 3)
+    assert 'ValueError' in entry['exc']
+    assert 'sampled' not in entry and 'startedAt' not in entry
+
+
+def test_configure_logging_is_idempotent(monkeypatch):
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    monkeypatch.setattr(logging_config, '_listener', None)
+    # Restored afterwards; configure_logging() sets it
+    monkeypatch.setattr(logging_config, '_sample_rate', logging_config._sample_rate)
+    monkeypatch.setenv('LOG_SAMPLE_RATE', '0.5')
+    try:
+        configure_logging()
+        listener = logging_config._listener
+        handlers = list(root.handlers)
+        configure_logging()
+
+        assert logging_config._listener is listener
+        assert root.handlers == handlers
+        assert [type(h) for h in handlers] == [_DeferredQueueHandler]
+        assert logging_config._sample_rate == 0.5
+    finally:
+        if logging_config._listener is not None:
+            logging_config._listener.stop()
+            atexit.unregister(logging_config._listener.stop)
+        root.handlers[:] = saved_handlers
+        root.setLevel(saved_level)
@@ -0,0 +1,115 @@
+"""Tests for extractors.models: full and sparse to_dict() output."""
+
+import pytest
+
+from extractors.models import (
+    CarRentalReservation, EventReservation, EventTicket, FlightReservation, FlightSegment,
+    HotelReservation, Record, RestaurantReservation, TrainPassenger, TrainReservation, TrainSegment,
+)
+
+# Keys the extractors returned before results became records. Full output
+# must keep every one of them: the Next.js extraction schemas read them.
+BASELINE_KEYS = {
+    FlightReservation: {'confirmationNumber', 'bookingDate', 'passengerName', 'flights'},
+    FlightSegment: {
+        'flightNumber', 'carrier', 'carrierCode', 'departureAirport', 'departureAirportName',
+        'departureCity', 'departureDate', 'departureTime', 'departureTerminal', 'departureGate',
+        'arrivalAirport', 'arrivalAirportName', 'arrivalCity', 'arrivalDate', 'arrivalTime',
+        'arrivalTerminal', 'arrivalGate', 'aircraft', 'bookingClass', 'seatNumber', 'operatedBy',
+    },
+    HotelReservation: {
+        'confirmationNumber', 'guestName', 'hotelName', 'address', 'checkInDate', 'checkInTime',
+        'checkOutDate', 'checkOutTime', 'roomType', 'numberOfRooms', 'numberOfGuests', 'totalCost',
+        'currency', 'bookingDate',
+    },
+    CarRentalReservation: {
+        'confirmationNumber', 'guestName', 'company', 'vehicleClass', 'vehicleModel',
+        'pickupLocation', 'pickupAddress', 'pickupDate', 'pickupTime', 'pickupFlightNumber',
+        'returnLocation', 'returnAddress', 'returnDate', 'returnTime', 'totalCost', 'currency',
+        'options', 'oneWayCharge', 'bookingDate',
+    },
+    TrainReservation: {
+        'confirmationNumber', 'passengers', 'purchaseDate', 'totalCost', 'currency', 'trains',
+    },
+    TrainPassenger: {'name', 'ticketNumber'},
+    TrainSegment: {
+        'trainNumber', 'operator', 'operatorCode', 'departureStation', 'departureStationCode',
+        'departureCity', 'departureDate', 'departureTime', 'departurePlatform', 'arrivalStation',
+        'arrivalStationCode', 'arrivalCity', 'arrivalDate', 'arrivalTime', 'arrivalPlatform',
+        'class', 'coach', 'seat', 'duration',
+    },
+    RestaurantReservation: {
+        'confirmationNumber', 'guestName', 'restaurantName', 'address', 'phone', 'reservationDate',
+        'reservationTime', 'partySize', 'specialRequests', 'cost', 'currency', 'bookingDate',
+        'platform', 'cancellationPolicy',
+    },
+    EventReservation: {
+        'confirmationNumber', 'guestName', 'eventName', 'venueName', 'address', 'eventDate',
+        'eventTime', 'doorsOpenTime', 'tickets', 'totalCost', 'currency', 'bookingDate', 'platform',
+        'eventType', 'specialInstructions',
+    },
+    EventTicket: {'ticketType', 'quantity', 'price', 'seatInfo'},
+}
+
+
+@pytest.mark.parametrize('record_class', list(BASELINE_KEYS), ids=lambda cls: cls.__name__)
+def test_full_output_keeps_baseline_keys(record_class):
+    assert BASELINE_KEYS[record_class] <= set(record_class().to_dict())
+
+
+@pytest.mark.parametrize('record_class', list(BASELINE_KEYS), ids=lambda cls: cls.__name__)
+def test_full_output_keeps_default_values(record_class):
+    record = record_class()
+    assert all(record.to_dict()[key] == record.get(key) for key in BASELINE_KEYS[record_class])
+
+
+def test_records_are_slotted():
+    assert not hasattr(FlightSegment(), '__dict__')
+    with pytest.raises(AttributeError):
+        FlightSegment().not_a_field = 1
+
+
+def test_sparse_output_leaves_out_empty_fields():
+    hotel = HotelReservation(confirmation_number='H1', hotel_name='Example Hotel', number_of_rooms=1)
+    assert hotel.to_dict(sparse=True) == {
+        'confirmationNumber': 'H1', 'hotelName': 'Example Hotel', 'numberOfRooms': 1,
+    }
+
+
+def test_sparse_output_recurses_into_nested_records():
+    reservation = FlightReservation(
+        confirmation_number='ABC123',
+        flights=[FlightSegment(flight_number='UA1234', departure_airport='SFO')],
+    )
+    assert reservation.to_dict(sparse=True) == {
+        'confirmationNumber': 'ABC123',
+        'flights': [{'flightNumber': 'UA1234', 'departureAirport': 'SFO'}],
+    }
+    full = reservation.to_dict()
+    assert set(full['flights'][0]) >= BASELINE_KEYS[FlightSegment]
+
+
+def test_sparse_keys_are_a_subset_of_full_keys():
+    train = TrainReservation(
+        confirmation_number='T1',
+        passengers=[TrainPassenger(name='Jane Doe')],
+        trains=[TrainSegment(train_number='9012', travel_class='Standard')],
+    )
+    full, sparse = train.to_dict(), train.to_dict(sparse=True)
+    assert set(sparse) <= set(full)
+    assert sparse['trains'] == [{'trainNumber': '9012', 'class': 'Standard'}]
+    assert sparse['passengers'] == [{'name': 'Jane Doe'}]
+
+
+def test_get_uses_output_keys():
+    segment = TrainSegment(travel_class='First')
+    assert segment.get('class') == 'First'
+    assert segment.get('travelClass') is None
+    assert segment.get('missing', 'default') == 'default'
+
+
+def test_key_tables_are_per_class():
+    assert isinstance(HotelReservation(), Record)
+    assert 'hotelName' in HotelReservation().to_dict()
+    assert 'hotelName' not in CarRentalReservation().to_dict()
+    assert CarRentalReservation().get('hotelName') is None
@@ -0,0 +1,46 @@
+"""Tests for reference_index: building and reading the place index."""
+
+import stat
+
+from reference_index import KIND_AIRPORT, KIND_STATION, ReferenceIndex, build_index
+
+AIRPORTS = """code,name,city,country,timezone,latitude,longitude,aliases
+SFO,San Francisco International Airport,San Francisco,US,America/Los_Angeles,37.6188,-122.375,
+"""
+STATIONS = """code,name,city,country,timezone,latitude,longitude,aliases
+KOLN,Köln Hbf,Cologne,DE,Europe/Berlin,50.9430,6.9589,Cologne Central|Koeln Hauptbahnhof
+"""
+
+
+def build(tmp_path):
+    (tmp_path / 'airports.csv').write_text(AIRPORTS, encoding='utf-8')
+    (tmp_path / 'stations.csv').write_text(STATIONS, encoding='utf-8')
+    output = tmp_path / 'reference.idx'
+    count = build_index(
+        [(KIND_AIRPORT, tmp_path / 'airports.csv'), (KIND_STATION, tmp_path / 'stations.csv')], output,
+    )
+    return count, output
+
+
+def test_index_is_world_readable(tmp_path):
+    _, output = build(tmp_path)
+    # Built at image build time, read by a possibly different runtime user
+    assert stat.S_IMODE(output.stat().st_mode) == 0o644
+    assert not list(tmp_path.glob('.reference-*'))
+
+
+def test_lookups(tmp_path):
+    count, output = build(tmp_path)
+    index = ReferenceIndex(output)
+    try:
+        assert count == len(index) == 2
+        airport = index.airport(' sfo ')
+        assert (airport.city, airport.timezone, airport.latitude) == ('San Francisco', 'America/Los_Angeles', 37.6188)
+        assert index.station('KOLN').name == 'Köln Hbf'
+        assert index.station('koln hbf').code == 'KOLN'
+        assert index.station('Cologne Central').code == 'KOLN'
+        assert index.airport('KOLN') is None
+        assert index.station('SFO') is None
+        assert index.airport('') is None
+    finally:
+        index.close()
@@ -0,0 +1,169 @@
+"""Tests for server.ProcessManager slot use, restart backoff and crash loops."""
+
+import itertools
+
+import pytest
+
+from workers import DRAINING, READY, RETIRING, STARTING
+import server
+
+_pids = itertools.count(1000)
+
+
+class FakeProcess:
+    """Stands in for a spawned worker; the test decides when it is ready or dies."""
+
+    def __init__(self, target, args, name):
+        self.index = args[0]
+        self.pid = next(_pids)
+        self.exitcode = None
+
+    def start(self):
+        pass
+
+    def is_alive(self):
+        return self.exitcode is None
+
+    def join(self, timeout=None):
+        pass
+
+    def kill(self):
+        self.exitcode = -9
+
+
+class FakeContext:
+    Process = FakeProcess
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(server.time, 'monotonic', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def signals(monkeypatch):
+    sent = []
+
+    def kill(pid, signum):
+        sent.append(pid)
+    monkeypatch.setattr(server.os, 'kill', kill)
+    return sent
+
+
+def manager(workers=2):
+    manager = server.ProcessManager([], workers, {'drain_timeout': 30})
+    manager._context = FakeContext()
+    for _ in range(workers):
+        manager._spawn()
+    return manager
+
+
+def states(manager):
+    return sorted(manager.table[index].state for index in manager.processes)
+
+
+def become_ready(manager):
+    for index in manager.processes:
+        if manager.table[index].state == STARTING:
+            manager.table[index].state = READY
+
+
+def exit_drained(manager):
+    for index, process in manager.processes.items():
+        if manager.table[index].state == DRAINING:
+            process.exitcode = 0
+
+
+def test_rolling_restart_replaces_every_worker(clock, signals):
+    m = manager()
+    become_ready(m)
+    m._handle_reload(None, None)
+    m._check_workers()
+    assert states(m) == [STARTING, STARTING, RETIRING, RETIRING]
+    become_ready(m)
+    m._check_workers()
+    assert states(m) == [READY, READY, DRAINING, DRAINING]
+    assert len(signals) == 2
+
+
+def test_restarts_in_quick_succession_wait_for_free_slots(clock, signals):
+    m = manager()
+    # Every SIGHUP while the previous generation is still draining needs
+    # more slots than the table has; spawns must wait, not crash
+    for _ in range(4):
+        become_ready(m)
+        m._handle_reload(None, None)
+        m._check_workers()
+        become_ready(m)
+        m._check_workers()
+    assert len(m.processes) == len(m.table)
+    assert m._serving() >= 2
+
+    exit_drained(m)
+    m._check_workers()
+    become_ready(m)
+    m._check_workers()
+    become_ready(m)
+    m._check_workers()
+    assert sum(1 for index in m.processes if m.table[index].state == READY) == 2
+
+
+def test_worker_dying_during_startup_is_restarted_with_backoff(clock):
+    m = manager(workers=1)
+    delays = []
+    for _ in range(4):
+        (process,) = m.processes.values()
+        process.exitcode = 1
+        m._check_workers()
+        assert not m.processes  # Backing off
+        delays.append(m._next_spawn_at - clock[0])
+        clock[0] = m._next_spawn_at
+        m._check_workers()
+        assert len(m.processes) == 1
+    assert delays == [0.5, 1.0, 2.0, 4.0]
+
+
+def test_backoff_is_capped(clock, monkeypatch):
+    monkeypatch.setattr(server, 'CRASH_LOOP_LIMIT', 100)
+    m = manager(workers=1)
+    (process,) = m.processes.values()
+    for _ in range(20):
+        m._startup_failed(process)
+    assert m._next_spawn_at - clock[0] == server.MAX_RESTART_BACKOFF
+
+
+def test_ready_worker_resets_the_backoff(clock):
+    m = manager(workers=1)
+    for _ in range(3):
+        (process,) = m.processes.values()
+        process.exitcode = 1
+        m._check_workers()
+        clock[0] = m._next_spawn_at
+        m._check_workers()
+    become_ready(m)
+    m._check_workers()
+    assert m._startup_failures == 0
+
+    # A crash after startup is replaced straight away
+    (process,) = m.processes.values()
+    process.exitcode = 1
+    m._check_workers()
+    assert len(m.processes) == 1
+    assert m._startup_failures == 0
+
+
+def test_crash_loop_stops_the_manager(clock):
+    m = manager(workers=1)
+    for _ in range(server.CRASH_LOOP_LIMIT):
+        assert not m._should_exit
+        for process in m.processes.values():
+            process.exitcode = 1
+        m._check_workers()
+        clock[0] = m._next_spawn_at
+        m._check_workers()
+    assert m._should_exit
+    assert m._exit_code == 1
+    assert not m.processes
+
@@ -0,0 +1,66 @@
+"""Tests for structured_data: the trimmed extruct import and item extraction."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SERVICE_DIR
+from deadlines import Deadline, DeadlineExceeded
+import structured_data
+
+
+def test_reference_html_yields_both_syntaxes():
+    items = structured_data.extract(structured_data.REFERENCE_HTML)
+    assert [item['@type'] for item in items['json-ld']] == ['FlightReservation']
+    assert items['microdata'][0]['type'] == 'http://schema.org/LodgingReservation'
+    assert items['microdata'][0]['properties']['reservationNumber'] == 'H98765'
+
+
+def test_matches_extruct_extract():
+    html = structured_data.REFERENCE_HTML
+    items = structured_data.extract(html)
+    import extruct
+    assert items == extruct.extract(html, syntaxes=['json-ld', 'microdata'], errors='ignore')
+
+
+def test_extruct_package_is_left_importable():
+    # A fresh interpreter, where structured_data loads the parsers first
+    code = (
+        "import sys, structured_data\n"
+        "structured_data.extract(structured_data.REFERENCE_HTML)\n"
+        "print(sorted(m for m in sys.modules if m.split('.')[0] == 'extruct'))\n"
+        "import extruct\n"
+        "print(callable(extruct.extract), extruct.jsonld.JsonLdExtractor is not None)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=SERVICE_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    assert output.split('\n')[:2] == ['[]', 'True True']
+
+
+def test_only_the_used_parsers_are_imported():
+    # A fresh interpreter: this one may already have imported extruct in full
+    code = (
+        "import sys, structured_data\n"
+        "structured_data.extract(structured_data.REFERENCE_HTML)\n"
+        "print(' '.join(m for m in ('rdflib', 'mf2py', 'extruct.opengraph', 'extruct.rdfa') if m in sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=SERVICE_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    assert output.strip() == ''
+
+
+def test_has_markup():
+    assert structured_data.has_markup('<script type="application/LD+JSON">{}</script>')
+    assert structured_data.has_markup('<div itemscope itemtype="http://schema.org/Flight">')
+    assert not structured_data.has_markup('<p>Your booking is confirmed</p>')
+
+
+def test_cancelled_deadline_stops_extraction():
+    deadline = Deadline()
+    deadline.cancel()
+    with pytest.raises(DeadlineExceeded):
+        structured_data.extract(structured_data.REFERENCE_HTML, deadline)
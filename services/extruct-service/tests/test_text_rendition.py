@@ -0,0 +1,136 @@
+"""Tests for the text rendition sent to the AI fallback."""
+
+from bulk_extract import html_body
+from conftest import SAMPLE_DIR
+import structured_data
+import text_rendition
+
+
+def render(body: str, budget: int = 8000) -> str:
+    return text_rendition.render(structured_data.parse(f'<html><body>{body}</body></html>'), budget)
+
+
+def filler(n: int) -> str:
+    """A line with no booking facts in it."""
+    return f'<p>filler paragraph number {"x" * n} here</p>'
+
+
+def test_under_budget_everything_is_kept_in_order():
+    assert render('<p>first line</p><div>second <b>line</b></div>third<br>fourth') == \
+        'first line\nsecond line\nthird\nfourth'
+
+
+def test_budget_caps_output_and_keeps_document_order():
+    body = ''.join(filler(i) for i in range(1, 40))
+    text = render(body, budget=400)
+    assert len(text) <= 400
+    lines = text.split('\n')
+    positions = [body.index(line) for line in lines]
+    assert positions == sorted(positions)
+    # Nothing relevant: the rest is kept from the top
+    assert lines[0] == 'filler paragraph number x here'
+
+
+def test_over_budget_fact_lines_come_first_then_their_neighbours():
+    before = [filler(i) for i in range(1, 20)]
+    after = [filler(i) for i in range(20, 40)]
+    body = ''.join(before) + '<p>just before</p><p>Confirmation: RXJ34P</p><p>just after</p>' + ''.join(after)
+
+    text = render(body, budget=len('Confirmation: RXJ34P') + 1)
+    assert text == 'Confirmation: RXJ34P'
+
+    text = render(body, budget=60)
+    assert text == 'just before\nConfirmation: RXJ34P\njust after'
+
+    text = render(body, budget=200)
+    lines = text.split('\n')
+    assert 'Confirmation: RXJ34P' in lines and 'just before' in lines and 'just after' in lines
+    assert lines[0] == 'filler paragraph number x here'
+
+
+def test_hidden_elements_and_drop_tags_are_skipped():
+    text = render(
+        '<span style="display: none">preheader</span>'
+        '<div style="MSO-HIDE:ALL">outlook only</div>'
+        '<div style="visibility:hidden">invisible</div>'
+        '<div aria-hidden="true">decorative</div>'
+        '<div hidden>hidden attribute</div>'
+        '<script>var x = 1;</script><style>p { color: red }</style>'
+        '<noscript>enable javascript</noscript><svg><text>logo</text></svg>'
+        '<button>Manage booking</button>'
+        '<div style="font-size:0">wrapper <span>visible text</span></div>'
+        '<p>​‌­shown</p>'
+    )
+    assert text == 'wrapper visible text\nshown'
+
+
+def test_data_row_becomes_one_line():
+    text = render(
+        '<table>'
+        '<tr><td>Confirmation Number:</td><td><b>HQYJ5G</b></td></tr>'
+        '<tr><th>Total</th><td></td><td>3396.93 USD</td></tr>'
+        '<tr><td style="display:none">hidden cell</td><td>single cell</td></tr>'
+        '</table>'
+    )
+    assert text == 'Confirmation Number: | HQYJ5G\nTotal | 3396.93 USD\nsingle cell'
+
+
+def test_layout_row_is_walked_as_blocks():
+    text = render(
+        '<table><tr>'
+        '<td><table><tr><td>Depart</td><td>SFO</td></tr></table></td>'
+        '<td><table><tr><td>Arrive</td><td>HND</td></tr></table></td>'
+        '</tr></table>'
+    )
+    assert text == 'Depart | SFO\nArrive | HND'
+
+
+def test_repeated_runs_are_kept_once():
+    block = '<p>Flight UA875</p><p>Thu, Jan 29, 2026</p><p>10:15 AM</p>'
+    text = render(f'<div>{block}</div><p>between</p><div>{block}</div>')
+    assert text == 'Flight UA875\nThu, Jan 29, 2026\n10:15 AM\nbetween'
+
+
+def test_single_repeated_booking_line_is_kept():
+    text = render(
+        '<p>Flight UA875</p><p>Thu, Jan 29, 2026</p>'
+        '<p>Flight UA7975</p><p>Thu, Jan 29, 2026</p>'
+    )
+    assert text == 'Flight UA875\nThu, Jan 29, 2026\nFlight UA7975\nThu, Jan 29, 2026'
+
+
+def test_repeated_plain_lines_are_kept_once():
+    assert render('<p>see you soon</p><p>Booking R08010702</p><p>see you soon</p>') == \
+        'see you soon\nBooking R08010702'
+
+
+def test_boilerplate_and_separator_lines_are_dropped():
+    text = render(
+        '<p>Your booking is confirmed</p>'
+        '<p>|</p><p>— • —</p>'
+        '<p>Unsubscribe from these emails</p>'
+        '<p>View this email in your browser</p>'
+        '<p>Privacy Policy</p>'
+        '<p>© 2026 Example Travel. All rights reserved.</p>'
+        '<p>Please do not reply to this message</p>'
+    )
+    assert text == 'Your booking is confirmed'
+
+
+def test_long_lines_without_facts_are_cut():
+    words = ' '.join(['lorem'] * 100)
+    text = render(f'<p>{words}</p><p>Check-in {words}</p>')
+    short, relevant = text.split('\n')
+    assert len(short) <= text_rendition.MAX_LINE + 2 and short.endswith(' …')
+    assert relevant == f'Check-in {words}'
+
+
+def test_sample_email_rendition():
+    html = html_body((SAMPLE_DIR / 'united_conf.eml').read_bytes())
+    text = text_rendition.render(structured_data.parse(html), 8000)
+    assert len(text) <= 8000
+    assert len(text) < len(html) * 0.2
+    for fact in ('HQYJ5G', 'UA875', 'Thu, Jan 29, 2026', '10:15 AM', '(SFO)', '(HND)'):
+        assert fact in text
+    assert '<' not in text and '{' not in text
+    assert 'Privacy Policy' not in text
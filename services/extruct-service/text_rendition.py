@@ -0,0 +1,225 @@
+"""
+Compact plain-text rendition of a confirmation email for the AI fallback.
+
+When no structured data is good enough, the Quick Add route hands the email
+to an LLM, and prompt size drives its latency. Confirmation HTML is mostly
+layout tables, inline CSS and footers. The text that matters is a few
+kilobytes at most. The rendition keeps that text:
+
+- Scripts, styles, the head and hidden elements (preheaders, mso-hide) are
+  dropped, and so are footer lines (unsubscribe, privacy, copyright).
+- Table rows whose cells hold plain content become one `a | b | c` line, so
+  label/value pairs stay together. Layout tables are walked as blocks.
+- Repeated lines (mobile and desktop copies of the same block) are kept once.
+- If the text is still over the budget, lines with dates, times, codes,
+  amounts, addresses or booking keywords are kept first, then their
+  neighbours, then the rest from the top. Kept lines stay in document order.
+"""
+
+from typing import List, Tuple
+import re
+
+# Elements whose content is never visible text
+DROP_TAGS = {
+    'head', 'script', 'style', 'noscript', 'template', 'title', 'meta', 'link', 'svg',
+    'iframe', 'object', 'button', 'select', 'textarea', 'map', 'img',
+}
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'body', 'center', 'dd', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hr', 'html', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table',
+    'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul',
+}
+
+# Lines longer than this are cut unless they look booking-relevant
+MAX_LINE = 300
+# A run of this many lines seen before in the same order is a repeated block
+REPEAT_RUN = 3
+
+# Inline styles that hide an element. Not font-size:0 or max-height:0:
+# layouts set those on wrappers whose children are visible
+HIDDEN_STYLES = ('display:none', 'visibility:hidden', 'mso-hide:all')
+# Zero-width and soft-hyphen characters used as preheader padding
+_INVISIBLE = re.compile('[\u00ad\u034f\u200b-\u200d\u2060\ufeff]')
+
+_BOILERPLATE = re.compile(
+    r'unsubscribe|view (?:this (?:e-?mail|message) )?(?:in (?:your |a )?browser|online)'
+    r'|privacy (?:policy|notice|statement)|all rights reserved|copyright|©'
+    r'|terms (?:and|&) conditions|terms of (?:use|service)|manage (?:your )?(?:preferences|subscriptions)'
+    r'|do not reply|don\'t reply|no-?reply|this (?:e-?mail|message) was sent'
+    r'|to your address book|download (?:the|our) app|follow us'
+)
+
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?'
+# Matched against casefolded lines: case-insensitive matching of a long
+# alternation is several times slower. Everything but the currency symbols
+# starts at a word boundary, so most positions fail before any alternative.
+_FACTS = re.compile(
+    r'[$€£¥￥]\s?\d|\b(?:'
+    r'\d{4}-\d{2}-\d{2}\b|\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}\b'                    # dates
+    rf'|{_MONTH}\s+\d{{1,2}}\b|\d{{1,2}}\s+{_MONTH}(?!\w)'
+    r'|\d{1,2}:\d{2}\b|\d{1,2}\s?[ap]\.?m\b'                                        # times
+    r'|\d[\d,.]*\s?(?:usd|eur|gbp|jpy|cad|aud|chf)\b'                                # amounts
+    r'|(?:street|st\.|avenue|ave\.?|road|rd\.|boulevard|blvd|drive|lane|plaza|suite)\b'
+    r'|confirmation|booking|reservation|reference|record locator|itinerary|e?-?ticket'
+    r'|passenger|guest|travell?er|depart|arriv|check[- ]?in|check[- ]?out|pick[- ]?up'
+    r'|drop[- ]?off|return|flight|terminal|gate|seat|boarding|room|night|hotel|address'
+    r'|cabin|deck|embark|port\b|platform|coach|carriage|party of|table|venue|doors'
+    r'|driver|vehicle|total|paid|amount'
+    r')'
+)
+_CODES = re.compile(
+    r'\b(?=[A-Z0-9]*\d)(?=[A-Z0-9]*[A-Z])[A-Z0-9]{5,10}\b'   # RXJ34P, 0167384920
+    r'|\([A-Z]{3}\)|\b[A-Z]{2}\s?\d{1,4}\b'                  # (SFO), UA 110
+)
+
+
+def render(tree, budget: int) -> str:
+    """Text rendition of a parsed HTML tree, at most `budget` characters."""
+    lines: List[str] = []
+    current: List[str] = []
+
+    def end_line():
+        if current:
+            text = ''.join(current)
+            current.clear()
+            # Most text nodes between layout tags are whitespace
+            line = _normalize(text) if not text.isspace() else ''
+            if line:
+                lines.append(line)
+
+    def walk(element):
+        tag = element.tag if isinstance(element.tag, str) else None
+        if tag is not None and not _hidden(element):
+            tag = tag.lower()
+            if tag == 'br':
+                end_line()
+            elif tag == 'tr' and _is_data_row(element):
+                end_line()
+                cells = [_inline_text(cell) for cell in element if _is_cell(cell)]
+                current.append(' | '.join(cell for cell in cells if cell))
+                end_line()
+            else:
+                block = tag in BLOCK_TAGS
+                if block:
+                    end_line()
+                if element.text:
+                    current.append(element.text)
+                for child in element:
+                    walk(child)
+                if block:
+                    end_line()
+        if element.tail:
+            current.append(element.tail)
+
+    walk(tree)
+    end_line()
+    return _fit(_dedupe(lines), budget)
+
+
+def _hidden(element) -> bool:
+    if element.tag.lower() in DROP_TAGS:
+        return True
+    if element.get('hidden') is not None or element.get('aria-hidden') == 'true':
+        return True
+    style = element.get('style')
+    if not style:
+        return False
+    # CSS is case-insensitive ("DISPLAY:NONE", "mso-hide:ALL")
+    style = style.lower()
+    if 'none' not in style and 'hidden' not in style and 'mso-hide' not in style:
+        return False
+    style = style.replace(' ', '')
+    return any(hidden in style for hidden in HIDDEN_STYLES)
+
+
+def _is_cell(element) -> bool:
+    return isinstance(element.tag, str) and element.tag.lower() in ('td', 'th') and not _hidden(element)
+
+
+def _is_data_row(row) -> bool:
+    """A row of plain cells (not a layout row wrapping nested tables)."""
+    cells = [cell for cell in row if _is_cell(cell)]
+    return len(cells) > 1 and row.find('.//table') is None
+
+
+def _inline_text(element) -> str:
+    """Visible text of an element on one line."""
+    parts: List[str] = []
+
+    def collect(node):
+        if isinstance(node.tag, str) and not _hidden(node):
+            if node.tag.lower() == 'br' or node.tag.lower() in BLOCK_TAGS:
+                parts.append(' ')
+            if node.text:
+                parts.append(node.text)
+            for child in node:
+                collect(child)
+        if node is not element and node.tail:
+            parts.append(node.tail)
+
+    collect(element)
+    return _normalize(''.join(parts))
+
+
+def _normalize(text: str) -> str:
+    text = ' '.join(_INVISIBLE.sub('', text).split())
+    # Separator-only lines ("|", "—", "•••") carry nothing
+    return text if any(c.isalnum() for c in text) else ''
+
+
+def _relevant(line: str, folded: str) -> bool:
+    return bool(_FACTS.search(folded) or _CODES.search(line))
+
+
+def _dedupe(lines: List[str]) -> List[Tuple[str, bool]]:
+    """
+    Drop repeats and footer lines; cut long lines that carry no booking facts.
+    Returns (line, relevant) pairs.
+
+    A booking line on its own may legitimately repeat (two flights on the
+    same date), so it is only dropped as part of a repeated run of lines.
+    """
+    keys = [line.casefold() for line in lines]
+    repeated = [False] * len(lines)
+    first_run = {}
+    for i in range(len(lines) - REPEAT_RUN + 1):
+        run = tuple(keys[i:i + REPEAT_RUN])
+        start = first_run.setdefault(run, i)
+        if start + REPEAT_RUN <= i:
+            repeated[i:i + REPEAT_RUN] = [True] * REPEAT_RUN
+
+    seen = set()
+    kept = []
+    for line, key, in_repeat in zip(lines, keys, repeated):
+        if in_repeat:
+            continue
+        relevant = _relevant(line, key)
+        if not relevant and (key in seen or _BOILERPLATE.search(key)):
+            continue
+        seen.add(key)
+        if not relevant and len(line) > MAX_LINE:
+            line = line[:MAX_LINE].rsplit(' ', 1)[0] + ' …'
+        kept.append((line, relevant))
+    return kept
+
+
+def _fit(entries: List[Tuple[str, bool]], budget: int) -> str:
+    """Keep the most relevant lines within the budget, in document order."""
+    lines = [line for line, _ in entries]
+    if budget <= 0 or sum(len(line) + 1 for line in lines) <= budget + 1:
+        return '\n'.join(lines)
+
+    relevant = [is_relevant for _, is_relevant in entries]
+    last = len(lines) - 1
+    priority = [
+        2 if relevant[i] else 1 if (i > 0 and relevant[i - 1]) or (i < last and relevant[i + 1]) else 0
+        for i in range(len(lines))
+    ]
+    kept, used = [], 0
+    for i in sorted(range(len(lines)), key=lambda i: (-priority[i], i)):
+        cost = len(lines[i]) + 1
+        if used + cost <= budget + 1:
+            kept.append(i)
+            used += cost
+    return '\n'.join(lines[i] for i in sorted(kept))
@@ -8,6 +8,8 @@ and validates that required fields are present and valid.
 from typing import Dict, Any, List
 import logging
 
+from extractors.models import Record
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,12 +55,32 @@ REQUIRED_FIELDS = {
         'venueName',
         'eventDate',
     ],
+    'cruise': [
+        'cruiseLine',
+        'shipName',
+        'embarkationPort',
+        'embarkationDate',
+        'disembarkationDate',
+    ],
+    # TaxiReservation has no dropoff in schema.org, so 4/5 still passes
+    'private-driver': [
+        'company',
+        'pickupLocation',
+        'pickupDate',
+        'pickupTime',
+        'dropoffLocation',
+    ],
+    'generic': [
+        'name',
+        'confirmationNumber',
+        'startDate',
+    ],
 }
 
 
-def get_nested_value(data: Dict[str, Any], path: str) -> Any:
+def get_nested_value(data: Dict[str, Any] | Record, path: str) -> Any:
     """
-    Get a value from nested dict using dot notation.
+    Get a value from nested dict (or result Record) using dot notation.
     
     Examples:
       get_nested_value(data, 'flights[0].flightNumber')
@@ -73,7 +95,7 @@ def get_nested_value(data: Dict[str, Any], path: str) -> Any:
         try:
             if value is None:
                 return None
-            if isinstance(value, dict):
+            if isinstance(value, (dict, Record)):
                 value = value.get(part)
             elif isinstance(value, list):
                 value = value[int(part)]
@@ -85,7 +107,7 @@ def get_nested_value(data: Dict[str, Any], path: str) -> Any:
     return value
 
 
-def calculate_completeness(data: Dict[str, Any], schema_type: str) -> float:
+def calculate_completeness(data: Dict[str, Any] | Record, schema_type: str) -> float:
     """
     Calculate completeness score (0-1) based on required fields.
     
@@ -95,25 +117,28 @@ def calculate_completeness(data: Dict[str, Any], schema_type: str) -> float:
     """
     required = REQUIRED_FIELDS.get(schema_type, [])
     if not required:
-        logger.warning(f"No required fields defined for type: {schema_type}")
+        logger.warning("No required fields defined for type: %s", schema_type)
         return 0.5  # Default to medium completeness
     
+    # Checked once so the per-field debug calls cost nothing when disabled
+    debug = logger.isEnabledFor(logging.DEBUG)
     found_count = 0
     for field_path in required:
         value = get_nested_value(data, field_path)
         if value and str(value).strip():  # Non-empty and not just whitespace
             found_count += 1
-            logger.debug(f"Found {field_path}: {value}")
-        else:
-            logger.debug(f"Missing {field_path}")
+            if debug:
+                logger.debug("Found %s: %s", field_path, value)
+        elif debug:
+            logger.debug("Missing %s", field_path)
     
     completeness = found_count / len(required)
-    logger.info(f"Completeness: {found_count}/{len(required)} fields = {completeness:.2%}")
+    logger.debug("Completeness: %d/%d fields = %.2f%%", found_count, len(required), completeness * 100)
     
     return completeness
 
 
-def validate_required_fields(data: Dict[str, Any], schema_type: str) -> List[str]:
+def validate_required_fields(data: Dict[str, Any] | Record, schema_type: str) -> List[str]:
     """
     Validate that all required fields are present.
     
@@ -0,0 +1,165 @@
+"""
+Worker side of the multi-process server (see server.py).
+
+Each worker runs uvicorn on the manager's shared listening socket and
+publishes its request count and RSS to a shared-memory table. Once it
+passes its request budget or RSS limit it marks itself as retiring. The
+manager then starts and prewarms a replacement, and only then sends the
+old worker SIGTERM. Uvicorn stops accepting and drains in-flight
+requests before the process exits, so recycling never drops a request.
+
+Under plain `uvicorn main:app` none of this is active and
+worker_stats() returns None.
+"""
+
+from typing import Any, Dict, List, Optional
+import ctypes
+import logging
+import os
+import random
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Slot states
+FREE, STARTING, READY, RETIRING, DRAINING = range(5)
+STATE_NAMES = ('free', 'starting', 'ready', 'retiring', 'draining')
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+class WorkerSlot(ctypes.Structure):
+    """One worker's entry in the shared table, written by that worker and the manager."""
+    _fields_ = [
+        ('pid', ctypes.c_int),
+        ('state', ctypes.c_int),
+        ('requests', ctypes.c_uint64),
+        ('rss', ctypes.c_uint64),
+        ('started_at', ctypes.c_double),
+    ]
+
+
+# Shared table, set in worker processes by run_worker()
+_table = None
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (0 where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def worker_stats() -> Optional[List[Dict[str, Any]]]:
+    """Request count and memory of every live worker, or None outside server.py."""
+    if _table is None:
+        return None
+    now = time.time()
+    return [
+        {
+            "pid": slot.pid,
+            "state": STATE_NAMES[slot.state],
+            "requests": slot.requests,
+            "rssMb": round(slot.rss / (1024 * 1024), 1),
+            "uptimeS": round(now - slot.started_at, 1),
+        }
+        for slot in _table
+        if slot.state != FREE
+    ]
+
+
+class RecyclingApp:
+    """
+    ASGI wrapper that keeps this worker's slot up to date.
+
+    Marks the slot ready once lifespan startup (prewarm) completes, and
+    counts requests and samples RSS after each one.
+    """
+
+    def __init__(self, app, slot: WorkerSlot, max_requests: int, max_rss: int):
+        self.app = app
+        self.slot = slot
+        self.max_requests = max_requests
+        self.max_rss = max_rss
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.app(scope, receive, self._lifespan_send(send))
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if scope['type'] == 'http':
+                self._after_request()
+
+    def _lifespan_send(self, send):
+        async def lifespan_send(message):
+            if message['type'] == 'lifespan.startup.complete':
+                self.slot.rss = current_rss()
+                if self.max_rss and self.slot.rss >= self.max_rss:
+                    # Would be recycled on every request otherwise
+                    logger.warning(
+                        "Worker %d starts at %.0fMB RSS, above the recycle limit; ignoring the limit",
+                        self.slot.pid, self.slot.rss / (1024 * 1024),
+                    )
+                    self.max_rss = 0
+                self.slot.state = READY
+            await send(message)
+        return lifespan_send
+
+    def _after_request(self):
+        slot = self.slot
+        slot.requests += 1
+        slot.rss = current_rss()
+        if slot.state != READY:
+            return
+        if self.max_requests and slot.requests >= self.max_requests:
+            reason = "request budget"
+        elif self.max_rss and slot.rss >= self.max_rss:
+            reason = "RSS limit"
+        else:
+            return
+        slot.state = RETIRING
+        logger.info(
+            "Worker %d reached its %s (%d requests, %.0fMB RSS), asking to be recycled",
+            slot.pid, reason, slot.requests, slot.rss / (1024 * 1024),
+        )
+
+
+def run_worker(index: int, table, sockets, settings: Dict[str, Any]):
+    """Process entry point: serve main.app on the shared sockets."""
+    global _table
+    _table = table
+    slot = table[index]
+    slot.pid = os.getpid()
+    slot.requests = 0
+    slot.rss = current_rss()
+    slot.started_at = time.time()
+
+    import uvicorn
+    # Before main builds its admission controller from it
+    config.WORKER_PROCESSES = settings['workers']
+    import main
+
+    # Jitter so workers started together are not all recycled together
+    max_requests = settings['max_requests']
+    if max_requests:
+        max_requests += random.randint(0, settings['max_requests_jitter'])
+
+    server_config = uvicorn.Config(
+        RecyclingApp(main.app, slot, max_requests, settings['max_rss_mb'] * 1024 * 1024),
+        lifespan='on',
+        log_config=None,   # logging is set up by logging_config
+        access_log=False,  # main logs one summary line per request
+        http=settings['http'],
+        timeout_keep_alive=settings['keep_alive'],
+        timeout_graceful_shutdown=settings['drain_timeout'],
+    )
+    uvicorn.Server(server_config).run(sockets=sockets)